@@ -1,26 +1,108 @@
 from django.contrib import admin
-from .models import MoodEntry, MoodStreak, MoodInsight
+from mindbuddy.admin_performance import PerformanceAdminMixin
+from django.db import transaction
+from django.http import HttpResponseBadRequest
+from django.template.response import TemplateResponse
+from django.urls import path
+from .models import MoodEntry, MoodStreak, MoodInsight, MoodRollup
+from .services import MoodRollupService, MoodVersionService, PopulationAnalyticsService
 
 @admin.register(MoodEntry)
-class MoodEntryAdmin(admin.ModelAdmin):
+class MoodEntryAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ['user', 'date', 'mood_rating', 'energy_level', 'anxiety_level', 'created_at']
     list_filter = ['mood_rating', 'date', 'energy_level', 'anxiety_level']
-    search_fields = ['user__username', 'notes']
-    date_hierarchy = 'date'
+    list_select_related = ['user']
+    search_fields = ['user__name__exact']
     readonly_fields = ['id', 'created_at', 'updated_at']
+    raw_id_fields = ['user']
+    keyset_field = 'created_at'
+    change_list_template = 'admin/Mood_Tracking/moodentry/change_list.html'
     
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related('user')
+    def get_urls(self):
+        return [
+            path('analytics/', self.admin_site.admin_view(self.analytics_view), name='Mood_Tracking_moodentry_analytics'),
+        ] + super().get_urls()
+    
+    def analytics_view(self, request):
+        """Population-level mood trends for operators"""
+        try:
+            days, cohort_weeks = PopulationAnalyticsService.parse_params(request.GET)
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+        summary = PopulationAnalyticsService.get_summary(days, cohort_weeks)
+        
+        return TemplateResponse(request, 'admin/Mood_Tracking/population_analytics.html', {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Population analytics',
+            'summary': summary,
+            'cohort_weeks': cohort_weeks,
+            'retention_weeks': range(max((len(curve['weeks']) for curve in summary['retention']), default=0)),
+        })
+    
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            if change:
+                old_values = MoodRollupService.entry_values(MoodEntry.objects.get(pk=obj.pk))
+                super().save_model(request, obj, form, change)
+                MoodRollupService.entry_updated(obj.user_id, old_values, obj)
+            else:
+                super().save_model(request, obj, form, change)
+                MoodRollupService.entry_created(obj)
+            MoodVersionService.bump(obj.user_id)
+    
+    def delete_model(self, request, obj):
+        with transaction.atomic():
+            super().delete_model(request, obj)
+            MoodRollupService.entry_deleted(obj)
+            MoodVersionService.bump(obj.user_id)
+    
+    def delete_queryset(self, request, queryset):
+        with transaction.atomic():
+            user_ids = list(queryset.values_list('user_id', flat=True).distinct())
+            super().delete_queryset(request, queryset)
+            MoodRollupService.rebuild(user_ids)
+            MoodVersionService.bump_many(user_ids)
 
 @admin.register(MoodStreak)
 class MoodStreakAdmin(admin.ModelAdmin):
     list_display = ['user', 'current_streak', 'longest_streak', 'total_entries', 'last_check_in']
-    search_fields = ['user__username']
+    list_select_related = ['user']
+    search_fields = ['user__name__exact']
     readonly_fields = ['created_at', 'updated_at']
+    
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        MoodVersionService.bump(obj.user_id)
 
 @admin.register(MoodInsight)
-class MoodInsightAdmin(admin.ModelAdmin):
+class MoodInsightAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ['user', 'insight_type', 'title', 'date_generated', 'is_read']
     list_filter = ['insight_type', 'is_read', 'date_generated']
-    search_fields = ['user__username', 'title', 'description']
+    list_select_related = ['user']
+    search_fields = ['user__name__exact']
     readonly_fields = ['id', 'date_generated']
+    raw_id_fields = ['user']
+    keyset_field = 'date_generated'
+    
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        MoodVersionService.bump(obj.user_id)
+    
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        MoodVersionService.bump(obj.user_id)
+    
+    def delete_queryset(self, request, queryset):
+        user_ids = list(queryset.values_list('user_id', flat=True).distinct())
+        super().delete_queryset(request, queryset)
+        MoodVersionService.bump_many(user_ids)
+
+@admin.register(MoodRollup)
+class MoodRollupAdmin(admin.ModelAdmin):
+    list_display = ['user', 'period', 'period_start', 'entry_count', 'updated_at']
+    list_filter = ['period']
+    list_select_related = ['user']
+    search_fields = ['user__name__exact']
+    raw_id_fields = ['user']
+
@@ -0,0 +1,63 @@
+"""
+Per-user cache for computed mood data.
+
+Keys embed the user's MoodDataVersion, so any mood write makes every older entry
+unreachable (they simply expire) and nothing has to be deleted on write.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Sentinel so a cached falsy value (e.g. empty chart data) still counts as a hit
+MISSING = object()
+
+
+def get_cache():
+    """Cache alias used for mood data (MOOD_CACHE_ALIAS, 'default' unless configured)"""
+    return caches[getattr(settings, 'MOOD_CACHE_ALIAS', 'default')]
+
+
+def make_key(user_id, version, *parts):
+    """Versioned key for one user's computed value"""
+    return 'mood:%s:v%s:%s' % (user_id, version, ':'.join(str(part) for part in parts))
+
+
+def get_or_compute(key, compute, timeout=None):
+    """
+    Return the cached value for key, computing it on a miss.
+
+    Only one worker computes a missing key: the others wait on a short cache.add()
+    lock and poll for the result, falling back to computing themselves if the
+    lock holder takes too long or dies.
+    """
+    cache = get_cache()
+    if timeout is None:
+        timeout = getattr(settings, 'MOOD_CACHE_TIMEOUT', 3600)
+
+    value = cache.get(key, MISSING)
+    if value is not MISSING:
+        return value
+
+    lock_timeout = getattr(settings, 'MOOD_CACHE_LOCK_TIMEOUT', 10)
+    lock_key = key + ':lock'
+    if cache.add(lock_key, 1, lock_timeout):
+        try:
+            value = compute()
+            cache.set(key, value, timeout)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    # Someone else is computing this key: wait for their result
+    poll_interval = getattr(settings, 'MOOD_CACHE_POLL_INTERVAL', 0.05)
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(poll_interval)
+        value = cache.get(key, MISSING)
+        if value is not MISSING:
+            return value
+        if cache.get(lock_key) is None:
+            break  # Lock released without a value (the computation failed)
+
+    return compute()
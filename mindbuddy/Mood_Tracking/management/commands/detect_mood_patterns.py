@@ -0,0 +1,70 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from Mood_Tracking.models import MoodEntry
+from Mood_Tracking.services import MoodPatternService
+
+
+def _setup_worker():
+    """Workers open their own database connections (and set Django up when not forked)"""
+    django.setup()
+    connections.close_all()
+
+
+def _analyze_chunk(args):
+    user_ids, lookback_days, dry_run = args
+    return len(user_ids), MoodPatternService.analyze_users(user_ids, lookback_days, dry_run)
+
+
+class Command(BaseCommand):
+    help = "Detect mood patterns (weekday effects, shifts, correlations, declines) and store them as insights"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Users per query')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+        parser.add_argument('--days', type=int, default=MoodPatternService.LOOKBACK_DAYS, help='History to analyse')
+        parser.add_argument('--dry-run', action='store_true', help='Detect without writing insights')
+
+    def handle(self, *args, **options):
+        chunk_size, workers = options['chunk_size'], options['workers']
+        lookback_days, dry_run = options['days'], options['dry_run']
+        self.verbosity = options['verbosity']
+        started = time.monotonic()
+
+        since = date.today() - timedelta(days=lookback_days)
+        user_ids = sorted(
+            MoodEntry.objects.filter(date__gte=since).order_by().values_list('user_id', flat=True).distinct()
+        )
+        chunks = [
+            (user_ids[start:start + chunk_size], lookback_days, dry_run)
+            for start in range(0, len(user_ids), chunk_size)
+        ]
+
+        if workers > 1 and len(chunks) > 1:
+            # Forked children must not share the parent's database sockets
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_setup_worker) as executor:
+                results = executor.map(_analyze_chunk, chunks)
+                processed, found = self._collect(results, len(user_ids))
+        else:
+            processed, found = self._collect(map(_analyze_chunk, chunks), len(user_ids))
+
+        verb = 'Found' if dry_run else 'Stored'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {found} pattern insights for {processed} users in {time.monotonic() - started:.1f}s"
+        ))
+
+    def _collect(self, results, total):
+        processed = found = 0
+        for chunk_users, chunk_found in results:
+            processed += chunk_users
+            found += chunk_found
+            if self.verbosity > 1:
+                self.stdout.write(f"  {processed}/{total} users, {found} patterns")
+        return processed, found
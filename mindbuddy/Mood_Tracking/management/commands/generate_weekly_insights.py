@@ -0,0 +1,68 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from Mood_Tracking.models import MoodEntry
+from Mood_Tracking.services import MoodService
+
+
+def _setup_worker():
+    """Workers open their own database connections (and set Django up when not forked)"""
+    django.setup()
+    connections.close_all()
+
+
+def _generate_chunk(args):
+    user_ids, week_start = args
+    return MoodService.generate_weekly_insights(user_ids, week_start)
+
+
+class Command(BaseCommand):
+    help = "Create weekly mood summary insights for every user with entries in the week (safe to rerun)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--week', help='ISO week to summarise, e.g. 2025-W07 (default: last completed week)')
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Users per grouped query')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Worker processes')
+        parser.add_argument('--shard', type=int, default=0, help='Shard handled by this run (0-based)')
+        parser.add_argument('--shards', type=int, default=1, help='Total shards when splitting across machines')
+
+    def handle(self, *args, **options):
+        week_start = self._parse_week(options['week'])
+        chunk_size, workers = options['chunk_size'], options['workers']
+        shard, shards = options['shard'], options['shards']
+        if not 0 <= shard < shards:
+            raise CommandError('--shard must be between 0 and --shards - 1')
+
+        user_ids = sorted(set(
+            MoodEntry.objects.filter(
+                date__range=[week_start, week_start + timedelta(days=6)]
+            ).order_by().values_list('user_id', flat=True).distinct()
+        ))
+        user_ids = [user_id for user_id in user_ids if hash(user_id) % shards == shard]
+        chunks = [(user_ids[start:start + chunk_size], week_start) for start in range(0, len(user_ids), chunk_size)]
+
+        if workers > 1 and len(chunks) > 1:
+            # Forked children must not share the parent's database sockets
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=workers, initializer=_setup_worker) as executor:
+                created = sum(executor.map(_generate_chunk, chunks))
+        else:
+            created = sum(map(_generate_chunk, chunks))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {created} weekly insights for the week of {week_start} "
+            f"({len(user_ids) - created} users already had one)"
+        ))
+
+    def _parse_week(self, value):
+        if not value:
+            return MoodService.last_completed_week()
+        try:
+            return date.fromisocalendar(int(value[:4]), int(value.split('W')[1]), 1)
+        except (ValueError, IndexError):
+            raise CommandError(f"Invalid week '{value}', expected YYYY-Www")
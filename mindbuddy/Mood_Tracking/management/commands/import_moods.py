@@ -0,0 +1,51 @@
+import csv
+import sys
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from Mood_Tracking.services import MoodImportService
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Import mood entries for a user from a CSV, JSON array or JSON Lines file ('-' for stdin)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import, or '-' to read stdin")
+        parser.add_argument('--user', required=True, help='Name of the user the entries belong to')
+        parser.add_argument('--format', choices=['csv', 'json'], help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=MoodImportService.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(name=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User '{options['user']}' does not exist")
+
+        path = options['path']
+        file_format = options['format'] or ('csv' if path.lower().endswith('.csv') else 'json')
+
+        stream = sys.stdin if path == '-' else open(path, encoding='utf-8-sig', newline='')
+        try:
+            if file_format == 'csv':
+                rows = MoodImportService.parse_csv(stream)
+            else:
+                rows = MoodImportService.parse_json(stream)
+            result = MoodImportService.import_rows(user, rows, batch_size=options['batch_size'])
+        except (ValueError, csv.Error) as e:
+            raise CommandError(f"Could not parse {path}: {e}")
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        for error in result['errors']:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
+        if result['skipped'] > len(result['errors']):
+            self.stderr.write(f"... and {result['skipped'] - len(result['errors'])} more invalid rows")
+        
+        summary = f"Imported {result['imported']} entries for {user.name} ({result['skipped']} rows skipped)"
+        if result['parse_error']:
+            raise CommandError(f"{summary}, then stopped: could not parse {path}: {result['parse_error']}")
+        self.stdout.write(self.style.SUCCESS(summary))
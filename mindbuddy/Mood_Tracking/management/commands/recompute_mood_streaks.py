@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from Mood_Tracking.models import MoodEntry, MoodStreak
+from Mood_Tracking.services import MoodService
+
+
+class Command(BaseCommand):
+    help = "Repair MoodStreak rows (current/longest streak, total entries) from mood entries"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help='Users per window query')
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        user_ids = sorted(
+            set(MoodEntry.objects.values_list('user_id', flat=True).distinct())
+            | set(MoodStreak.objects.values_list('user_id', flat=True))
+        )
+
+        repaired = 0
+        for start in range(0, len(user_ids), chunk_size):
+            repaired += MoodService.recompute_streaks(user_ids[start:start + chunk_size])
+
+        self.stdout.write(self.style.SUCCESS(f"Recomputed streaks for {repaired} users"))
@@ -0,0 +1,32 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from Mood_Tracking.notifiers import get_notifier
+from Mood_Tracking.services import MoodReminderService
+
+
+class Command(BaseCommand):
+    help = "Remind every active user who has not logged a mood today"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, default=None, help='Day to check (default: today)')
+        parser.add_argument('--batch-size', type=int, default=MoodReminderService.BATCH_SIZE)
+        parser.add_argument('--notifier', help='Dotted path of a notifier class (default: MOOD_REMINDER_NOTIFIER)')
+        parser.add_argument('--dry-run', action='store_true', help='Count candidates without notifying')
+
+    def handle(self, *args, **options):
+        day = options['date'] or date.today()
+        started = time.monotonic()
+
+        if options['dry_run']:
+            found = sum(len(batch) for batch in MoodReminderService.candidate_batches(day, options['batch_size']))
+            sent = 0
+        else:
+            notifier = get_notifier(options['notifier'])
+            found, sent = MoodReminderService.send(notifier, day, options['batch_size'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{found} users without a mood for {day}; {sent} reminders sent in {time.monotonic() - started:.2f}s"
+        ))
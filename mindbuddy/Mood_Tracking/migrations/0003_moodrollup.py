@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mood_Tracking', '0002_alter_moodentry_created_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MoodRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(choices=[('week', 'Week'), ('month', 'Month')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('entry_count', models.IntegerField(default=0)),
+                ('mood_sum', models.IntegerField(default=0)),
+                ('mood_sum_sq', models.IntegerField(default=0)),
+                ('energy_count', models.IntegerField(default=0)),
+                ('energy_sum', models.IntegerField(default=0)),
+                ('energy_sum_sq', models.IntegerField(default=0)),
+                ('anxiety_count', models.IntegerField(default=0)),
+                ('anxiety_sum', models.IntegerField(default=0)),
+                ('anxiety_sum_sq', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mood_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['period_start'],
+                'unique_together': {('user', 'period', 'period_start')},
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mood_Tracking', '0004_mooddataversion'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='moodinsight',
+            name='period_key',
+            field=models.CharField(blank=True, default='', max_length=10),
+        ),
+        migrations.AddConstraint(
+            model_name='moodinsight',
+            constraint=models.UniqueConstraint(condition=models.Q(('period_key', ''), _negated=True), fields=('user', 'insight_type', 'period_key'), name='unique_mood_insight_per_period'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Mood_Tracking', '0005_moodinsight_period_key'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='moodinsight',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['user'], name='mood_insight_unread_idx'),
+        ),
+    ]
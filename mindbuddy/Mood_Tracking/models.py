@@ -58,7 +58,7 @@ class MoodEntry(models.Model):
     notes = models.TextField(blank=True, max_length=500)
     
     # Metadata
-    created_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
     
     class Meta:
@@ -96,11 +96,63 @@ class MoodInsight(models.Model):
     title = models.CharField(max_length=200)
     description = models.TextField()
     data = models.JSONField(default=dict)  # Store insight data/metrics
-    date_generated = models.DateTimeField(auto_now_add=True)
+    date_generated = models.DateTimeField(auto_now_add=True, db_index=True)
     is_read = models.BooleanField(default=False)
+    period_key = models.CharField(max_length=10, blank=True, default='')  # e.g. ISO week "2025-W07" for periodic insights
     
     class Meta:
         ordering = ['-date_generated']
+        constraints = [
+            # At most one periodic insight of each type per user and period
+            models.UniqueConstraint(
+                fields=['user', 'insight_type', 'period_key'],
+                condition=~models.Q(period_key=''),
+                name='unique_mood_insight_per_period'
+            ),
+        ]
+        indexes = [
+            # Small index covering only unread rows: unread counts stay cheap as history grows
+            models.Index(fields=['user'], condition=models.Q(is_read=False), name='mood_insight_unread_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.user.name} - {self.title}" 
+class MoodRollup(models.Model):
+    """Per-user weekly/monthly mood aggregates, maintained incrementally on every entry write"""
+    PERIOD_CHOICES = [
+        ('week', 'Week'),
+        ('month', 'Month'),
+    ]
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='mood_rollups')
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    period_start = models.DateField()  # Monday of the ISO week / first day of the month
+    
+    # count, sum and sum of squares give mean and variance without touching entries
+    entry_count = models.IntegerField(default=0)
+    mood_sum = models.IntegerField(default=0)
+    mood_sum_sq = models.IntegerField(default=0)
+    energy_count = models.IntegerField(default=0)
+    energy_sum = models.IntegerField(default=0)
+    energy_sum_sq = models.IntegerField(default=0)
+    anxiety_count = models.IntegerField(default=0)
+    anxiety_sum = models.IntegerField(default=0)
+    anxiety_sum_sq = models.IntegerField(default=0)
+    
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        unique_together = ['user', 'period', 'period_start']
+        ordering = ['period_start']
+    
+    def __str__(self):
+        return f"{self.user.name} - {self.period} of {self.period_start}"
+
+class MoodDataVersion(models.Model):
+    """Per-user counter bumped on every mood write; read endpoints derive their ETag from it"""
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='mood_data_version')
+    version = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(default=timezone.now)
     
     def __str__(self):
-        return f"{self.user.name} - {self.title}" 
\ No newline at end of file
+        return f"{self.user.name} - v{self.version}"
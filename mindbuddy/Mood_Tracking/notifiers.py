@@ -0,0 +1,59 @@
+"""
+Notifiers for daily mood reminders.
+
+A notifier receives batches of (user_id, name) pairs and returns how many reminders it
+sent. The class is chosen with the MOOD_REMINDER_NOTIFIER setting (a dotted path), so a
+push or email integration can be dropped in without touching the reminder query.
+"""
+import json
+import sys
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+DEFAULT_NOTIFIER = 'Mood_Tracking.notifiers.ConsoleNotifier'
+REMINDER_MESSAGE = "How are you feeling today? Take a moment to log your mood."
+
+
+class BaseNotifier:
+    """Interface for reminder delivery"""
+
+    def notify(self, users, day):
+        """Send reminders to a batch of (user_id, name) pairs; returns the number sent"""
+        raise NotImplementedError
+
+
+class ConsoleNotifier(BaseNotifier):
+    """Writes one line per reminder to a stream (stdout by default); for development"""
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def notify(self, users, day):
+        self.stream.write(''.join(f"[{day}] reminder -> {name} ({user_id})\n" for user_id, name in users))
+        return len(users)
+
+
+class FileNotifier(BaseNotifier):
+    """Appends reminders as JSON lines to MOOD_REMINDER_FILE; handy for tests and auditing"""
+
+    def __init__(self, path=None):
+        self.path = path or getattr(settings, 'MOOD_REMINDER_FILE', 'mood_reminders.jsonl')
+
+    def notify(self, users, day):
+        sent_at = timezone.now().isoformat()
+        with open(self.path, 'a', encoding='utf-8') as reminders:
+            reminders.writelines(
+                json.dumps({
+                    'user_id': user_id, 'name': name, 'date': day.isoformat(),
+                    'message': REMINDER_MESSAGE, 'sent_at': sent_at
+                }) + '\n'
+                for user_id, name in users
+            )
+        return len(users)
+
+
+def get_notifier(path=None):
+    """Instantiate the notifier class at path (default: the MOOD_REMINDER_NOTIFIER setting)"""
+    return import_string(path or getattr(settings, 'MOOD_REMINDER_NOTIFIER', DEFAULT_NOTIFIER))()
@@ -0,0 +1,203 @@
+"""
+Vectorized mood pattern detectors.
+
+Every detector works on one user's series as NumPy arrays (ordinal dates plus mood,
+energy and anxiety as floats with NaN for missing values) and returns a list of
+pattern dicts. Nothing here touches the database, so detectors are cheap to run
+in worker processes and easy to reason about in isolation.
+"""
+import numpy as np
+from datetime import date
+
+WEEKDAYS = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+
+# Minimum entries before any pattern is reported
+MIN_ENTRIES = 14
+
+# Day-of-week: a day needs this many entries and must differ from the overall mean by this much
+WEEKDAY_MIN_ENTRIES = 3
+WEEKDAY_MIN_DIFFERENCE = 0.75
+
+# Mean shift: adjacent windows of this many entries, a minimum difference and t-statistic
+SHIFT_WINDOW = 14
+SHIFT_MIN_DIFFERENCE = 0.75
+SHIFT_MIN_T = 3.0
+
+# Correlation: minimum paired entries and |r|
+CORRELATION_MIN_PAIRS = 14
+CORRELATION_MIN_R = 0.5
+
+# Sustained decline: trend over the last DECLINE_DAYS days
+DECLINE_DAYS = 21
+DECLINE_MIN_ENTRIES = 10
+DECLINE_MIN_DROP = 1.0
+DECLINE_MAX_R = -0.5
+
+
+def build_series(rows):
+    """Arrays from (date, mood_rating, energy_level, anxiety_level) rows ordered by date"""
+    if not rows:
+        empty = np.empty(0)
+        return {'ordinals': empty.astype(np.int64), 'mood': empty, 'energy': empty, 'anxiety': empty}
+
+    dates, mood, energy, anxiety = zip(*rows)
+    return {
+        'ordinals': np.fromiter((d.toordinal() for d in dates), dtype=np.int64, count=len(dates)),
+        'mood': np.asarray(mood, dtype=np.float64),
+        'energy': np.asarray([np.nan if v is None else v for v in energy], dtype=np.float64),
+        'anxiety': np.asarray([np.nan if v is None else v for v in anxiety], dtype=np.float64),
+    }
+
+
+def detect_patterns(series):
+    """Run every detector on one user's series"""
+    if len(series['mood']) < MIN_ENTRIES:
+        return []
+
+    patterns = []
+    patterns.extend(detect_day_of_week(series['ordinals'], series['mood']))
+    patterns.extend(detect_mean_shift(series['ordinals'], series['mood']))
+    patterns.extend(detect_correlation(series['mood'], series['energy'], 'energy'))
+    patterns.extend(detect_correlation(series['mood'], series['anxiety'], 'anxiety'))
+    patterns.extend(detect_sustained_decline(series['ordinals'], series['mood']))
+    return patterns
+
+
+def detect_day_of_week(ordinals, mood):
+    """Weekdays whose average mood stands out from the user's overall average"""
+    weekday = (ordinals - 1) % 7  # date.fromordinal(1) is a Monday
+    counts = np.bincount(weekday, minlength=7)
+    sums = np.bincount(weekday, weights=mood, minlength=7)
+
+    overall = mood.mean()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(counts >= WEEKDAY_MIN_ENTRIES, sums / counts, np.nan)
+    differences = means - overall
+    if np.all(np.isnan(differences)):
+        return []
+
+    patterns = []
+    for index, direction in ((np.nanargmin(differences), 'low'), (np.nanargmax(differences), 'high')):
+        difference = differences[index]
+        if abs(difference) < WEEKDAY_MIN_DIFFERENCE or (difference < 0) != (direction == 'low'):
+            continue
+        day = WEEKDAYS[index]
+        patterns.append({
+            'pattern': 'day_of_week',
+            'signature': f"day_of_week:{day.lower()}:{direction}",
+            'title': f"{day}s tend to be {'harder' if direction == 'low' else 'brighter'}",
+            'description': (
+                f"Your average mood on {day}s is {means[index]:.1f}/5 compared with "
+                f"{overall:.1f}/5 overall."
+            ),
+            'data': {
+                'weekday': day,
+                'weekday_average': round(float(means[index]), 2),
+                'overall_average': round(float(overall), 2),
+                'entries': int(counts[index]),
+            },
+        })
+    return patterns
+
+
+def detect_mean_shift(ordinals, mood, window=SHIFT_WINDOW):
+    """Most significant change point: the largest jump between adjacent rolling-window means"""
+    n = len(mood)
+    if n < 2 * window:
+        return []
+
+    # Rolling sums from cumulative sums give every window mean and variance at once
+    padded = np.concatenate(([0.0], np.cumsum(mood)))
+    padded_sq = np.concatenate(([0.0], np.cumsum(mood ** 2)))
+    sums = padded[window:] - padded[:-window]
+    sums_sq = padded_sq[window:] - padded_sq[:-window]
+    means = sums / window
+    variances = np.maximum(sums_sq / window - means ** 2, 0.0)
+
+    # Window i covers entries [i, i + window); compare it with the window right after it
+    before, after = means[:-window], means[window:]
+    pooled = np.sqrt((variances[:-window] + variances[window:]) / 2) + 0.25  # floor for flat series
+    differences = after - before
+    t_values = np.abs(differences) / (pooled * np.sqrt(2.0 / window))
+
+    index = int(np.argmax(t_values))
+    difference = differences[index]
+    if abs(difference) < SHIFT_MIN_DIFFERENCE or t_values[index] < SHIFT_MIN_T:
+        return []
+
+    change_date = date.fromordinal(int(ordinals[index + window]))
+    direction = 'up' if difference > 0 else 'down'
+    year, week, _ = change_date.isocalendar()
+    return [{
+        'pattern': 'mean_shift',
+        'signature': f"mean_shift:{year}-W{week:02d}:{direction}",  # Stable when the estimate wobbles a day
+        'title': 'Your mood lifted' if direction == 'up' else 'Your mood dipped',
+        'description': (
+            f"Around {change_date:%B %d} your average mood moved from {before[index]:.1f} "
+            f"to {after[index]:.1f} and stayed there."
+        ),
+        'data': {
+            'change_date': change_date.isoformat(),
+            'average_before': round(float(before[index]), 2),
+            'average_after': round(float(after[index]), 2),
+            't_value': round(float(t_values[index]), 2),
+        },
+    }]
+
+
+def detect_correlation(mood, other, name):
+    """Strong Pearson correlation between mood and another metric"""
+    mask = ~np.isnan(other)
+    if mask.sum() < CORRELATION_MIN_PAIRS:
+        return []
+
+    x, y = mood[mask], other[mask]
+    if x.std() == 0 or y.std() == 0:
+        return []
+
+    r = float(np.corrcoef(x, y)[0, 1])
+    if abs(r) < CORRELATION_MIN_R:
+        return []
+
+    sign = 'positive' if r > 0 else 'negative'
+    relation = 'rises' if r > 0 else 'falls'
+    return [{
+        'pattern': 'correlation',
+        'signature': f"correlation:{name}:{sign}",
+        'title': f"Mood and {name} move together",
+        'description': f"When your {name} level is higher, your mood usually {relation} too (r = {r:.2f}).",
+        'data': {'metric': name, 'r': round(r, 2), 'pairs': int(mask.sum())},
+    }]
+
+
+def detect_sustained_decline(ordinals, mood, days=DECLINE_DAYS):
+    """A steady downward trend over the most recent days"""
+    recent = ordinals >= ordinals[-1] - days + 1
+    if recent.sum() < DECLINE_MIN_ENTRIES:
+        return []
+
+    x = ordinals[recent].astype(np.float64)
+    y = mood[recent]
+    x -= x.mean()
+    denominator = np.sqrt((x ** 2).sum() * ((y - y.mean()) ** 2).sum())
+    if denominator == 0:
+        return []
+
+    slope = float((x * (y - y.mean())).sum() / (x ** 2).sum())
+    r = float((x * (y - y.mean())).sum() / denominator)
+    drop = -slope * (days - 1)
+    if drop < DECLINE_MIN_DROP or r > DECLINE_MAX_R:
+        return []
+
+    end_date = date.fromordinal(int(ordinals[-1]))
+    year, week, _ = end_date.isocalendar()
+    return [{
+        'pattern': 'sustained_decline',
+        'signature': f"sustained_decline:{year}-W{week:02d}",
+        'title': 'Your mood has been sliding',
+        'description': (
+            f"Over the last {days} days your mood has trended down by about {drop:.1f} points. "
+            "It might help to check in with someone you trust."
+        ),
+        'data': {'days': days, 'drop': round(drop, 2), 'r': round(r, 2), 'end_date': end_date.isoformat()},
+    }]
@@ -17,6 +17,40 @@ class MoodEntrySerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
+MOOD_ENTRY_FIELDS = (
+    'id', 'date', 'mood_rating', 'mood_display',
+    'energy_level', 'energy_display', 'anxiety_level', 'anxiety_display',
+    'notes', 'created_at', 'updated_at'
+)
+MOOD_ENTRY_COLUMNS = (
+    'id', 'date', 'mood_rating', 'energy_level', 'anxiety_level', 'notes', 'created_at', 'updated_at'
+)
+MOOD_DISPLAY = dict(MoodEntry.MOOD_CHOICES)
+ENERGY_DISPLAY = dict(MoodEntry.ENERGY_LEVELS)
+ANXIETY_DISPLAY = dict(MoodEntry.ANXIETY_LEVELS)
+
+
+def _display(lookup, value):
+    # Mirrors get_FOO_display(): unknown values fall back to the raw value, None stays None
+    if value is None:
+        return None
+    return str(lookup.get(value, value))
+
+
+def fast_mood_entry_data(queryset):
+    """MoodEntrySerializer(many=True).data equivalent built straight from .values_list()"""
+    return [
+        dict(zip(MOOD_ENTRY_FIELDS, (
+            entry_id, entry_date,
+            mood, _display(MOOD_DISPLAY, mood),
+            energy, _display(ENERGY_DISPLAY, energy),
+            anxiety, _display(ANXIETY_DISPLAY, anxiety),
+            notes, created_at, updated_at
+        )))
+        for entry_id, entry_date, mood, energy, anxiety, notes, created_at, updated_at
+        in queryset.values_list(*MOOD_ENTRY_COLUMNS)
+    ]
+
 class MoodEntryCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = MoodEntry
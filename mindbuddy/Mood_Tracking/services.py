@@ -1,16 +1,31 @@
-from django.db.models import Avg, Count, Q
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Avg, Count, Q, F, Sum, Min, Max
+from django.db.models import Window, Exists, OuterRef
+from django.contrib.auth import get_user_model
+from django.db.models.functions import TruncWeek, TruncMonth, RowNumber
 from django.utils import timezone
-from datetime import date, timedelta
-from .models import MoodEntry, MoodStreak, MoodInsight
+from datetime import date, datetime, time, timedelta
+from .models import MoodEntry, MoodStreak, MoodInsight, MoodRollup, MoodDataVersion
+from .serializers import MoodStreakSerializer, fast_mood_entry_data
+from . import caching, patterns
+import csv
+import hashlib
+import io
 import json
+import math
+from itertools import groupby
+from operator import itemgetter
 
 class MoodService:
     """Service for mood-related business logic"""
     
+    MILESTONES = [7, 30, 100]
+    
     @staticmethod
     def update_streak(user, entry_date):
-        """Update user's mood streak after logging an entry"""
-        streak, created = MoodStreak.objects.get_or_create(
+        """Update user's mood streak after logging a new entry"""
+        MoodStreak.objects.get_or_create(
             user=user,
             defaults={
                 'current_streak': 0,
@@ -19,108 +34,221 @@ class MoodService:
             }
         )
         
-        today = date.today()
-        yesterday = today - timedelta(days=1)
-        
-        # Update total entries
-        streak.total_entries = MoodEntry.objects.filter(user=user).count()
-        
-        if entry_date == today:
-            # Logging for today
-            if streak.last_check_in == yesterday:
-                # Continuing streak
-                streak.current_streak += 1
-            elif streak.last_check_in == today:
-                # Already logged today, no streak change
-                pass
-            else:
-                # Starting new streak
-                streak.current_streak = 1
+        with transaction.atomic():
+            MoodStreak.objects.filter(user=user).update(total_entries=F('total_entries') + 1)
+            streak = MoodStreak.objects.select_for_update().get(user=user)
+            last_check_in = streak.last_check_in
+            previous_current = streak.current_streak
             
-            streak.last_check_in = today
-            
-        elif entry_date == yesterday and streak.last_check_in != yesterday:
-            # Logging for yesterday
-            if streak.last_check_in == entry_date - timedelta(days=1):
+            if last_check_in is None or entry_date > last_check_in + timedelta(days=1):
+                # Starting a new streak
+                streak.current_streak = 1
+                streak.last_check_in = entry_date
+            elif entry_date == last_check_in + timedelta(days=1):
+                # Continuing streak
                 streak.current_streak += 1
+                streak.last_check_in = entry_date
             else:
-                streak.current_streak = 1
+                # Backfilled day: it may extend or bridge earlier runs
+                MoodService._recompute_around(streak, entry_date)
             
-            streak.last_check_in = entry_date
+            streak.longest_streak = max(streak.longest_streak, streak.current_streak)
+            streak.save(update_fields=['current_streak', 'longest_streak', 'last_check_in', 'updated_at'])
         
-        # Update longest streak
-        if streak.current_streak > streak.longest_streak:
-            streak.longest_streak = streak.current_streak
-            
-            # Generate milestone insight
-            if streak.current_streak in [7, 30, 100]:
-                MoodInsight.objects.create(
-                    user=user,
-                    insight_type='milestone',
-                    title=f"{streak.current_streak} Day Streak!",
-                    description=f"Congratulations! You've maintained a {streak.current_streak}-day mood logging streak.",
-                    data={'streak_length': streak.current_streak}
-                )
+        # Generate milestone insight
+        if streak.current_streak > previous_current and streak.current_streak in MoodService.MILESTONES:
+            MoodInsight.objects.create(
+                user=user,
+                insight_type='milestone',
+                title=f"{streak.current_streak} Day Streak!",
+                description=f"Congratulations! You've maintained a {streak.current_streak}-day mood logging streak.",
+                data={'streak_length': streak.current_streak}
+            )
         
-        streak.save()
+        MoodVersionService.bump(user.pk)
         return streak
     
+    @staticmethod
+    def _recompute_around(streak, entry_date):
+        """Gaps-and-islands over the bounded window that can touch entry_date"""
+        # Neighbouring runs are at most longest_streak long, so this window holds them whole
+        reach = timedelta(days=streak.longest_streak + 1)
+        window_end = min(streak.last_check_in, entry_date + reach)
+        rows = MoodEntry.objects.filter(
+            user_id=streak.user_id,
+            date__range=[entry_date - reach, window_end]
+        ).annotate(
+            row_number=Window(RowNumber(), order_by=F('date').asc())
+        ).order_by('date').values_list('date', 'row_number')
+        
+        for island in MoodService._islands(rows):
+            if island['start'] <= entry_date <= island['end']:
+                streak.longest_streak = max(streak.longest_streak, island['length'])
+                if island['end'] == streak.last_check_in:
+                    streak.current_streak = island['length']
+                break
+    
+    @staticmethod
+    def _islands(rows):
+        """Group (date, row_number) rows ordered by date into runs of consecutive days"""
+        islands = []
+        current_key = None
+        for entry_date, row_number in rows:
+            # Consecutive days share date - row_number
+            key = entry_date.toordinal() - row_number
+            if key != current_key:
+                islands.append({'start': entry_date, 'end': entry_date, 'length': 0})
+                current_key = key
+            islands[-1]['end'] = entry_date
+            islands[-1]['length'] += 1
+        return islands
+    
+    @staticmethod
+    def recompute_streaks(user_ids):
+        """Rebuild MoodStreak rows for user_ids from their full history in one window query"""
+        rows = MoodEntry.objects.filter(user_id__in=user_ids).annotate(
+            row_number=Window(RowNumber(), partition_by=[F('user_id')], order_by=F('date').asc())
+        ).order_by('user_id', 'date').values_list('user_id', 'date', 'row_number')
+        
+        rows_by_user = {user_id: [] for user_id in user_ids}
+        for user_id, entry_date, row_number in rows:
+            rows_by_user[user_id].append((entry_date, row_number))
+        
+        existing = {streak.user_id: streak for streak in MoodStreak.objects.filter(user_id__in=user_ids)}
+        to_create, to_update = [], []
+        
+        for user_id, user_rows in rows_by_user.items():
+            islands = MoodService._islands(user_rows)
+            streak = existing.get(user_id) or MoodStreak(user_id=user_id)
+            streak.total_entries = len(user_rows)
+            streak.current_streak = islands[-1]['length'] if islands else 0
+            streak.longest_streak = max((island['length'] for island in islands), default=0)
+            streak.last_check_in = islands[-1]['end'] if islands else None
+            (to_update if streak.pk else to_create).append(streak)
+        
+        with transaction.atomic():
+            MoodStreak.objects.bulk_create(to_create)
+            MoodStreak.objects.bulk_update(
+                to_update, ['total_entries', 'current_streak', 'longest_streak', 'last_check_in']
+            )
+            MoodVersionService.bump_many(user_ids)
+        
+        return len(to_create) + len(to_update)
+    
     @staticmethod
     def generate_weekly_insight(user):
-        """Generate weekly mood insights"""
-        end_date = date.today()
-        start_date = end_date - timedelta(days=7)
+        """Generate the user's insight for the last completed week (idempotent)"""
+        return MoodService.generate_weekly_insights([user.pk])
+    
+    @staticmethod
+    def last_completed_week(today=None):
+        """Monday of the most recent full ISO week before today"""
+        today = today or date.today()
+        return today - timedelta(days=today.weekday() + 7)
+    
+    @staticmethod
+    def generate_weekly_insights(user_ids, week_start=None):
+        """Weekly summaries for a chunk of users from one grouped query; returns insights created"""
+        week_start = week_start or MoodService.last_completed_week()
+        week_end = week_start + timedelta(days=6)
+        year, week, _ = week_start.isocalendar()
+        period_key = f"{year}-W{week:02d}"
         
-        entries = MoodEntry.objects.filter(
-            user=user,
-            date__range=[start_date, end_date]
+        rows = MoodEntry.objects.filter(
+            user_id__in=user_ids, date__range=[week_start, week_end]
+        ).order_by().values('user_id').annotate(
+            avg_mood=Avg('mood_rating'),
+            avg_energy=Avg('energy_level'),
+            avg_anxiety=Avg('anxiety_level'),
+            entries_count=Count('id')
         )
         
-        if entries.exists():
-            avg_mood = entries.aggregate(Avg('mood_rating'))['mood_rating__avg']
-            avg_energy = entries.aggregate(Avg('energy_level'))['energy_level__avg'] or 0
-            avg_anxiety = entries.aggregate(Avg('anxiety_level'))['anxiety_level__avg'] or 0
-            
-            # Create insight
-            MoodInsight.objects.create(
-                user=user,
+        insights = [
+            MoodInsight(
+                user_id=row['user_id'],
                 insight_type='weekly_average',
+                period_key=period_key,
                 title="Weekly Mood Summary",
-                description=f"Your average mood this week was {avg_mood:.1f}/5. Keep tracking to see your patterns!",
+                description=(
+                    f"Your average mood for the week of {week_start:%B %d} was {row['avg_mood']:.1f}/5. "
+                    "Keep tracking to see your patterns!"
+                ),
                 data={
-                    'avg_mood': round(avg_mood, 2),
-                    'avg_energy': round(avg_energy, 2),
-                    'avg_anxiety': round(avg_anxiety, 2),
-                    'entries_count': entries.count()
+                    'avg_mood': round(row['avg_mood'], 2),
+                    'avg_energy': round(row['avg_energy'] or 0, 2),
+                    'avg_anxiety': round(row['avg_anxiety'] or 0, 2),
+                    'entries_count': row['entries_count'],
+                    'week_start': week_start.isoformat()
                 }
             )
+            for row in rows
+        ]
+        if not insights:
+            return 0
+        
+        # The (user, type, period_key) constraint makes reruns and overlapping workers no-ops.
+        # Ids are generated client-side, so the rows that survived the conflict check are
+        # exactly the ones still found under this batch's ids.
+        with transaction.atomic():
+            MoodInsight.objects.bulk_create(insights, batch_size=1000, ignore_conflicts=True)
+            created = list(MoodInsight.objects.filter(
+                id__in=[insight.id for insight in insights]
+            ).values_list('user_id', flat=True))
+            MoodVersionService.bump_many(created)
+        return len(created)
     
     @staticmethod
     def get_mood_chart_data(user, days=30):
         """Get mood chart data for specified number of days"""
+        chart_data, _ = MoodService.get_cached_history(user, days, 'day')
+        return chart_data
+    
+    @staticmethod
+    def get_cached_history(user, days, granularity='day', version=None):
+        """(chart_data, stats) from the per-user cache, computed once per data version and day"""
+        if version is None:
+            version, _ = MoodVersionService.get(user.pk)
+        
+        # Rows are gap-filled up to today, so the date is part of the key too
+        key = caching.make_key(user.pk, version, 'history', days, granularity, date.today())
+        if granularity == 'day':
+            return caching.get_or_compute(key, lambda: MoodService.get_mood_history(user, days))
+        return caching.get_or_compute(key, lambda: MoodService.get_bucketed_history(user, days, granularity))
+    
+    @staticmethod
+    def get_mood_history(user, days=30):
+        """Gap-filled chart data and its statistics from a single query"""
         end_date = date.today()
         start_date = end_date - timedelta(days=days-1)
         
-        # Get all entries in range
-        entries = MoodEntry.objects.filter(
-            user=user,
-            date__range=[start_date, end_date]
-        ).order_by('date')
-        
-        # Create complete date range with mood data
+        # One query for the whole range, indexed by date for gap filling
+        entries_by_date = {
+            entry['date']: entry
+            for entry in MoodEntry.objects.filter(
+                user=user,
+                date__range=[start_date, end_date]
+            ).values('date', 'mood_rating', 'energy_level', 'anxiety_level', 'notes')
+        }
+        return MoodService._gap_fill(entries_by_date, start_date, days)
+    
+    @staticmethod
+    def _gap_fill(entries_by_date, start_date, days):
+        """One chart row per day from start_date (None for missing days) plus statistics"""
         chart_data = []
-        current_date = start_date
+        mood_ratings = []
         
-        while current_date <= end_date:
-            entry = entries.filter(date=current_date).first()
+        for offset in range(days):
+            current_date = start_date + timedelta(days=offset)
+            entry = entries_by_date.get(current_date)
             
             if entry:
+                mood_ratings.append(entry['mood_rating'])
                 chart_data.append({
                     'date': current_date,
-                    'mood_rating': entry.mood_rating,
-                    'energy_level': entry.energy_level or 0,
-                    'anxiety_level': entry.anxiety_level or 0,
-                    'notes': entry.notes,
+                    'mood_rating': entry['mood_rating'],
+                    'energy_level': entry['energy_level'] or 0,
+                    'anxiety_level': entry['anxiety_level'] or 0,
+                    'notes': entry['notes'],
                     'has_entry': True
                 })
             else:
@@ -132,7 +260,827 @@ class MoodService:
                     'notes': '',
                     'has_entry': False
                 })
+        
+        stats = {}
+        if mood_ratings:
+            stats = {
+                'total_entries': len(mood_ratings),
+                'average_mood': sum(mood_ratings) / len(mood_ratings),
+                'best_mood': max(mood_ratings),
+                'worst_mood': min(mood_ratings),
+                'tracking_percentage': (len(mood_ratings) / days) * 100
+            }
+        
+        return chart_data, stats
+    
+    @staticmethod
+    def resolve_granularity(granularity, days):
+        """Pick a bucket size for 'auto' so the point count stays bounded"""
+        if granularity != 'auto':
+            return granularity
+        if days <= 90:
+            return 'day'
+        if days <= 730:
+            return 'week'
+        return 'month'
+    
+    @staticmethod
+    def get_bucketed_history(user, days, granularity):
+        """Per week/month mean, min, max and count aggregated in the database, gap-filled"""
+        end_date = date.today()
+        start_date = end_date - timedelta(days=days-1)
+        truncate = MoodRollupService.TRUNCATES[granularity]
+        
+        buckets = {
+            row['bucket']: row
+            for row in MoodEntry.objects.filter(
+                user=user,
+                date__range=[start_date, end_date]
+            ).order_by().annotate(bucket=truncate('date')).values('bucket').annotate(
+                mood_avg=Avg('mood_rating'),
+                mood_min=Min('mood_rating'),
+                mood_max=Max('mood_rating'),
+                energy_avg=Avg('energy_level'),
+                anxiety_avg=Avg('anxiety_level'),
+                entry_count=Count('id')
+            )
+        }
+        
+        chart_data = []
+        total_entries = 0
+        mood_total = 0
+        best_mood = None
+        worst_mood = None
+        
+        bucket_start = dict(MoodRollupService.period_starts(start_date))[granularity]
+        while bucket_start <= end_date:
+            row = buckets.get(bucket_start)
             
-            current_date += timedelta(days=1)
+            if row:
+                total_entries += row['entry_count']
+                mood_total += row['mood_avg'] * row['entry_count']
+                best_mood = row['mood_max'] if best_mood is None else max(best_mood, row['mood_max'])
+                worst_mood = row['mood_min'] if worst_mood is None else min(worst_mood, row['mood_min'])
+                chart_data.append({
+                    'date': bucket_start,
+                    'mood_rating': round(row['mood_avg'], 2),
+                    'mood_min': row['mood_min'],
+                    'mood_max': row['mood_max'],
+                    'energy_level': round(row['energy_avg'] or 0, 2),
+                    'anxiety_level': round(row['anxiety_avg'] or 0, 2),
+                    'entry_count': row['entry_count'],
+                    'has_entry': True
+                })
+            else:
+                chart_data.append({
+                    'date': bucket_start,
+                    'mood_rating': None,
+                    'mood_min': None,
+                    'mood_max': None,
+                    'energy_level': None,
+                    'anxiety_level': None,
+                    'entry_count': 0,
+                    'has_entry': False
+                })
+            
+            if granularity == 'week':
+                bucket_start += timedelta(weeks=1)
+            else:
+                bucket_start = (bucket_start + timedelta(days=32)).replace(day=1)
         
-        return chart_data
+        stats = {}
+        if total_entries:
+            stats = {
+                'total_entries': total_entries,
+                'average_mood': mood_total / total_entries,
+                'best_mood': best_mood,
+                'worst_mood': worst_mood,
+                'tracking_percentage': (total_entries / days) * 100
+            }
+        
+        return chart_data, stats
+    
+    @staticmethod
+    def to_columnar(chart_data, granularity, include_dates=False):
+        """Parallel arrays for chart rows: 0 marks a missing value, notes keyed by row offset"""
+        columns = ['mood_rating', 'energy_level', 'anxiety_level']
+        if granularity != 'day':
+            columns += ['mood_min', 'mood_max', 'entry_count']
+        
+        data = {
+            'start_date': chart_data[0]['date'] if chart_data else None,
+            'step': granularity,
+            'length': len(chart_data),
+        }
+        if include_dates:
+            # Downsampled rows are not evenly spaced, so they carry their own dates
+            data['dates'] = [row['date'] for row in chart_data]
+        for column in columns:
+            data[column] = [row[column] or 0 for row in chart_data]
+        data['notes'] = {
+            offset: row['notes'] for offset, row in enumerate(chart_data) if row.get('notes')
+        }
+        
+        return data
+    
+    @staticmethod
+    def downsample_lttb(chart_data, threshold, key='mood_rating'):
+        """Largest-Triangle-Three-Buckets downsampling of logged days to `threshold` points"""
+        points = [row for row in chart_data if row['has_entry']]
+        if threshold < 3 or len(points) <= threshold:
+            return points
+        
+        x = [row['date'].toordinal() for row in points]
+        y = [row[key] for row in points]
+        bucket_size = (len(points) - 2) / (threshold - 2)
+        
+        sampled = [points[0]]
+        previous = 0
+        for i in range(threshold - 2):
+            start = int(i * bucket_size) + 1
+            end = int((i + 1) * bucket_size) + 1
+            next_end = min(int((i + 2) * bucket_size) + 1, len(points))
+            
+            # Average of the next bucket is the third vertex of the triangle
+            avg_x = sum(x[end:next_end]) / (next_end - end)
+            avg_y = sum(y[end:next_end]) / (next_end - end)
+            
+            best_index, best_area = start, -1
+            for j in range(start, end):
+                area = abs(
+                    (x[previous] - avg_x) * (y[j] - y[previous])
+                    - (x[previous] - x[j]) * (avg_y - y[previous])
+                )
+                if area > best_area:
+                    best_index, best_area = j, area
+            
+            sampled.append(points[best_index])
+            previous = best_index
+        
+        sampled.append(points[-1])
+        return sampled
+
+
+    @staticmethod
+    def get_dashboard(user):
+        """Streak, today's entry, 7-day chart and unread insight count in three queries"""
+        days = 7
+        today = date.today()
+        start_date = today - timedelta(days=days - 1)
+        
+        streak = MoodStreak.objects.filter(user=user).values(*MoodStreakSerializer.Meta.fields).first()
+        
+        # Full entry rows for the week: the chart and today's entry both come from here
+        entries_by_date = {
+            entry['date']: entry
+            for entry in fast_mood_entry_data(MoodEntry.objects.filter(user=user, date__range=[start_date, today]))
+        }
+        chart_data, stats = MoodService._gap_fill(entries_by_date, start_date, days)
+        today_entry = entries_by_date.get(today)
+        
+        return {
+            'streak': streak or {
+                'current_streak': 0,
+                'longest_streak': 0,
+                'last_check_in': None,
+                'total_entries': 0
+            },
+            'today': {'today_mood': today_entry, 'has_logged_today': today_entry is not None},
+            'mood_history': {'chart_data': chart_data, 'statistics': stats, 'period_days': days, 'granularity': 'day'},
+            'unread_insights': MoodInsightService.unread_count(user)
+        }
+    
+    @staticmethod
+    def get_cached_dashboard(user, version=None):
+        """get_dashboard() from the per-user cache, computed once per data version and day"""
+        if version is None:
+            version, _ = MoodVersionService.get(user.pk)
+        key = caching.make_key(user.pk, version, 'dashboard', date.today())
+        return caching.get_or_compute(key, lambda: MoodService.get_dashboard(user))
+
+
+class MoodInsightService:
+    """Unread counts and read state for mood insights"""
+    
+    @staticmethod
+    def unread_count(user):
+        """Number of unread insights (served by the partial unread index)"""
+        return MoodInsight.objects.filter(user=user, is_read=False).count()
+    
+    @staticmethod
+    def mark_read(user, insight_ids=None):
+        """Mark the given insights (or all of them) read with one UPDATE; returns rows changed"""
+        insights = MoodInsight.objects.filter(user=user, is_read=False)
+        if insight_ids is not None:
+            insights = insights.filter(id__in=insight_ids)
+        
+        updated = insights.update(is_read=True)
+        if updated:
+            MoodVersionService.bump(user.pk)
+        return updated
+
+
+class MoodReminderService:
+    """Finds users who have not logged today's mood and hands them to a notifier in batches"""
+    
+    BATCH_SIZE = 1000
+    
+    @staticmethod
+    def candidate_batches(day=None, batch_size=BATCH_SIZE):
+        """Yield lists of (user_id, name) for active users without an entry on day, in pk order"""
+        day = day or date.today()
+        logged = MoodEntry.objects.filter(user_id=OuterRef('pk'), date=day)
+        candidates = get_user_model().objects.filter(is_active=True).filter(~Exists(logged)).order_by('pk')
+        
+        # Keyset pagination: every batch is an index range scan starting after the last pk
+        last_pk = None
+        while True:
+            batch_queryset = candidates if last_pk is None else candidates.filter(pk__gt=last_pk)
+            batch = list(batch_queryset.values_list('pk', 'name')[:batch_size])
+            if not batch:
+                return
+            yield batch
+            last_pk = batch[-1][0]
+    
+    @staticmethod
+    def send(notifier, day=None, batch_size=BATCH_SIZE):
+        """Notify every candidate; returns (candidates found, notifications sent)"""
+        day = day or date.today()
+        found = sent = 0
+        for batch in MoodReminderService.candidate_batches(day, batch_size):
+            found += len(batch)
+            sent += notifier.notify(batch, day)
+        return found, sent
+
+
+class MoodRollupService:
+    """Keeps MoodRollup rows in step with MoodEntry writes"""
+    
+    # (column prefix, entry field, count column); mood is required so it shares entry_count
+    METRICS = [
+        ('mood', 'mood_rating', 'entry_count'),
+        ('energy', 'energy_level', 'energy_count'),
+        ('anxiety', 'anxiety_level', 'anxiety_count'),
+    ]
+    TRUNCATES = {
+        'week': TruncWeek,
+        'month': TruncMonth,
+    }
+    
+    @staticmethod
+    def period_starts(entry_date):
+        """Start of the week (Monday) and month containing entry_date"""
+        return [
+            ('week', entry_date - timedelta(days=entry_date.weekday())),
+            ('month', entry_date.replace(day=1)),
+        ]
+    
+    @staticmethod
+    def entry_values(entry):
+        """Snapshot of the fields a rollup depends on (take it before saving an update)"""
+        return {
+            'date': entry.date,
+            'mood_rating': entry.mood_rating,
+            'energy_level': entry.energy_level,
+            'anxiety_level': entry.anxiety_level,
+        }
+    
+    @staticmethod
+    def entry_created(entry):
+        MoodRollupService._apply(entry.user_id, MoodRollupService.entry_values(entry), 1)
+    
+    @staticmethod
+    def entry_updated(user_id, old_values, entry):
+        MoodRollupService._apply(user_id, old_values, -1)
+        MoodRollupService._apply(user_id, MoodRollupService.entry_values(entry), 1)
+    
+    @staticmethod
+    def entry_deleted(entry):
+        MoodRollupService._apply(entry.user_id, MoodRollupService.entry_values(entry), -1)
+    
+    @staticmethod
+    def _apply(user_id, values, sign):
+        """Add (sign=1) or remove (sign=-1) one entry's contribution with F() updates"""
+        increments = {'entry_count': F('entry_count') + sign}
+        for prefix, field, count_field in MoodRollupService.METRICS:
+            value = values[field]
+            if value is not None:
+                increments[count_field] = F(count_field) + sign
+                increments[f'{prefix}_sum'] = F(f'{prefix}_sum') + sign * value
+                increments[f'{prefix}_sum_sq'] = F(f'{prefix}_sum_sq') + sign * value * value
+        
+        with transaction.atomic():
+            for period, period_start in MoodRollupService.period_starts(values['date']):
+                MoodRollup.objects.get_or_create(user_id=user_id, period=period, period_start=period_start)
+                MoodRollup.objects.filter(
+                    user_id=user_id, period=period, period_start=period_start
+                ).update(**increments)
+    
+    @staticmethod
+    def rebuild(user_ids=None):
+        """Recompute rollups from raw entries (all users, or only user_ids)"""
+        entries = MoodEntry.objects.all()
+        rollups = MoodRollup.objects.all()
+        if user_ids is not None:
+            entries = entries.filter(user_id__in=user_ids)
+            rollups = rollups.filter(user_id__in=user_ids)
+        
+        aggregates = {}
+        for prefix, field, count_field in MoodRollupService.METRICS:
+            aggregates[count_field] = Count(field)
+            aggregates[f'{prefix}_sum'] = Sum(field, default=0)
+            aggregates[f'{prefix}_sum_sq'] = Sum(F(field) * F(field), default=0)
+        
+        with transaction.atomic():
+            # Everyone whose rollups are replaced gets a new data version, so cached reads refresh
+            affected = set(rollups.order_by().values_list('user_id', flat=True).distinct())
+            rollups.delete()
+            created = 0
+            for period, truncate in MoodRollupService.TRUNCATES.items():
+                rows = (
+                    entries.order_by()
+                    .annotate(period_start=truncate('date'))
+                    .values('user_id', 'period_start')
+                    .annotate(**aggregates)
+                )
+                new_rollups = MoodRollup.objects.bulk_create(
+                    (MoodRollup(period=period, **row) for row in rows.iterator()),
+                    batch_size=1000
+                )
+                affected.update(rollup.user_id for rollup in new_rollups)
+                created += len(new_rollups)
+            MoodVersionService.bump_many(affected)
+        
+        return created
+    
+    @staticmethod
+    def get_series(user, period='week', since=None):
+        """Mean/stddev/count per period for mood, energy and anxiety from rollup rows only"""
+        rollups = MoodRollup.objects.filter(user=user, period=period, entry_count__gt=0)
+        if since is not None:
+            rollups = rollups.filter(period_start__gte=since)
+        
+        series = []
+        for rollup in rollups:
+            point = {'period_start': rollup.period_start, 'entries': rollup.entry_count}
+            for prefix, _, count_field in MoodRollupService.METRICS:
+                count = getattr(rollup, count_field)
+                if count:
+                    mean = getattr(rollup, f'{prefix}_sum') / count
+                    variance = max(getattr(rollup, f'{prefix}_sum_sq') / count - mean * mean, 0)
+                    point[f'{prefix}_avg'] = round(mean, 2)
+                    point[f'{prefix}_std'] = round(math.sqrt(variance), 2)
+                else:
+                    point[f'{prefix}_avg'] = None
+                    point[f'{prefix}_std'] = None
+            series.append(point)
+        
+        return series
+
+
+class MoodImportService:
+    """Validates mood rows in batches and upserts them with one statement per batch"""
+    
+    BATCH_SIZE = 1000
+    MAX_REPORTED_ERRORS = 100
+    READ_SIZE = 64 * 1024
+    UPDATE_FIELDS = ['mood_rating', 'energy_level', 'anxiety_level', 'notes', 'updated_at']
+    
+    @staticmethod
+    def parse_csv(stream):
+        """Rows from a CSV text stream with a header (date,mood_rating,energy_level,anxiety_level,notes)"""
+        return csv.DictReader(stream)
+    
+    @staticmethod
+    def parse_json(stream):
+        """Rows from a JSON array or from JSON Lines (one object per line); both are read incrementally"""
+        first = stream.read(1)
+        while first and first.isspace():
+            first = stream.read(1)
+        if first == '[':
+            yield from MoodImportService._iter_json_array(stream)
+            return
+        
+        pending = first
+        for line in stream:
+            line = (pending + line).strip()
+            pending = ''
+            if line:
+                yield json.loads(line)
+    
+    @staticmethod
+    def _iter_json_array(stream):
+        """Decode the elements of a JSON array (opening bracket already consumed) a chunk at a time"""
+        decoder = json.JSONDecoder()
+        buffer = ''
+        position = 0
+        exhausted = False
+        expect_value = True  # After '[' or ','
+        
+        while True:
+            # Skip whitespace and the separators between elements
+            while position < len(buffer) and (buffer[position].isspace() or (buffer[position] == ',' and not expect_value)):
+                if buffer[position] == ',':
+                    expect_value = True
+                position += 1
+            
+            if position < len(buffer) and buffer[position] == ']':
+                return
+            
+            if position < len(buffer):
+                try:
+                    value, end = decoder.raw_decode(buffer, position)
+                except json.JSONDecodeError:
+                    if exhausted:
+                        raise
+                else:
+                    # A number at the end of the buffer may continue in the next chunk
+                    if end < len(buffer) or exhausted:
+                        if not expect_value:
+                            raise ValueError(f"Expected ',' or ']' at offset {position}")
+                        yield value
+                        position = end
+                        expect_value = False
+                        continue
+            elif exhausted:
+                raise ValueError('Unterminated JSON array')
+            
+            chunk = stream.read(MoodImportService.READ_SIZE)
+            exhausted = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+    
+    @staticmethod
+    def open_text(uploaded_file):
+        """Text stream over an uploaded or opened binary file"""
+        return io.TextIOWrapper(uploaded_file, encoding='utf-8-sig', newline='')
+    
+    @staticmethod
+    def import_rows(user, rows, batch_size=BATCH_SIZE):
+        """
+        Upsert valid rows on (user, date); recompute streak, rollups and insight once at the end.
+        
+        Batches commit as they go so large imports never hold one huge transaction. If the
+        input turns out to be malformed partway through, the rows already written are kept,
+        derived data is still brought up to date, and parse_error describes where it stopped.
+        """
+        imported = 0
+        skipped = 0
+        errors = []
+        batch = {}
+        parse_error = None
+        index = 0
+        
+        try:
+            try:
+                for index, row in enumerate(rows, start=1):
+                    entry, row_errors = MoodImportService._validate(row)
+                    if row_errors:
+                        skipped += 1
+                        if len(errors) < MoodImportService.MAX_REPORTED_ERRORS:
+                            errors.append({'row': index, 'errors': row_errors})
+                        continue
+                    
+                    # A date repeated within one batch keeps its last row (ON CONFLICT can't touch a row twice)
+                    batch[entry['date']] = MoodEntry(user=user, **entry)
+                    if len(batch) >= batch_size:
+                        imported += MoodImportService._write(batch)
+                        batch = {}
+            except (ValueError, csv.Error) as e:
+                parse_error = f"{e} (after row {index})"  # Keep the valid rows read before the malformed input
+            
+            if batch:
+                imported += MoodImportService._write(batch)
+        finally:
+            # Also runs when a write fails, so committed batches never leave stale derived data
+            if imported:
+                MoodService.recompute_streaks([user.pk])
+                MoodRollupService.rebuild([user.pk])
+                MoodService.generate_weekly_insight(user)
+                MoodVersionService.bump(user.pk)
+        
+        return {
+            'imported': imported,
+            'skipped': skipped,
+            'errors': errors,
+            'parse_error': parse_error
+        }
+    
+    @staticmethod
+    def _write(batch):
+        with transaction.atomic():
+            MoodEntry.objects.bulk_create(
+                list(batch.values()),
+                update_conflicts=True,
+                unique_fields=['user', 'date'],
+                update_fields=MoodImportService.UPDATE_FIELDS
+            )
+        return len(batch)
+    
+    @staticmethod
+    def _validate(row):
+        """Cheap per-row checks matching the model validators (no serializer per row)"""
+        errors = {}
+        entry = {}
+        
+        if not isinstance(row, dict):
+            return None, {'row': 'Expected an object with date and mood_rating.'}
+        
+        try:
+            entry['date'] = date.fromisoformat(str(row.get('date', '')).strip())
+            if entry['date'] > date.today():
+                errors['date'] = 'Cannot log mood for future dates.'
+        except ValueError:
+            errors['date'] = 'Enter a valid date in YYYY-MM-DD format.'
+        
+        for field, required in (('mood_rating', True), ('energy_level', False), ('anxiety_level', False)):
+            value = row.get(field)
+            if value in (None, ''):
+                if required:
+                    errors[field] = 'This field is required.'
+                entry[field] = None
+                continue
+            if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+                errors[field] = 'A valid integer is required.'
+                continue
+            try:
+                value = int(value)
+            except (TypeError, ValueError):
+                errors[field] = 'A valid integer is required.'
+                continue
+            if not 1 <= value <= 5:
+                errors[field] = 'Must be between 1 and 5.'
+            entry[field] = value
+        
+        notes = row.get('notes') or ''
+        if not isinstance(notes, str):
+            errors['notes'] = 'Not a valid string.'
+            notes = ''
+        elif len(notes) > 500:
+            errors['notes'] = 'Ensure this field has no more than 500 characters.'
+        entry['notes'] = notes
+        
+        return entry, errors
+
+
+class MoodVersionService:
+    """Per-user data version used as a cheap validator for conditional GETs"""
+    
+    @staticmethod
+    def bump(user_id):
+        """Invalidate every cached read of this user's mood data"""
+        now = timezone.now()
+        updated = MoodDataVersion.objects.filter(user_id=user_id).update(version=F('version') + 1, updated_at=now)
+        if not updated:
+            _, created = MoodDataVersion.objects.get_or_create(
+                user_id=user_id, defaults={'version': 1, 'updated_at': now}
+            )
+            if not created:
+                # Another writer created the row first; still count this write
+                MoodDataVersion.objects.filter(user_id=user_id).update(version=F('version') + 1, updated_at=now)
+    
+    @staticmethod
+    def bump_many(user_ids):
+        """Bump several users at once (bulk admin actions, batch jobs) in two or three queries"""
+        user_ids = set(user_ids)
+        now = timezone.now()
+        MoodDataVersion.objects.filter(user_id__in=user_ids).update(version=F('version') + 1, updated_at=now)
+        existing = set(MoodDataVersion.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True))
+        MoodDataVersion.objects.bulk_create(
+            [MoodDataVersion(user_id=user_id, version=1, updated_at=now) for user_id in user_ids - existing],
+            ignore_conflicts=True
+        )
+    
+    @staticmethod
+    def get(user_id):
+        """(version, updated_at) for a user; (0, None) before the first write"""
+        row = MoodDataVersion.objects.filter(user_id=user_id).values_list('version', 'updated_at').first()
+        return row or (0, None)
+    
+    @staticmethod
+    def validators(user_id, *parts, state=None):
+        """(etag, last_modified) for a response that depends only on this user's data, today and parts"""
+        version, updated_at = state or MoodVersionService.get(user_id)
+        today = date.today()
+        key = ':'.join(str(part) for part in (user_id, version, today, *parts))
+        etag = '"%s"' % hashlib.sha1(key.encode()).hexdigest()[:20]
+        
+        # Responses are gap-filled up to today, so they also change at midnight
+        midnight = timezone.make_aware(datetime.combine(today, time.min))
+        last_modified = max(updated_at, midnight) if updated_at else midnight
+        return etag, last_modified
+
+
+class MoodPatternService:
+    """Batch pattern detection: one query per chunk of users, NumPy detectors per user"""
+    
+    LOOKBACK_DAYS = 180
+    DEDUP_DAYS = 30
+    
+    @staticmethod
+    def analyze_users(user_ids, lookback_days=LOOKBACK_DAYS, dry_run=False):
+        """Detect patterns for a chunk of users and store new ones; returns the number of insights"""
+        since = date.today() - timedelta(days=lookback_days)
+        rows = MoodEntry.objects.filter(
+            user_id__in=user_ids, date__gte=since
+        ).order_by('user_id', 'date').values_list(
+            'user_id', 'date', 'mood_rating', 'energy_level', 'anxiety_level'
+        )
+        
+        # A pattern already reported recently is not repeated
+        recent = set(MoodInsight.objects.filter(
+            user_id__in=user_ids,
+            insight_type='pattern_detected',
+            date_generated__gte=timezone.now() - timedelta(days=MoodPatternService.DEDUP_DAYS)
+        ).values_list('user_id', 'data__signature'))
+        
+        insights = []
+        for user_id, user_rows in groupby(rows.iterator(chunk_size=5000), key=itemgetter(0)):
+            series = patterns.build_series([row[1:] for row in user_rows])
+            for pattern in patterns.detect_patterns(series):
+                if (user_id, pattern['signature']) in recent:
+                    continue
+                insights.append(MoodInsight(
+                    user_id=user_id,
+                    insight_type='pattern_detected',
+                    title=pattern['title'],
+                    description=pattern['description'],
+                    data={'pattern': pattern['pattern'], 'signature': pattern['signature'], **pattern['data']}
+                ))
+        
+        if insights and not dry_run:
+            with transaction.atomic():
+                MoodInsight.objects.bulk_create(insights, batch_size=1000)
+                MoodVersionService.bump_many(insight.user_id for insight in insights)
+        
+        return len(insights)
+
+
+class PopulationAnalyticsService:
+    """Aggregate mood trends across all users, computed in the database and cached for a few minutes"""
+    
+    STREAK_BUCKETS = [(0, 0), (1, 1), (2, 6), (7, 29), (30, 99), (100, None)]
+    
+    # Whole days between two date expressions, per database vendor
+    DAYS_BETWEEN = {
+        'postgresql': '({end} - {start})',
+        'sqlite': 'CAST(julianday({end}) - julianday({start}) AS INTEGER)',
+    }
+    
+    # The 7-day rolling mean is computed over calendar days in Python: a ROWS window would
+    # stretch across days nobody logged, and RANGE over dates isn't portable (SQLite)
+    DAILY_SQL = """
+        SELECT date,
+               COUNT(*) AS loggers,
+               SUM(mood_rating) AS mood_sum,
+               AVG(mood_rating) AS avg_mood,
+               AVG(energy_level) AS avg_energy,
+               AVG(anxiety_level) AS avg_anxiety
+        FROM {entries}
+        WHERE date BETWEEN %s AND %s
+        GROUP BY date
+        ORDER BY date
+    """
+    
+    # Users whose first ever entry falls in the cohort range, bucketed by week of first entry and
+    # week offset of later activity; cohort size comes from a window over the offset-0 group
+    RETENTION_SQL = """
+        WITH firsts AS (
+            SELECT user_id, MIN(date) AS first_date
+            FROM {entries}
+            WHERE date BETWEEN %s AND %s
+              AND NOT EXISTS (
+                  SELECT 1 FROM {entries} earlier
+                  WHERE earlier.user_id = {entries}.user_id AND earlier.date < %s
+              )
+            GROUP BY user_id
+        ),
+        activity AS (
+            SELECT DISTINCT firsts.user_id,
+                   {cohort_days} / 7 AS cohort,
+                   {offset_days} / 7 AS week_offset
+            FROM firsts
+            JOIN {entries} entry ON entry.user_id = firsts.user_id AND entry.date >= firsts.first_date
+            WHERE entry.date <= %s
+        )
+        SELECT cohort,
+               week_offset,
+               COUNT(*) AS active_users,
+               1.0 * COUNT(*) / FIRST_VALUE(COUNT(*)) OVER (PARTITION BY cohort ORDER BY week_offset) AS retention
+        FROM activity
+        GROUP BY cohort, week_offset
+        ORDER BY cohort, week_offset
+    """
+    
+    @staticmethod
+    def parse_params(params):
+        """(days, cohort_weeks) from query params, clamped; raises ValueError for non-integers"""
+        try:
+            days = int(params.get('days') or 90)
+            cohort_weeks = int(params.get('cohort_weeks') or 8)
+        except ValueError:
+            raise ValueError('days and cohort_weeks must be integers')
+        return min(max(days, 1), 365), min(max(cohort_weeks, 1), 26)
+    
+    @staticmethod
+    def get_summary(days=90, cohort_weeks=8):
+        """Daily activity, retention curves and streak distribution (cached)"""
+        end_date = date.today()
+        key = f"mood:population:{days}:{cohort_weeks}:{end_date}"
+        timeout = getattr(settings, 'MOOD_POPULATION_CACHE_TIMEOUT', 300)
+        return caching.get_or_compute(key, lambda: {
+            'period_days': days,
+            'daily': PopulationAnalyticsService.daily_activity(end_date - timedelta(days=days - 1), end_date),
+            'retention': PopulationAnalyticsService.retention(end_date, cohort_weeks),
+            'streaks': PopulationAnalyticsService.streak_distribution(),
+            'generated_at': timezone.now()
+        }, timeout)
+    
+    @staticmethod
+    def daily_activity(start_date, end_date):
+        """Every day in range: distinct loggers, mean mood/energy/anxiety and 7-calendar-day rolling mean mood"""
+        # Six extra days so the first rolling value has a full window
+        rows = PopulationAnalyticsService._fetch(
+            PopulationAnalyticsService.DAILY_SQL, [start_date - timedelta(days=6), end_date]
+        )
+        by_date = {}
+        for row in rows:
+            if isinstance(row['date'], str):
+                row['date'] = date.fromisoformat(row['date'])
+            by_date[row['date']] = row
+        
+        daily = []
+        window = []  # (mood_sum, loggers) for the last seven calendar days
+        day = start_date - timedelta(days=6)
+        while day <= end_date:
+            row = by_date.get(day)
+            window.append((row['mood_sum'], row['loggers']) if row else (0, 0))
+            window = window[-7:]
+            
+            if day >= start_date:
+                window_loggers = sum(loggers for _, loggers in window)
+                daily.append({
+                    'date': day,
+                    'loggers': row['loggers'] if row else 0,
+                    **{
+                        field: round(float(row[field]), 2) if row and row[field] is not None else None
+                        for field in ('avg_mood', 'avg_energy', 'avg_anxiety')
+                    },
+                    'rolling_mood': (
+                        round(sum(mood_sum for mood_sum, _ in window) / window_loggers, 2) if window_loggers else None
+                    ),
+                })
+            day += timedelta(days=1)
+        return daily
+    
+    @staticmethod
+    def retention(end_date, cohort_weeks=8):
+        """Weekly cohorts by first entry, with the share of each cohort active N weeks later"""
+        cohorts_start = end_date - timedelta(days=end_date.weekday() + 7 * (cohort_weeks - 1))
+        days_between = PopulationAnalyticsService.DAYS_BETWEEN.get(
+            connection.vendor, PopulationAnalyticsService.DAYS_BETWEEN['postgresql']
+        )
+        rows = PopulationAnalyticsService._fetch(
+            PopulationAnalyticsService.RETENTION_SQL,
+            [cohorts_start, end_date, cohorts_start, cohorts_start, end_date],
+            cohort_days=days_between.format(end='firsts.first_date', start='%s'),
+            offset_days=days_between.format(end='entry.date', start='firsts.first_date')
+        )
+        
+        curves = {}
+        for row in rows:
+            cohort_start = cohorts_start + timedelta(weeks=row['cohort'])
+            curve = curves.setdefault(cohort_start, {'cohort_start': cohort_start, 'users': 0, 'weeks': []})
+            if row['week_offset'] == 0:
+                curve['users'] = row['active_users']
+            curve['weeks'].append({
+                'week': row['week_offset'],
+                'active_users': row['active_users'],
+                'retention': round(float(row['retention']), 3)
+            })
+        return list(curves.values())
+    
+    @staticmethod
+    def streak_distribution():
+        """Users per current-streak bucket, from the maintained MoodStreak rows in one query"""
+        # current_streak only changes when the user logs; a streak not extended yesterday or today is over
+        live = Q(last_check_in__gte=date.today() - timedelta(days=1))
+        counts = {}
+        for low, high in PopulationAnalyticsService.STREAK_BUCKETS:
+            label = str(low) if low == high else (f"{low}+" if high is None else f"{low}-{high}")
+            condition = Q(current_streak__gte=low) if high is None else Q(current_streak__range=[low, high])
+            if low == 0:
+                counts[label] = Count('id', filter=(condition | ~live))
+            else:
+                counts[label] = Count('id', filter=condition & live)
+        return MoodStreak.objects.aggregate(**counts)
+    
+    @staticmethod
+    def _fetch(sql, params, **fragments):
+        """Run vendor-formatted SQL against the MoodEntry table and return rows as dicts"""
+        entries = connection.ops.quote_name(MoodEntry._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(sql.format(entries=entries, **fragments), params)
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
@@ -1,3 +1,646 @@
-from django.test import TestCase
+import io
+import json
+import random
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from mindbuddy.renderers import ORJSONRenderer
+from . import caching, patterns
+from .notifiers import ConsoleNotifier
+from .admin import MoodEntryAdmin
+from .models import MoodEntry, MoodInsight, MoodRollup, MoodStreak
+from .serializers import MoodEntrySerializer, fast_mood_entry_data
+from .services import (
+    MoodImportService, MoodPatternService, MoodReminderService, MoodRollupService, MoodService,
+    MoodVersionService, PopulationAnalyticsService
+)
+
+User = get_user_model()
+
+
+class ChunkedStream(io.StringIO):
+    """Text stream that returns at most a random number of characters per read()"""
+
+    def __init__(self, text, seed):
+        super().__init__(text)
+        self.rng = random.Random(seed)
+
+    def read(self, size=-1):
+        limit = self.rng.randint(1, 7)
+        return super().read(limit if size < 0 else min(size, limit))
+
+
+class PerformanceAdminTests(TestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(name='operator', password='pw')
+        self.client.force_login(self.admin_user)
+        now = timezone.now()
+        for day in range(5):
+            entry = MoodEntry.objects.create(user=self.admin_user, date=date.today() - timedelta(days=day), mood_rating=3)
+            MoodEntry.objects.filter(pk=entry.pk).update(created_at=now - timedelta(hours=day))
+        self.url = '/admin/Mood_Tracking/moodentry/'
+
+    def page(self, query=''):
+        with mock.patch.object(MoodEntryAdmin, 'list_per_page', 2):
+            return self.client.get(self.url + query)
+
+    def test_older_rows_link_walks_the_table_without_gaps_or_repeats(self):
+        seen = []
+        response = self.page()
+        while True:
+            seen += [entry.pk for entry in response.context['cl'].result_list]
+            next_url = response.context.get('keyset_next_url')
+            if not next_url:
+                break
+            response = self.page(next_url)
+
+        expected = list(MoodEntry.objects.order_by('-created_at').values_list('pk', flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_no_keyset_link_when_sorted_by_another_column(self):
+        response = self.page('?o=2')  # mood_rating
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('keyset_next_url', response.context)
+        self.assertNotContains(response, 'Older rows')
+
+
+class FastSerializationTests(TestCase):
+    def test_fast_mood_entries_render_byte_identical_to_drf(self):
+        user = User.objects.create_user(name='serializer_user', password='pw')
+        MoodEntry.objects.create(user=user, date=date(2025, 3, 1), mood_rating=4, energy_level=2, anxiety_level=5,
+                                 notes="Calm ✨ day\u2028with a line separator")
+        MoodEntry.objects.create(user=user, date=date(2025, 3, 2), mood_rating=1)
+        entries = MoodEntry.objects.filter(user=user)
+
+        self.assertEqual(
+            ORJSONRenderer().render(fast_mood_entry_data(entries)),
+            JSONRenderer().render(MoodEntrySerializer(entries, many=True).data)
+        )
+
+
+class MoodChartDataTests(TestCase):
+    def test_history_is_gap_filled_from_one_query(self):
+        user = User.objects.create_user(name='chart_user', password='pw')
+        today = date.today()
+        MoodEntry.objects.create(user=user, date=today, mood_rating=5, energy_level=4, notes='Great')
+        MoodEntry.objects.create(user=user, date=today - timedelta(days=3), mood_rating=2)
+        MoodEntry.objects.create(user=user, date=today - timedelta(days=9), mood_rating=1)  # Out of range
+
+        with self.assertNumQueries(1):
+            chart_data, stats = MoodService.get_mood_history(user, days=7)
+
+        self.assertEqual([row['date'] for row in chart_data], [today - timedelta(days=6 - day) for day in range(7)])
+        self.assertEqual([row['mood_rating'] for row in chart_data], [None, None, None, 2, None, None, 5])
+        self.assertEqual(chart_data[3]['energy_level'], 0)  # Logged without energy
+        self.assertEqual(chart_data[6]['notes'], 'Great')
+        self.assertEqual(
+            stats,
+            {'total_entries': 2, 'average_mood': 3.5, 'best_mood': 5, 'worst_mood': 2, 'tracking_percentage': 2 / 7 * 100}
+        )
+
+
+class MoodRollupTests(TestCase):
+    FIELDS = ['period', 'period_start', 'entry_count', 'mood_sum', 'mood_sum_sq',
+              'energy_count', 'energy_sum', 'anxiety_count', 'anxiety_sum']
+
+    def setUp(self):
+        self.user = User.objects.create_user(name='rollup_user', password='pw')
+
+    def snapshot(self):
+        rows = MoodRollup.objects.filter(user=self.user, entry_count__gt=0).order_by('period', 'period_start')
+        return list(rows.values_list(*self.FIELDS))
+
+    def assertMatchesRebuild(self):
+        incremental = self.snapshot()
+        MoodRollupService.rebuild([self.user.pk])
+        self.assertEqual(incremental, self.snapshot())
+
+    def create(self, entry_date, mood, energy=None, anxiety=None):
+        entry = MoodEntry.objects.create(
+            user=self.user, date=entry_date, mood_rating=mood, energy_level=energy, anxiety_level=anxiety
+        )
+        MoodRollupService.entry_created(entry)
+        return entry
+
+    def test_create_adds_to_week_and_month(self):
+        self.create(date(2025, 3, 5), 4, energy=2)
+        self.create(date(2025, 3, 6), 2)
+        week = MoodRollup.objects.get(user=self.user, period='week', period_start=date(2025, 3, 3))
+        self.assertEqual((week.entry_count, week.mood_sum, week.mood_sum_sq), (2, 6, 20))
+        self.assertEqual((week.energy_count, week.energy_sum), (1, 2))
+        self.assertMatchesRebuild()
+
+    def test_update_moves_the_entry_between_periods(self):
+        entry = self.create(date(2025, 3, 31), 5, anxiety=4)
+        self.create(date(2025, 4, 2), 1)
+
+        old_values = MoodRollupService.entry_values(entry)
+        entry.date = date(2025, 4, 7)
+        entry.mood_rating = 3
+        entry.anxiety_level = None
+        entry.save()
+        MoodRollupService.entry_updated(self.user.pk, old_values, entry)
+
+        march = MoodRollup.objects.get(user=self.user, period='month', period_start=date(2025, 3, 1))
+        self.assertEqual((march.entry_count, march.mood_sum, march.anxiety_count), (0, 0, 0))
+        self.assertMatchesRebuild()
+
+    def test_delete_removes_the_contribution(self):
+        self.create(date(2025, 3, 5), 4, energy=3, anxiety=2)
+        entry = self.create(date(2025, 3, 6), 2, energy=5)
+        MoodRollupService.entry_deleted(entry)
+        entry.delete()
+
+        week = MoodRollup.objects.get(user=self.user, period='week', period_start=date(2025, 3, 3))
+        self.assertEqual((week.entry_count, week.mood_sum, week.energy_count, week.energy_sum), (1, 4, 1, 3))
+        self.assertMatchesRebuild()
+
+    def test_rebuild_bumps_the_data_version(self):
+        self.create(date(2025, 3, 5), 4)
+        version = MoodVersionService.get(self.user.pk)[0]
+        MoodRollupService.rebuild()
+        self.assertEqual(MoodVersionService.get(self.user.pk)[0], version + 1)
+
+
+class AnonymousRequestTests(TestCase):
+    def test_reads_fall_back_until_the_anonymous_account_exists(self):
+        self.assertEqual(self.client.get('/api/mood/streak/').json()['current_streak'], 0)
+        self.assertEqual(self.client.get('/api/mood/today/').json(), {'today_mood': None, 'has_logged_today': False})
+
+        response = self.client.post('/api/mood/', {'date': date.today().isoformat(), 'mood_rating': 4})
+        self.assertEqual(response.status_code, 201)
+
+        anonymous = User.objects.get(name='anonymous_user')
+        self.assertFalse(anonymous.has_usable_password())
+        self.assertEqual(MoodEntry.objects.get(user=anonymous).mood_rating, 4)
+        self.assertEqual(self.client.get('/api/mood/streak/').json()['current_streak'], 1)
+        self.assertTrue(self.client.get('/api/mood/today/').json()['has_logged_today'])
+
+
+class MoodHistoryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(name='history_user', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        today = date.today()
+        MoodEntry.objects.bulk_create([
+            MoodEntry(user=self.user, date=today - timedelta(days=day), mood_rating=day % 5 + 1)
+            for day in range(60)
+        ])
+
+    def test_non_integer_params_are_rejected(self):
+        for params in ({'points': 'abc'}, {'days': '7.5'}):
+            response = self.client.get('/api/mood/history/', params)
+            self.assertEqual(response.status_code, 400, params)
+
+    def test_points_are_clamped(self):
+        response = self.client.get('/api/mood/history/', {'days': 60, 'points': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['chart_data']), 3)
+
+    def test_columnar_format_matches_the_row_format(self):
+        MoodEntry.objects.filter(user=self.user, date=date.today()).update(energy_level=4, notes='Slept well')
+        rows = self.client.get('/api/mood/history/', {'days': 14}).json()['chart_data']
+        columnar = self.client.get('/api/mood/history/', {'days': 14, 'format': 'columnar'}).json()
+
+        self.assertEqual((columnar['start_date'], columnar['step'], columnar['length']), (rows[0]['date'], 'day', 14))
+        self.assertEqual(columnar['mood_rating'], [row['mood_rating'] or 0 for row in rows])
+        self.assertEqual(columnar['energy_level'][-1], 4)
+        self.assertEqual(columnar['notes'], {'13': 'Slept well'})
+        # Daily ratings are counted for the most common mood; only averaged buckets carry entry_count
+        self.assertNotIn('entry_count', columnar)
+
+        weekly = self.client.get('/api/mood/history/', {'days': 28, 'granularity': 'week', 'format': 'columnar'}).json()
+        self.assertEqual(weekly['step'], 'week')
+        self.assertEqual(sum(weekly['entry_count']), 28)
+
+    def test_unchanged_history_revalidates_with_304(self):
+        first = self.client.get('/api/mood/history/', {'days': 14})
+        etag = first['ETag']
+
+        with self.assertNumQueries(1):  # Only the data version lookup
+            response = self.client.get('/api/mood/history/', {'days': 14}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        # Another view of the same data has its own ETag
+        self.assertNotEqual(self.client.get('/api/mood/history/', {'days': 7})['ETag'], etag)
+
+        self.client.put('/api/mood/today/', {'mood_rating': 2}, format='json')
+        response = self.client.get('/api/mood/history/', {'days': 14}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['chart_data'][-1]['mood_rating'], 2)
+
+    def test_lttb_keeps_endpoints_and_extremes(self):
+        start = date(2025, 1, 1)
+        chart_data = [
+            {'date': start + timedelta(days=day), 'mood_rating': 5 if day == 50 else 3, 'has_entry': day % 7 != 3}
+            for day in range(100)
+        ]
+        logged = [row for row in chart_data if row['has_entry']]
+
+        sampled = MoodService.downsample_lttb(chart_data, 10)
+
+        self.assertEqual(len(sampled), 10)
+        self.assertEqual((sampled[0], sampled[-1]), (logged[0], logged[-1]))
+        self.assertIn(chart_data[50], sampled)
+        self.assertEqual(sampled, sorted(sampled, key=lambda row: row['date']))
+        self.assertEqual(MoodService.downsample_lttb(chart_data, 500), logged)
+
+
+class MoodStreakTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(name='streak_user', password='pw')
+        self.today = date.today()
+
+    def log(self, entry_date):
+        MoodEntry.objects.create(user=self.user, date=entry_date, mood_rating=3)
+        return MoodService.update_streak(self.user, entry_date)
+
+    def test_consecutive_days_extend_the_streak(self):
+        for offset in (2, 1, 0):
+            streak = self.log(self.today - timedelta(days=offset))
+        self.assertEqual(streak.current_streak, 3)
+        self.assertEqual(streak.longest_streak, 3)
+
+    def test_backfilled_day_bridges_two_runs(self):
+        for offset in (4, 3, 1, 0):
+            streak = self.log(self.today - timedelta(days=offset))
+        self.assertEqual(streak.current_streak, 2)
+
+        streak = self.log(self.today - timedelta(days=2))
+        self.assertEqual(streak.current_streak, 5)
+        self.assertEqual(streak.longest_streak, 5)
+        self.assertEqual(streak.last_check_in, self.today)
+
+    def test_backfill_before_an_older_run_leaves_current_streak_alone(self):
+        for offset in (10, 9, 0):
+            self.log(self.today - timedelta(days=offset))
+        streak = self.log(self.today - timedelta(days=11))
+        self.assertEqual(streak.current_streak, 1)
+        self.assertEqual(streak.longest_streak, 3)
+
+    def test_recompute_matches_incremental_updates(self):
+        offsets = [8, 7, 5, 4, 3, 6, 0]
+        for offset in offsets:
+            incremental = self.log(self.today - timedelta(days=offset))
+        MoodService.recompute_streaks([self.user.pk])
+        recomputed = MoodStreak.objects.get(user=self.user)
+        self.assertEqual(
+            (recomputed.current_streak, recomputed.longest_streak, recomputed.total_entries),
+            (incremental.current_streak, incremental.longest_streak, len(offsets))
+        )
+
+    def test_recompute_bumps_the_data_version(self):
+        self.log(self.today)
+        version = MoodVersionService.get(self.user.pk)[0]
+        MoodService.recompute_streaks([self.user.pk])
+        self.assertEqual(MoodVersionService.get(self.user.pk)[0], version + 1)
+
+
+class MoodImportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(name='import_user', password='pw')
+        self.start = date.today() - timedelta(days=30)
+
+    def rows(self, count):
+        return [
+            {'date': (self.start + timedelta(days=day)).isoformat(), 'mood_rating': day % 5 + 1}
+            for day in range(count)
+        ]
+
+    def test_json_array_with_random_chunk_boundaries(self):
+        rows = self.rows(12)
+        rows[3]['notes'] = 'A "quoted" note, with [brackets] and {braces}'
+        text = json.dumps(rows, indent=1)
+        for seed in range(20):
+            parsed = list(MoodImportService.parse_json(ChunkedStream(text, seed)))
+            self.assertEqual(parsed, rows)
+
+    def test_json_lines(self):
+        rows = self.rows(3)
+        text = '\n'.join(json.dumps(row) for row in rows) + '\n'
+        self.assertEqual(list(MoodImportService.parse_json(io.StringIO(text))), rows)
+
+    def test_truncated_array_raises(self):
+        text = json.dumps(self.rows(3))[:-20]
+        with self.assertRaises(ValueError):
+            list(MoodImportService.parse_json(ChunkedStream(text, 1)))
+
+    def test_partial_import_keeps_written_batches_and_updates_derived_data(self):
+        text = json.dumps(self.rows(25))
+        text = text[:text.rfind('{')] + '{"date": "oops"'  # Malformed after row 24
+        rows = MoodImportService.parse_json(io.StringIO(text))
+
+        result = MoodImportService.import_rows(self.user, rows, batch_size=10)
+
+        self.assertEqual(result['imported'], 24)
+        self.assertIsNotNone(result['parse_error'])
+        self.assertEqual(MoodEntry.objects.filter(user=self.user).count(), 24)
+        streak = MoodStreak.objects.get(user=self.user)
+        self.assertEqual((streak.current_streak, streak.total_entries), (24, 24))
+        rolled_up = sum(MoodRollup.objects.filter(user=self.user, period='month').values_list('entry_count', flat=True))
+        self.assertEqual(rolled_up, 24)
+
+    def test_invalid_rows_are_skipped_and_counted(self):
+        rows = self.rows(3) + [
+            {'date': self.start.isoformat(), 'mood_rating': 3.7},
+            {'date': self.start.isoformat(), 'mood_rating': True},
+            {'date': self.start.isoformat(), 'mood_rating': 3, 'notes': 42},
+            {'date': 'not-a-date', 'mood_rating': 9},
+            'not an object',
+        ]
+        result = MoodImportService.import_rows(self.user, rows)
+
+        self.assertEqual((result['imported'], result['skipped']), (3, 5))
+        self.assertEqual(result['errors'][0]['errors'], {'mood_rating': 'A valid integer is required.'})
+        self.assertEqual(result['errors'][2]['errors'], {'notes': 'Not a valid string.'})
+        self.assertNotIn(None, result['errors'])
+
+    def test_repeated_date_keeps_the_last_row(self):
+        day = self.start.isoformat()
+        result = MoodImportService.import_rows(
+            self.user, [{'date': day, 'mood_rating': 1}, {'date': day, 'mood_rating': 5}]
+        )
+        self.assertEqual(result['imported'], 1)
+        self.assertEqual(MoodEntry.objects.get(user=self.user).mood_rating, 5)
+
+
+@override_settings(MOOD_CACHE_LOCK_TIMEOUT=1, MOOD_CACHE_POLL_INTERVAL=0.01)
+class MoodCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.key = caching.make_key(1, 0, 'history', 30)
+        self.compute = mock.Mock(return_value=[])
+
+    def test_falsy_values_are_cached(self):
+        self.assertEqual(caching.get_or_compute(self.key, self.compute), [])
+        self.assertEqual(caching.get_or_compute(self.key, self.compute), [])
+        self.compute.assert_called_once()
+
+    def test_waits_for_the_lock_holder_instead_of_recomputing(self):
+        caching.get_cache().add(self.key + ':lock', 1)  # Another worker is computing
+        finish = lambda _: caching.get_cache().set(self.key, ['theirs'])
+        with mock.patch.object(caching.time, 'sleep', side_effect=finish):
+            self.assertEqual(caching.get_or_compute(self.key, self.compute), ['theirs'])
+        self.compute.assert_not_called()
+
+    def test_computes_itself_when_the_lock_holder_fails(self):
+        caching.get_cache().add(self.key + ':lock', 1)
+        release = lambda _: caching.get_cache().delete(self.key + ':lock')
+        with mock.patch.object(caching.time, 'sleep', side_effect=release):
+            self.assertEqual(caching.get_or_compute(self.key, self.compute), [])
+        self.compute.assert_called_once()
+
+    def test_writes_invalidate_cached_history(self):
+        user = User.objects.create_user(name='cache_user', password='pw')
+        MoodService.get_cached_history(user, 7)
+        with self.assertNumQueries(1):  # Version lookup only
+            MoodService.get_cached_history(user, 7)
+
+        client = APIClient()
+        client.force_authenticate(user)
+        client.post('/api/mood/', {'date': date.today().isoformat(), 'mood_rating': 5}, format='json')
+        chart_data, stats = MoodService.get_cached_history(user, 7)
+        self.assertEqual((chart_data[-1]['mood_rating'], stats['total_entries']), (5, 1))
+
+
+class MoodDashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(name='dashboard_user', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_dashboard_matches_the_separate_endpoints(self):
+        for offset, rating in ((2, 3), (1, 4), (0, 5)):
+            self.client.post('/api/mood/', {'date': (date.today() - timedelta(days=offset)).isoformat(),
+                                            'mood_rating': rating, 'notes': 'ok'}, format='json')
+        MoodInsight.objects.create(user=self.user, insight_type='milestone', title='3 days', description='Nice')
+        MoodInsight.objects.create(user=self.user, insight_type='milestone', title='Old', description='Seen', is_read=True)
+
+        with self.assertNumQueries(4):  # Version lookup, then streak, week of entries and unread count
+            dashboard = self.client.get('/api/mood/dashboard/').json()
+
+        history = self.client.get('/api/mood/history/', {'days': 7}).json()
+        self.assertEqual(dashboard['streak'], self.client.get('/api/mood/streak/').json())
+        self.assertEqual(dashboard['today'], self.client.get('/api/mood/today/').json())
+        self.assertEqual(dashboard['mood_history']['chart_data'], history['chart_data'])
+        self.assertEqual(dashboard['mood_history']['statistics'], history['statistics'])
+        self.assertEqual(dashboard['unread_insights'], 1)
+
+
+class PatternDetectorTests(TestCase):
+    start = date(2025, 1, 6)  # A Monday
+
+    def series(self, moods, energy=None):
+        energy = energy or [None] * len(moods)
+        return patterns.build_series([
+            (self.start + timedelta(days=day), mood, level, None) for day, (mood, level) in enumerate(zip(moods, energy))
+        ])
+
+    def signatures(self, series):
+        return {pattern['signature'] for pattern in patterns.detect_patterns(series)}
+
+    def test_short_or_flat_series_report_nothing(self):
+        self.assertEqual(self.signatures(self.series([3] * (patterns.MIN_ENTRIES - 1))), set())
+        self.assertEqual(self.signatures(self.series([3] * 60)), set())
+
+    def test_low_weekday(self):
+        moods = [1 if day % 7 == 0 else 3 + day % 2 for day in range(56)]
+        self.assertIn('day_of_week:monday:low', self.signatures(self.series(moods)))
+
+    def test_mean_shift(self):
+        moods = [2 + day % 2 for day in range(28)] + [4 + day % 2 for day in range(28)]
+        shifts = [p for p in patterns.detect_patterns(self.series(moods)) if p['pattern'] == 'mean_shift']
+        self.assertEqual(len(shifts), 1)
+        self.assertEqual(shifts[0]['data']['change_date'], (self.start + timedelta(days=28)).isoformat())
+        self.assertTrue(shifts[0]['signature'].endswith(':up'))
+
+    def test_correlation_ignores_missing_values(self):
+        moods = [1 + day % 5 for day in range(30)]
+        energy = [None if day % 3 == 0 else mood for day, mood in enumerate(moods)]
+        found = [p for p in patterns.detect_patterns(self.series(moods, energy)) if p['pattern'] == 'correlation']
+        self.assertEqual([(p['signature'], p['data']['pairs']) for p in found], [('correlation:energy:positive', 20)])
+
+    def test_sustained_decline(self):
+        moods = [4 + day % 2 for day in range(20)] + [5 - day // 5 for day in range(21)]
+        self.assertTrue(any(sig.startswith('sustained_decline:') for sig in self.signatures(self.series(moods))))
+
+    def test_analyze_users_does_not_repeat_recent_patterns(self):
+        user = User.objects.create_user(name='pattern_user', password='pw')
+        today = date.today()
+        MoodEntry.objects.bulk_create([
+            MoodEntry(user=user, date=today - timedelta(days=day), mood_rating=1 + day % 5, energy_level=1 + day % 5)
+            for day in range(30)
+        ])
+
+        created = MoodPatternService.analyze_users([user.pk])
+        self.assertGreater(created, 0)
+        self.assertEqual(MoodInsight.objects.filter(user=user, insight_type='pattern_detected').count(), created)
+        self.assertEqual(MoodPatternService.analyze_users([user.pk]), 0)
+
+
+class WeeklyInsightTests(TestCase):
+    def setUp(self):
+        self.week_start = MoodService.last_completed_week()
+        self.users = [User.objects.create_user(name=f'weekly_user_{n}', password='pw') for n in range(3)]
+        for user in self.users:
+            MoodEntry.objects.create(user=user, date=self.week_start, mood_rating=4, energy_level=2)
+            MoodEntry.objects.create(user=user, date=self.week_start + timedelta(days=6), mood_rating=2)
+
+    def test_rerun_is_idempotent_and_counts_only_rows_written(self):
+        user_ids = [user.pk for user in self.users]
+        self.assertEqual(MoodService.generate_weekly_insights(user_ids[:1]), 1)
+
+        versions = [MoodVersionService.get(user_id)[0] for user_id in user_ids]
+        self.assertEqual(MoodService.generate_weekly_insights(user_ids), 2)
+        self.assertEqual(MoodService.generate_weekly_insights(user_ids), 0)
+
+        insights = MoodInsight.objects.filter(insight_type='weekly_average')
+        self.assertEqual(insights.count(), 3)
+        self.assertEqual(insights.get(user=self.users[0]).data['avg_energy'], 2)
+        # Only the users who got a new insight had their cached reads invalidated
+        self.assertEqual([MoodVersionService.get(user_id)[0] for user_id in user_ids],
+                         [versions[0], versions[1] + 1, versions[2] + 1])
+
+    def test_an_insight_written_by_another_worker_is_not_counted(self):
+        year, week, _ = self.week_start.isocalendar()
+        MoodInsight.objects.create(user=self.users[1], insight_type='weekly_average', title='Other worker',
+                                   description='', period_key=f"{year}-W{week:02d}")
+        self.assertEqual(MoodService.generate_weekly_insights([user.pk for user in self.users]), 2)
+
+
+class PopulationAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.today = date.today()
+        self.users = [User.objects.create_user(name=f'population_user_{n}', password='pw') for n in range(3)]
+
+    def test_rolling_mean_covers_calendar_days_not_logged_rows(self):
+        MoodEntry.objects.create(user=self.users[0], date=self.today - timedelta(days=8), mood_rating=1)
+        MoodEntry.objects.create(user=self.users[0], date=self.today, mood_rating=5)
+        MoodEntry.objects.create(user=self.users[1], date=self.today, mood_rating=4)
+
+        daily = PopulationAnalyticsService.daily_activity(self.today - timedelta(days=9), self.today)
+
+        self.assertEqual(len(daily), 10)
+        self.assertEqual((daily[-1]['loggers'], daily[-1]['avg_mood']), (2, 4.5))
+        self.assertEqual(daily[-1]['rolling_mood'], 4.5)  # The entry eight days back is outside the window
+        self.assertEqual(daily[1]['rolling_mood'], 1)
+        self.assertIsNone(daily[0]['rolling_mood'])
+        self.assertEqual((daily[-2]['loggers'], daily[-2]['avg_mood']), (0, None))
+
+    def test_lapsed_streaks_count_as_zero(self):
+        MoodStreak.objects.create(user=self.users[0], current_streak=10, last_check_in=self.today)
+        MoodStreak.objects.create(user=self.users[1], current_streak=10, last_check_in=self.today - timedelta(days=1))
+        MoodStreak.objects.create(user=self.users[2], current_streak=10, last_check_in=self.today - timedelta(days=2))
+
+        distribution = PopulationAnalyticsService.streak_distribution()
+        self.assertEqual((distribution['0'], distribution['7-29']), (1, 2))
+        self.assertEqual(sum(distribution.values()), 3)
+
+    def test_retention_follows_each_cohort(self):
+        monday = self.today - timedelta(days=self.today.weekday())
+        for user in self.users:
+            MoodEntry.objects.create(user=user, date=monday - timedelta(weeks=1), mood_rating=3)
+        MoodEntry.objects.create(user=self.users[0], date=monday, mood_rating=3)
+
+        curves = PopulationAnalyticsService.retention(self.today, cohort_weeks=2)
+        self.assertEqual(len(curves), 1)
+        self.assertEqual((curves[0]['cohort_start'], curves[0]['users']), (monday - timedelta(weeks=1), 3))
+        self.assertEqual([(week['week'], week['active_users']) for week in curves[0]['weeks']], [(0, 3), (1, 1)])
+
+    def test_endpoint_is_admin_only_and_validates_params(self):
+        url = '/api/mood/admin/analytics/'
+        self.client.force_login(self.users[0])
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(User.objects.create_superuser(name='analyst', password='pw'))
+        self.assertEqual(self.client.get(url, {'days': 'ninety'}).status_code, 400)
+        response = self.client.get(url, {'days': 1000, 'cohort_weeks': 2})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['period_days'], 365)
+
+
+class MarkInsightsReadTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(name='reader', password='pw')
+        self.other = User.objects.create_user(name='other_reader', password='pw')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.insights = [
+            MoodInsight.objects.create(user=self.user, insight_type='milestone', title=f'Insight {n}', description='')
+            for n in range(3)
+        ]
+        self.foreign = MoodInsight.objects.create(user=self.other, insight_type='milestone', title='Theirs', description='')
+
+    def mark(self, payload):
+        return self.client.post('/api/mood/insights/read/', payload, format='json')
+
+    def test_marks_only_the_users_own_insights(self):
+        response = self.mark({'ids': [str(self.insights[0].id), str(self.foreign.id)]})
+        self.assertEqual(response.json(), {'updated': 1, 'unread_count': 2})
+        self.assertFalse(MoodInsight.objects.get(pk=self.foreign.pk).is_read)
+
+        self.assertEqual(self.mark({'all': True}).json(), {'updated': 2, 'unread_count': 0})
+        self.assertEqual(self.client.get('/api/mood/insights/unread/').json(), {'unread_count': 0})
+
+    def test_unread_poll_revalidates_until_something_is_marked_read(self):
+        etag = self.client.get('/api/mood/insights/unread/')['ETag']
+        self.assertEqual(self.client.get('/api/mood/insights/unread/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        self.mark({'ids': [str(self.insights[0].id)]})
+        response = self.client.get('/api/mood/insights/unread/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response.json()), (200, {'unread_count': 2}))
+
+        # Marking already-read insights changes nothing and keeps cached copies valid
+        etag = response['ETag']
+        self.assertEqual(self.mark({'ids': [str(self.insights[0].id)]}).json()['updated'], 0)
+        self.assertEqual(self.client.get('/api/mood/insights/unread/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_invalid_payloads_are_rejected(self):
+        for payload in ({}, {'ids': []}, {'ids': 'abc'}, {'ids': ['not-a-uuid']}):
+            self.assertEqual(self.mark(payload).status_code, 400, payload)
+
+
+class MoodReminderTests(TestCase):
+    def setUp(self):
+        self.day = date(2025, 3, 5)
+        self.users = [User.objects.create_user(name=f'reminder_user_{n}', password='pw') for n in range(5)]
+        MoodEntry.objects.create(user=self.users[1], date=self.day, mood_rating=3)
+        MoodEntry.objects.create(user=self.users[2], date=self.day - timedelta(days=1), mood_rating=3)
+        self.users[3].is_active = False
+        self.users[3].save()
+
+    def test_candidates_are_active_users_without_an_entry_that_day(self):
+        batches = list(MoodReminderService.candidate_batches(self.day, batch_size=2))
+        expected = [(user.pk, user.name) for user in (self.users[0], self.users[2], self.users[4])]
+
+        self.assertEqual([len(batch) for batch in batches], [2, 1])
+        self.assertEqual([pair for batch in batches for pair in batch], expected)
+
+    def test_batches_are_one_query_each(self):
+        with self.assertNumQueries(3):  # Two non-empty batches and the empty one that ends the walk
+            list(MoodReminderService.candidate_batches(self.day, batch_size=2))
+
+    def test_send_reports_found_and_sent(self):
+        stream = io.StringIO()
+        self.assertEqual(MoodReminderService.send(ConsoleNotifier(stream), self.day, batch_size=2), (3, 3))
+        self.assertIn('reminder_user_4', stream.getvalue())
+        self.assertNotIn('reminder_user_1', stream.getvalue())
+
+    def test_command_dry_run(self):
+        out = io.StringIO()
+        call_command('send_mood_reminders', '--date', self.day.isoformat(), '--dry-run', stdout=out)
+        self.assertIn(f"3 users without a mood for {self.day}; 0 reminders sent", out.getvalue())
 
-# Create your tests here.
@@ -1,7 +1,8 @@
 from django.urls import path
 from .views import (
     MoodLogView, MoodHistoryView, MoodStreakView, 
-    MoodInsightsView, TodayMoodView
+    MoodInsightsView, TodayMoodView, MoodRollupsView, MoodBulkImportView,
+    MoodDashboardView, PopulationAnalyticsView, MoodInsightsReadView, MoodUnreadInsightsView
 )
 
 app_name = 'mood'
@@ -11,6 +12,12 @@ urlpatterns = [
     path('history/', MoodHistoryView.as_view(), name='mood-history'),
     path('streak/', MoodStreakView.as_view(), name='mood-streak'),
     path('insights/', MoodInsightsView.as_view(), name='mood-insights'),
+    path('insights/read/', MoodInsightsReadView.as_view(), name='mood-insights-read'),
+    path('insights/unread/', MoodUnreadInsightsView.as_view(), name='mood-insights-unread'),
     path('today/', TodayMoodView.as_view(), name='today-mood'),
+    path('bulk/', MoodBulkImportView.as_view(), name='mood-bulk-import'),
+    path('dashboard/', MoodDashboardView.as_view(), name='mood-dashboard'),
+    path('rollups/', MoodRollupsView.as_view(), name='mood-rollups'),
+    path('admin/analytics/', PopulationAnalyticsView.as_view(), name='mood-population-analytics'),
 ]
 
@@ -1,17 +1,77 @@
+import csv
+import uuid
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
 from django.shortcuts import get_object_or_404
-from django.contrib.auth.models import User
-from django.db import IntegrityError
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import IntegrityError, transaction
 from datetime import date, timedelta
 from .models import MoodEntry, MoodStreak, MoodInsight
 from .serializers import (
     MoodEntrySerializer, MoodEntryCreateSerializer, 
-    MoodStreakSerializer, MoodInsightSerializer, MoodHistorySerializer
+    MoodStreakSerializer, MoodInsightSerializer, MoodHistorySerializer, fast_mood_entry_data
 )
-from .services import MoodService
+from .services import (
+    MoodService, MoodRollupService, MoodImportService, MoodVersionService, MoodInsightService,
+    PopulationAnalyticsService
+)
+from rest_framework.parsers import JSONParser, MultiPartParser
+from mindbuddy.renderers import ColumnarJSONRenderer
+from rest_framework.settings import api_settings
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def request_user(request, create=False):
+    """The authenticated user, else the shared anonymous account (None if it doesn't exist and create is False)"""
+    if request.user.is_authenticated:
+        return request.user
+    if create:
+        return get_user_model().objects.get_or_create(
+            name='anonymous_user', defaults={'password': make_password(None)}
+        )[0]
+    return get_user_model().objects.filter(name='anonymous_user').first()
+
+
+def int_param(request, name, default, minimum=None, maximum=None):
+    """Integer query param clamped to [minimum, maximum]; raises ValueError (a 400) if it isn't an integer"""
+    raw = request.query_params.get(name)
+    if raw in (None, ''):
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+    if minimum is not None:
+        value = max(value, minimum)
+    if maximum is not None:
+        value = min(value, maximum)
+    return value
+
+
+def check_not_modified(request, user, state=None):
+    """Compute validators for this request; returns (304 response or None, validators)"""
+    validators = MoodVersionService.validators(
+        user.pk, request.get_full_path(), request.accepted_renderer.format, state=state
+    )
+    etag, last_modified = validators
+    not_modified = get_conditional_response(request, etag=etag, last_modified=int(last_modified.timestamp()))
+    if not_modified is not None:
+        add_validators(not_modified, validators)
+    return not_modified, validators
+
+
+def add_validators(response, validators):
+    """Attach ETag/Last-Modified and make clients revalidate instead of reusing blindly"""
+    etag, last_modified = validators
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
 
 class MoodLogView(APIView):
     """
@@ -24,17 +84,7 @@ class MoodLogView(APIView):
         """Log mood entry"""
         
         # Handle unauthenticated users (for testing)
-        if request.user.is_authenticated:
-            user = request.user
-        else:
-            user, created = User.objects.get_or_create(
-                username='anonymous_user',
-                defaults={
-                    'email': 'anonymous@test.com',
-                    'first_name': 'Anonymous',
-                    'last_name': 'User'
-                }
-            )
+        user = request_user(request, create=True)
         
         serializer = MoodEntryCreateSerializer(data=request.data)
         
@@ -42,15 +92,15 @@ class MoodLogView(APIView):
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            # Create mood entry
-            mood_entry = serializer.save(user=user)
-            
-            # Update streak
-            streak = MoodService.update_streak(user, mood_entry.date)
+            with transaction.atomic():
+                # Create mood entry
+                mood_entry = serializer.save(user=user)
+                MoodRollupService.entry_created(mood_entry)
+                
+                # Update streak
+                streak = MoodService.update_streak(user, mood_entry.date)
             
-            # Generate weekly insight if it's been 7 days
-            if streak.total_entries % 7 == 0:
-                MoodService.generate_weekly_insight(user)
+            # Weekly insights are generated by the generate_weekly_insights command
             
             return Response({
                 'mood_entry': MoodEntrySerializer(mood_entry).data,
@@ -70,47 +120,73 @@ class MoodHistoryView(APIView):
     """
     API endpoint to get mood history for charts
     GET /mood/history/ - Returns mood chart data
+    
+    Query params:
+        days: range length (max 365 for daily rows, 3650 when bucketed or downsampled)
+        granularity: day (default), week, month or auto
+        points: optional LTTB point budget for daily data (clamped to 3-2000)
+        format=columnar: parallel arrays instead of one dict per row
     """
     permission_classes = [AllowAny]  # Change to [IsAuthenticated] for production
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, ColumnarJSONRenderer]
+    GRANULARITIES = ['day', 'week', 'month', 'auto']
+    MAX_DAILY_DAYS = 365
+    MAX_DAYS = 3650
+    MIN_POINTS = 3
+    MAX_POINTS = 2000
     
     def get(self, request):
         """Get mood history data"""
         
         # Handle unauthenticated users
-        if request.user.is_authenticated:
-            user = request.user
-        else:
-            try:
-                user = User.objects.get(username='anonymous_user')
-            except User.DoesNotExist:
-                return Response({'chart_data': [], 'message': 'No mood data found'})
+        user = request_user(request)
+        if user is None:
+            return Response({'chart_data': [], 'message': 'No mood data found'})
+        
+        # Nothing changed since the client's copy: skip the query and serialization
+        state = MoodVersionService.get(user.pk)
+        not_modified, validators = check_not_modified(request, user, state)
+        if not_modified:
+            return not_modified
         
         # Get query parameters
-        days = int(request.query_params.get('days', 30))
-        days = min(days, 365)  # Limit to 1 year max
-        
-        # Get chart data
-        chart_data = MoodService.get_mood_chart_data(user, days)
-        
-        # Calculate statistics
-        entries_with_data = [entry for entry in chart_data if entry['has_entry']]
-        
-        stats = {}
-        if entries_with_data:
-            mood_ratings = [entry['mood_rating'] for entry in entries_with_data]
-            stats = {
-                'total_entries': len(entries_with_data),
-                'average_mood': sum(mood_ratings) / len(mood_ratings),
-                'best_mood': max(mood_ratings),
-                'worst_mood': min(mood_ratings),
-                'tracking_percentage': (len(entries_with_data) / days) * 100
-            }
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity not in self.GRANULARITIES:
+            return Response(
+                {'error': f"granularity must be one of {', '.join(self.GRANULARITIES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            points = int_param(request, 'points', None, self.MIN_POINTS, self.MAX_POINTS)
+            days = int_param(request, 'days', 30, 1, self.MAX_DAYS)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        return Response({
+        granularity = MoodService.resolve_granularity(granularity, days)
+        if granularity == 'day' and not points:
+            days = min(days, self.MAX_DAILY_DAYS)  # One row per day is only sent for up to a year
+        days = min(days, self.MAX_DAYS)
+        
+        # Chart data and statistics come from one query, cached per data version
+        chart_data, stats = MoodService.get_cached_history(user, days, granularity, version=state[0])
+        if granularity == 'day' and points:
+            chart_data = MoodService.downsample_lttb(chart_data, points)
+        
+        if request.accepted_renderer.format == ColumnarJSONRenderer.format:
+            return add_validators(Response({
+                'format': 'columnar',
+                **MoodService.to_columnar(chart_data, granularity, include_dates=bool(points)),
+                'statistics': stats,
+                'period_days': days,
+                'granularity': granularity
+            }), validators)
+        
+        return add_validators(Response({
             'chart_data': chart_data,
             'statistics': stats,
-            'period_days': days
-        })
+            'period_days': days,
+            'granularity': granularity
+        }), validators)
 
 class MoodStreakView(APIView):
     """
@@ -123,34 +199,34 @@ class MoodStreakView(APIView):
         """Get mood streak information"""
         
         # Handle unauthenticated users
-        if request.user.is_authenticated:
-            user = request.user
-        else:
-            try:
-                user = User.objects.get(username='anonymous_user')
-            except User.DoesNotExist:
-                return Response({
-                    'current_streak': 0,
-                    'longest_streak': 0,
-                    'total_entries': 0,
-                    'last_check_in': None
-                })
+        user = request_user(request)
+        if user is None:
+            return Response({
+                'current_streak': 0,
+                'longest_streak': 0,
+                'total_entries': 0,
+                'last_check_in': None
+            })
+        
+        not_modified, validators = check_not_modified(request, user)
+        if not_modified:
+            return not_modified
         
         try:
             streak = MoodStreak.objects.get(user=user)
-            return Response(MoodStreakSerializer(streak).data)
+            return add_validators(Response(MoodStreakSerializer(streak).data), validators)
         except MoodStreak.DoesNotExist:
-            return Response({
+            return add_validators(Response({
                 'current_streak': 0,
                 'longest_streak': 0,
                 'total_entries': 0,
                 'last_check_in': None
-            })
+            }), validators)
 
 class MoodInsightsView(APIView):
     """
     API endpoint to get mood insights
-    GET /mood/insights/ - Returns generated insights
+    GET /mood/insights/ - Returns generated insights and the unread count (?unread=true for unread only)
     """
     permission_classes = [AllowAny]  # Change to [IsAuthenticated] for production
     
@@ -158,20 +234,75 @@ class MoodInsightsView(APIView):
         """Get mood insights"""
         
         # Handle unauthenticated users
-        if request.user.is_authenticated:
-            user = request.user
+        user = request_user(request)
+        if user is None:
+            return Response({'insights': [], 'unread_count': 0})
+        
+        not_modified, validators = check_not_modified(request, user)
+        if not_modified:
+            return not_modified
+        
+        insights = MoodInsight.objects.filter(user=user)
+        if request.query_params.get('unread') == 'true':
+            insights = insights.filter(is_read=False)
+        
+        return add_validators(Response({
+            'insights': MoodInsightSerializer(insights[:10], many=True).data,  # Latest 10 insights
+            'unread_count': MoodInsightService.unread_count(user)
+        }), validators)
+
+class MoodInsightsReadView(APIView):
+    """
+    API endpoint to mark insights as read
+    POST /mood/insights/read/ - {"ids": [...]} marks those insights read, {"all": true} marks every one
+    """
+    permission_classes = [AllowAny]  # Change to [IsAuthenticated] for production
+    
+    def post(self, request):
+        """Mark insights as read"""
+        user = request_user(request)
+        if user is None:
+            return Response({'updated': 0, 'unread_count': 0})
+        
+        if request.data.get('all'):
+            insight_ids = None
         else:
+            insight_ids = request.data.get('ids')
+            if not isinstance(insight_ids, list) or not insight_ids:
+                return Response(
+                    {'error': 'Send "ids" as a non-empty list or "all": true'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             try:
-                user = User.objects.get(username='anonymous_user')
-            except User.DoesNotExist:
-                return Response({'insights': []})
-        
-        insights = MoodInsight.objects.filter(user=user)[:10]  # Latest 10 insights
+                insight_ids = [uuid.UUID(str(insight_id)) for insight_id in insight_ids]
+            except ValueError:
+                return Response({'error': 'ids must be insight UUIDs'}, status=status.HTTP_400_BAD_REQUEST)
         
+        updated = MoodInsightService.mark_read(user, insight_ids)
         return Response({
-            'insights': MoodInsightSerializer(insights, many=True).data
+            'updated': updated,
+            'unread_count': MoodInsightService.unread_count(user)
         })
 
+class MoodUnreadInsightsView(APIView):
+    """
+    API endpoint for polling the unread insight count
+    GET /mood/insights/unread/ - Returns {"unread_count": n}; answers 304 while nothing changed
+    """
+    permission_classes = [AllowAny]  # Change to [IsAuthenticated] for production
+    
+    def get(self, request):
+        """Get unread insight count"""
+        user = request_user(request)
+        if user is None:
+            return Response({'unread_count': 0})
+        
+        not_modified, validators = check_not_modified(request, user)
+        if not_modified:
+            return not_modified
+        
+        return add_validators(Response({'unread_count': MoodInsightService.unread_count(user)}), validators)
+
 class TodayMoodView(APIView):
     """
     API endpoint to get/update today's mood
@@ -184,45 +315,38 @@ class TodayMoodView(APIView):
         """Get today's mood entry"""
         
         # Handle unauthenticated users
-        if request.user.is_authenticated:
-            user = request.user
-        else:
-            try:
-                user = User.objects.get(username='anonymous_user')
-            except User.DoesNotExist:
-                return Response({'today_mood': None, 'has_logged_today': False})
+        user = request_user(request)
+        if user is None:
+            return Response({'today_mood': None, 'has_logged_today': False})
         
-        try:
-            today_entry = MoodEntry.objects.get(user=user, date=date.today())
-            return Response({
-                'today_mood': MoodEntrySerializer(today_entry).data,
+        not_modified, validators = check_not_modified(request, user)
+        if not_modified:
+            return not_modified
+        
+        today_entries = fast_mood_entry_data(MoodEntry.objects.filter(user=user, date=date.today()))
+        if today_entries:
+            return add_validators(Response({
+                'today_mood': today_entries[0],
                 'has_logged_today': True
-            })
-        except MoodEntry.DoesNotExist:
-            return Response({'today_mood': None, 'has_logged_today': False})
+            }), validators)
+        return add_validators(Response({'today_mood': None, 'has_logged_today': False}), validators)
     
     def put(self, request):
         """Update today's mood entry"""
         
         # Handle unauthenticated users
-        if request.user.is_authenticated:
-            user = request.user
-        else:
-            user, created = User.objects.get_or_create(
-                username='anonymous_user',
-                defaults={
-                    'email': 'anonymous@test.com',
-                    'first_name': 'Anonymous',
-                    'last_name': 'User'
-                }
-            )
+        user = request_user(request, create=True)
         
         try:
             today_entry = MoodEntry.objects.get(user=user, date=date.today())
             serializer = MoodEntryCreateSerializer(today_entry, data=request.data, partial=True)
             
             if serializer.is_valid():
-                serializer.save()
+                old_values = MoodRollupService.entry_values(today_entry)
+                with transaction.atomic():
+                    serializer.save()
+                    MoodRollupService.entry_updated(user.pk, old_values, today_entry)
+                    MoodVersionService.bump(user.pk)
                 return Response({
                     'mood_entry': MoodEntrySerializer(today_entry).data,
                     'status': 'updated'
@@ -233,3 +357,123 @@ class TodayMoodView(APIView):
         except MoodEntry.DoesNotExist:
             return Response({'error': 'No mood entry found for today'}, status=status.HTTP_404_NOT_FOUND)
 
+class MoodRollupsView(APIView):
+    """
+    API endpoint for long-range mood trends
+    GET /mood/rollups/?period=week|month&count=N - Per-period averages from rollup rows
+    """
+    permission_classes = [AllowAny]  # Change to [IsAuthenticated] for production
+    
+    def get(self, request):
+        """Get weekly or monthly mood rollups"""
+        user = request_user(request)
+        if user is None:
+            return Response({'rollups': []})
+        
+        period = request.query_params.get('period', 'week')
+        if period not in MoodRollupService.TRUNCATES:
+            return Response({'error': 'period must be week or month'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        try:
+            count = int_param(request, 'count', 12, 1, 120)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        current_start = dict(MoodRollupService.period_starts(date.today()))[period]
+        if period == 'week':
+            since = current_start - timedelta(weeks=count - 1)
+        else:
+            months_back = current_start.year * 12 + current_start.month - count
+            since = date(months_back // 12, months_back % 12 + 1, 1)
+        
+        return Response({
+            'period': period,
+            'rollups': MoodRollupService.get_series(user, period, since)
+        })
+
+class MoodBulkImportView(APIView):
+    """
+    API endpoint to import many mood entries at once
+    POST /mood/bulk/ - JSON array (or {"entries": [...]}), or a CSV/JSON file upload as "file"
+    """
+    permission_classes = [IsAuthenticated]
+    parser_classes = [JSONParser, MultiPartParser]
+    
+    def post(self, request):
+        """Import mood entries, updating existing days"""
+        uploaded_file = request.FILES.get('file')
+        
+        try:
+            if uploaded_file:
+                stream = MoodImportService.open_text(uploaded_file)
+                if uploaded_file.name.lower().endswith('.csv'):
+                    rows = MoodImportService.parse_csv(stream)
+                else:
+                    rows = MoodImportService.parse_json(stream)
+            elif isinstance(request.data, list):
+                rows = request.data
+            else:
+                rows = request.data.get('entries')
+                if not isinstance(rows, list):
+                    return Response(
+                        {'error': 'Send a list of entries or upload a CSV/JSON file as "file"'},
+                        status=status.HTTP_400_BAD_REQUEST
+                    )
+            
+            result = MoodImportService.import_rows(request.user, rows)
+        except (ValueError, csv.Error) as e:
+            return Response({'error': f'Could not parse import: {e}'}, status=status.HTTP_400_BAD_REQUEST)
+        
+        if result['parse_error'] and not result['imported']:
+            return Response(
+                {'error': f"Could not parse import: {result['parse_error']}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # Malformed input partway through keeps what was imported before it
+        streak = MoodStreak.objects.filter(user=request.user).first()
+        return Response({
+            **result,
+            'streak': MoodStreakSerializer(streak).data if streak else None,
+            'status': 'partial' if result['parse_error'] else 'success'
+        })
+
+class MoodDashboardView(APIView):
+    """
+    API endpoint for the dashboard overview
+    GET /mood/dashboard/ - Streak, today's mood, 7-day chart and unread insight count in one response
+    """
+    permission_classes = [AllowAny]  # Change to [IsAuthenticated] for production
+    
+    def get(self, request):
+        """Get dashboard data"""
+        user = request_user(request)
+        if user is None:
+            return Response({
+                'streak': {'current_streak': 0, 'longest_streak': 0, 'last_check_in': None, 'total_entries': 0},
+                'today': {'today_mood': None, 'has_logged_today': False},
+                'mood_history': {'chart_data': [], 'statistics': {}, 'period_days': 7, 'granularity': 'day'},
+                'unread_insights': 0
+            })
+        
+        state = MoodVersionService.get(user.pk)
+        not_modified, validators = check_not_modified(request, user, state)
+        if not_modified:
+            return not_modified
+        
+        return add_validators(Response(MoodService.get_cached_dashboard(user, version=state[0])), validators)
+
+class PopulationAnalyticsView(APIView):
+    """
+    Admin-only API endpoint for population-level mood trends
+    GET /mood/admin/analytics/?days=90&cohort_weeks=8 - Daily activity, retention cohorts and streak distribution
+    """
+    permission_classes = [IsAdminUser]
+    
+    def get(self, request):
+        """Get population analytics"""
+        try:
+            days, cohort_weeks = PopulationAnalyticsService.parse_params(request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(PopulationAnalyticsService.get_summary(days, cohort_weeks))
+
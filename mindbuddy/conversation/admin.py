@@ -1,21 +1,33 @@
 from django.contrib import admin
-from .models import Conversation, Message, ConversationMemory
+from mindbuddy.admin_performance import PerformanceAdminMixin
+from .models import Conversation, Message, ConversationMemory, UserMemoryProfile
 
 @admin.register(Conversation)
-class ConversationAdmin(admin.ModelAdmin):
+class ConversationAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ['id', 'user', 'title', 'created_at', 'is_active']
     list_filter = ['is_active', 'created_at']
-    search_fields = ['user__username', 'title']
+    list_select_related = ['user']
+    search_fields = ['user__name__exact']
     readonly_fields = ['id', 'created_at', 'updated_at']
+    keyset_field = 'updated_at'
 
 @admin.register(Message)
-class MessageAdmin(admin.ModelAdmin):
+class MessageAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ['id', 'conversation', 'sender_type', 'timestamp']
     list_filter = ['sender_type', 'timestamp']
-    search_fields = ['content', 'conversation__user__username']
+    list_select_related = ['conversation__user']
+    search_fields = ['conversation__user__name__exact']
     readonly_fields = ['id', 'timestamp']
+    raw_id_fields = ['conversation']
+    keyset_field = 'timestamp'
 
 @admin.register(ConversationMemory)
 class ConversationMemoryAdmin(admin.ModelAdmin):
     list_display = ['conversation', 'last_updated']
-    readonly_fields = ['conversation', 'last_updated']
\ No newline at end of file
+    readonly_fields = ['conversation', 'last_updated']
+
+@admin.register(UserMemoryProfile)
+class UserMemoryProfileAdmin(admin.ModelAdmin):
+    list_display = ['user', 'conversation_count', 'last_updated']
+    search_fields = ['user__name']
+    readonly_fields = ['user', 'last_updated']
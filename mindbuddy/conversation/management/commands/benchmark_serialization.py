@@ -0,0 +1,111 @@
+import time
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from conversation.models import Conversation, Message
+from conversation.serializers import ConversationSerializer, fast_conversation_data
+from Mood_Tracking.models import MoodEntry
+from Mood_Tracking.serializers import MoodEntrySerializer, fast_mood_entry_data
+from mindbuddy.renderers import ORJSONRenderer
+from quiz.models import QuizTopic, Quiz, QuizResult
+from quiz.serializers import QuizResultSerializer, fast_quiz_result_data
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Compare DRF ModelSerializer rendering with the fast .values() + orjson path"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=2000, help='Rows per endpoint')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed runs per path (best is reported)')
+
+    def handle(self, *args, **options):
+        rows, repeat = options['rows'], options['repeat']
+
+        # Fixtures live in a transaction that is always rolled back
+        with transaction.atomic():
+            querysets = self._create_fixtures(rows)
+
+            cases = [
+                ('messages', querysets['conversations'],
+                 lambda qs: ConversationSerializer(qs, many=True).data, fast_conversation_data),
+                ('mood entries', querysets['mood_entries'],
+                 lambda qs: MoodEntrySerializer(qs, many=True).data, fast_mood_entry_data),
+                ('quiz results', querysets['quiz_results'],
+                 lambda qs: QuizResultSerializer(qs, many=True).data, fast_quiz_result_data),
+            ]
+
+            for name, queryset, slow, fast in cases:
+                slow_bytes, slow_time = self._time(lambda: JSONRenderer().render(slow(queryset.all())), repeat)
+                fast_bytes, fast_time = self._time(lambda: ORJSONRenderer().render(fast(queryset.all())), repeat)
+
+                identical = 'identical' if slow_bytes == fast_bytes else 'MISMATCH'
+                self.stdout.write(
+                    f"{name:>13}: DRF {slow_time * 1000:8.1f} ms | fast {fast_time * 1000:8.1f} ms | "
+                    f"{slow_time / fast_time:5.1f}x | output {identical}"
+                )
+
+            transaction.set_rollback(True)
+
+    def _time(self, func, repeat):
+        best, output = None, None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            output = func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return output, best
+
+    def _create_fixtures(self, rows):
+        user = User.objects.create_user(name='benchmark_serialization_user')
+
+        conversation = Conversation.objects.create(user=user, title="Benchmark")
+        Message.objects.bulk_create([
+            Message(
+                conversation=conversation,
+                content=f"Benchmark message {i} – with some non-ASCII text ✨",
+                sender_type='user' if i % 2 else 'assistant',
+                model_used='' if i % 2 else 'llama3-8b-8192',
+                response_time=None if i % 2 else 0.25 + i / 1000
+            )
+            for i in range(rows)
+        ])
+
+        today = date.today()
+        MoodEntry.objects.bulk_create([
+            MoodEntry(
+                user=user,
+                date=today - timedelta(days=i),
+                mood_rating=1 + i % 5,
+                energy_level=None if i % 3 == 0 else 1 + i % 5,
+                anxiety_level=1 + (i * 7) % 5,
+                notes='' if i % 4 else f"Note {i}"
+            )
+            for i in range(rows)
+        ])
+
+        topic = QuizTopic.objects.create(name='Benchmark Topic')
+        quiz = Quiz.objects.create(
+            user=user, topic=topic, length=3,
+            questions_data=[{'question': f"Q{i}?", 'options': ['A', 'B']} for i in range(3)]
+        )
+        QuizResult.objects.bulk_create([
+            QuizResult(
+                user=user, quiz=quiz,
+                answers_data=[{'question': f"Q{j}?", 'answer': 'A'} for j in range(3)],
+                insights=f"**Insight {i}**\n* Be kind to yourself",
+                liked=[None, True, False][i % 3]
+            )
+            for i in range(rows)
+        ])
+
+        return {
+            'conversations': Conversation.objects.filter(user=user),
+            'mood_entries': MoodEntry.objects.filter(user=user),
+            'quiz_results': QuizResult.objects.filter(user=user).order_by('-completed_at'),
+        }
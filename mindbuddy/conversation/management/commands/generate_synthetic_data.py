@@ -0,0 +1,382 @@
+import io
+import json
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, time as dt_time, timedelta
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.utils import timezone
+
+from conversation.models import Conversation, Message, ConversationMemory
+from Mood_Tracking.models import MoodEntry, MoodInsight
+from conversation.services import MemoryService, RetrievalService
+from Mood_Tracking.services import MoodService, MoodRollupService
+from quiz.models import QuizTopic, Quiz, QuizResult, QuizHistory
+from quiz.services import QuizTopicService
+
+User = get_user_model()
+
+TOPICS = ['Stress', 'Sleep', 'Anxiety', 'Self-esteem', 'Relationships', 'Work-life balance', 'Mindfulness']
+QUIZ_OPTIONS = ['Never', 'Rarely', 'Sometimes', 'Often', 'Always']
+USER_MESSAGES = [
+    "I've been feeling {feeling} lately and I'm not sure why.",
+    "Work has been {feeling} this week.",
+    "I couldn't sleep well last night, everything feels {feeling}.",
+    "Talking to my friends helped, I feel {feeling} now.",
+    "Can you suggest something for when I feel {feeling}?",
+]
+ASSISTANT_MESSAGES = [
+    "Thank you for sharing that. What do you think has been making things feel {feeling}?",
+    "It sounds like a lot to carry. Would a short breathing exercise help right now?",
+    "That's a real step forward. What helped you the most?",
+    "Feeling {feeling} is understandable. Let's look at one small thing you could try today.",
+]
+FEELINGS = ['overwhelming', 'calm', 'stressful', 'hopeful', 'heavy', 'lighter', 'anxious', 'okay']
+NOTES = ['', '', '', 'Good walk today', 'Long day at work', 'Slept badly', 'Saw friends', 'Felt productive']
+
+# Models whose auto_now/auto_now_add timestamps are written explicitly with historical values
+TIMESTAMPED_MODELS = [User, Conversation, ConversationMemory, Quiz, QuizResult, QuizHistory]
+
+
+@contextmanager
+def explicit_timestamps(models):
+    """Let bulk_create keep the timestamps we set instead of overwriting them with now()"""
+    changed = []
+    for model in models:
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                changed.append((field, field.auto_now, field.auto_now_add))
+                field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in changed:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class RowWriter:
+    """Buffers plain tuples for one model and writes them with COPY on PostgreSQL, executemany elsewhere"""
+
+    def __init__(self, model, field_names, batch_size):
+        self.model = model
+        self.fields = [model._meta.get_field(name) for name in field_names]
+        self.batch_size = batch_size
+        self.rows = []
+        self.count = 0
+
+    def add(self, row):
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.rows:
+            return
+        if connection.vendor == 'postgresql':
+            self._copy()
+        else:
+            self._insert()
+        self.count += len(self.rows)
+        self.rows = []
+
+    def _columns(self):
+        return ', '.join(connection.ops.quote_name(field.column) for field in self.fields)
+
+    def _copy(self):
+        sql = f"COPY {connection.ops.quote_name(self.model._meta.db_table)} ({self._columns()}) FROM STDIN"
+        data = ''.join('\t'.join(map(self._copy_value, row)) + '\n' for row in self.rows)
+        with connection.cursor() as cursor:
+            raw = cursor.cursor
+            if hasattr(raw, 'copy_expert'):  # psycopg2
+                raw.copy_expert(sql, io.StringIO(data))
+            else:  # psycopg 3
+                with raw.copy(sql) as copy:
+                    copy.write(data)
+
+    @staticmethod
+    def _copy_value(value):
+        """COPY text format: \\N for NULL, backslash escapes for separators"""
+        if value is None:
+            return '\\N'
+        if isinstance(value, bool):
+            return 't' if value else 'f'
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value)
+        return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+    def _insert(self):
+        sql = (
+            f"INSERT INTO {connection.ops.quote_name(self.model._meta.db_table)} ({self._columns()}) "
+            f"VALUES ({', '.join(['%s'] * len(self.fields))})"
+        )
+        db = connections[DEFAULT_DB_ALIAS]  # Concrete wrapper: going through the proxy per value is slow
+        prepared = [
+            [field.get_db_prep_save(value, db) for field, value in zip(self.fields, row)]
+            for row in self.rows
+        ]
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, prepared)
+
+
+class Command(BaseCommand):
+    help = "Generate deterministic synthetic users with mood, chat and quiz history for benchmarking"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--years', type=float, default=1.0, help='Length of history to generate')
+        parser.add_argument('--seed', type=int, default=42, help='Same seed and end date give identical data')
+        parser.add_argument('--end-date', type=date.fromisoformat, default=None,
+                            help='Last day of generated history (default: today)')
+        parser.add_argument('--prefix', default='synthetic', help='User name prefix')
+        parser.add_argument('--chunk-size', type=int, default=200, help='Users generated per transaction')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per INSERT')
+        parser.add_argument('--clear', action='store_true', help='Delete existing users with this prefix first')
+
+    def handle(self, *args, **options):
+        self.rng = np.random.default_rng(options['seed'])
+        self.id_random = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.end_date = options['end_date'] or date.today()
+        self.days = max(int(options['years'] * 365), 7)
+        self.start_date = self.end_date - timedelta(days=self.days - 1)
+        self.verbosity = options['verbosity']
+        prefix = options['prefix']
+
+        if options['clear']:
+            deleted, _ = User.objects.filter(name__startswith=f"{prefix}_").delete()
+            self.stdout.write(f"Deleted {deleted} existing synthetic rows")
+        elif User.objects.filter(name__startswith=f"{prefix}_").exists():
+            raise CommandError(f"Users named '{prefix}_*' already exist; use --clear or another --prefix")
+
+        topics = [QuizTopic.objects.get_or_create(name=name) for name in TOPICS]
+        if any(created for _, created in topics):
+            QuizTopicService.invalidate()
+        self.topics = [topic for topic, _ in topics]
+        # One deterministic hash for every user: hashing per user would dominate the run time
+        self.password = make_password('synthetic', salt='synthetic')
+
+        # The high-volume tables skip model instances entirely
+        self.writers = {
+            MoodEntry: RowWriter(MoodEntry, [
+                'id', 'user', 'date', 'mood_rating', 'energy_level', 'anxiety_level', 'notes',
+                'created_at', 'updated_at'
+            ], self.batch_size),
+            MoodInsight: RowWriter(MoodInsight, [
+                'id', 'user', 'insight_type', 'period_key', 'title', 'description', 'data',
+                'date_generated', 'is_read'
+            ], self.batch_size),
+            Message: RowWriter(Message, [
+                'id', 'conversation', 'content', 'sender_type', 'timestamp', 'model_used', 'response_time'
+            ], self.batch_size),
+        }
+        self.tz = timezone.get_current_timezone()
+
+        started = time.monotonic()
+        self.counts = {}
+        with explicit_timestamps(TIMESTAMPED_MODELS):
+            for start in range(0, options['users'], options['chunk_size']):
+                names = [f"{prefix}_{i:07d}" for i in range(start, min(start + options['chunk_size'], options['users']))]
+                with transaction.atomic():
+                    self._generate_chunk(names)
+                if self.verbosity > 1:
+                    self.stdout.write(f"  {start + len(names)} users")
+
+        elapsed = time.monotonic() - started
+        for model, writer in self.writers.items():
+            self.counts[model.__name__] = writer.count
+        total = sum(self.counts.values())
+        for model_name, count in self.counts.items():
+            self.stdout.write(f"  {model_name:>20}: {count}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Inserted {total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)"
+        ))
+
+    def _uuid(self):
+        return uuid.UUID(int=self.id_random.getrandbits(128), version=4)
+
+    def _moment(self, day, hour_offset=0.0):
+        """Aware datetime on day at a plausible local hour (evening-heavy)"""
+        hour = float(np.clip(self.rng.normal(19, 3), 6, 23.5)) + hour_offset
+        return self._at(day, hour)
+
+    def _at(self, day, hour):
+        return datetime.combine(day, dt_time.min, tzinfo=self.tz) + timedelta(hours=min(hour, 23.99))
+
+    def _bulk(self, model, objects):
+        if objects:
+            model.objects.bulk_create(objects, batch_size=self.batch_size)
+            self.counts[model.__name__] = self.counts.get(model.__name__, 0) + len(objects)
+
+    def _generate_chunk(self, names):
+        rng = self.rng
+        signups = rng.integers(0, self.days, size=len(names))
+        users = []
+        for name, offset in zip(names, signups):
+            joined = self._moment(self.start_date + timedelta(days=int(offset)))
+            users.append(User(
+                name=name, password=self.password, is_active=True,
+                date_joined=joined, created_at=joined, updated_at=joined
+            ))
+        self._bulk(User, users)
+        users = list(User.objects.filter(name__in=names).order_by('name'))
+
+        conversations, memories = [], []
+        quizzes, results, histories = [], [], []
+        for user, signup in zip(users, signups):
+            first_day = self.start_date + timedelta(days=int(signup))
+            self._mood_history(user.pk, first_day)
+            self._conversations(user, first_day, conversations, memories)
+            self._quizzes(user, first_day, quizzes, results, histories)
+
+        self._bulk(Conversation, conversations)
+        for writer in self.writers.values():
+            writer.flush()
+        self._bulk(ConversationMemory, memories)
+        self._bulk(Quiz, quizzes)
+        self._bulk(QuizResult, results)
+        self._bulk(QuizHistory, histories)
+
+        user_ids = [user.pk for user in users]
+        MoodService.recompute_streaks(user_ids)
+        MoodRollupService.rebuild(user_ids)
+        RetrievalService().index_user_messages(user_ids, batch_size=self.batch_size)
+        MemoryService().rebuild_profiles(user_ids)
+
+    def _mood_history(self, user_id, first_day):
+        rng = self.rng
+        span = (self.end_date - first_day).days + 1
+
+        # Engaged users log most days; some churn after a while
+        adherence = rng.beta(4, 2)
+        active_days = span if rng.random() > 0.35 else int(rng.integers(1, span + 1))
+        logged = np.flatnonzero(rng.random(active_days) < adherence)
+        if not len(logged):
+            return
+
+        # Personal baseline + weekly rhythm + slow AR(1) drift
+        baseline = rng.normal(3.2, 0.5)
+        weekday = np.array([(first_day + timedelta(days=int(d))).weekday() for d in logged])
+        drift = np.zeros(len(logged))
+        noise = rng.normal(0, 0.35, size=len(logged))
+        for i in range(1, len(logged)):
+            drift[i] = 0.9 * drift[i - 1] + noise[i]
+        mood_float = baseline + drift + np.where(weekday >= 5, 0.3, 0.0) - np.where(weekday == 0, 0.25, 0.0)
+        mood = np.clip(np.rint(mood_float + rng.normal(0, 0.5, len(logged))), 1, 5).astype(int)
+        energy = np.clip(np.rint(mood_float + rng.normal(0, 0.8, len(logged))), 1, 5).astype(int)
+        anxiety = np.clip(np.rint(6 - mood_float + rng.normal(0, 0.9, len(logged))), 1, 5).astype(int)
+        energy_missing = rng.random(len(logged)) < 0.2
+        anxiety_missing = rng.random(len(logged)) < 0.25
+        notes = rng.integers(0, len(NOTES), size=len(logged))
+        hours = np.clip(rng.normal(19, 3, size=len(logged)), 6, 23.5)
+
+        entries = self.writers[MoodEntry]
+        for i, offset in enumerate(logged):
+            day = first_day + timedelta(days=int(offset))
+            created = self._at(day, hours[i])
+            entries.add((
+                self._uuid(), user_id, day, int(mood[i]),
+                None if energy_missing[i] else int(energy[i]),
+                None if anxiety_missing[i] else int(anxiety[i]),
+                NOTES[notes[i]], created, created
+            ))
+
+        # Weekly summaries for every ISO week with entries, as the weekly job would have written
+        ordinals = np.array([(first_day + timedelta(days=int(d))).toordinal() for d in logged])
+        week_index = (ordinals - 1) // 7  # Ordinal 1 is a Monday
+        insights = self.writers[MoodInsight]
+        for week in np.unique(week_index)[:-1]:
+            in_week = week_index == week
+            week_start = date.fromordinal(int(week) * 7 + 1)
+            year, number, _ = week_start.isocalendar()
+            insights.add((
+                self._uuid(), user_id, 'weekly_average', f"{year}-W{number:02d}",
+                "Weekly Mood Summary",
+                f"Your average mood for the week of {week_start:%B %d} was {mood[in_week].mean():.1f}/5.",
+                {
+                    'avg_mood': round(float(mood[in_week].mean()), 2),
+                    'avg_energy': self._logged_mean(energy, in_week & ~energy_missing),
+                    'avg_anxiety': self._logged_mean(anxiety, in_week & ~anxiety_missing),
+                    'entries_count': int(in_week.sum()),
+                    'week_start': week_start.isoformat()
+                },
+                self._at(week_start + timedelta(days=7), 7.0),
+                bool(rng.random() < 0.8)
+            ))
+
+    @staticmethod
+    def _logged_mean(values, mask):
+        """Mean over the values actually written, 0 if none (as Avg() or 0 in the weekly job)"""
+        return round(float(values[mask].mean()), 2) if mask.any() else 0
+
+    def _conversations(self, user, first_day, conversations, memories):
+        rng = self.rng
+        span = (self.end_date - first_day).days + 1
+        for _ in range(rng.poisson(max(span / 60, 0.5))):
+            day = first_day + timedelta(days=int(rng.integers(0, span)))
+            started = self._moment(day, -2)
+            conversation = Conversation(
+                id=self._uuid(), user=user, title=f"Chat on {day:%b %d}",
+                created_at=started, is_active=bool(rng.random() < 0.3)
+            )
+            timestamp = started
+            messages = self.writers[Message]
+            for turn in range(int(rng.poisson(5)) + 1):
+                feeling = FEELINGS[rng.integers(len(FEELINGS))]
+                timestamp += timedelta(seconds=int(rng.integers(20, 300)))
+                messages.add((
+                    self._uuid(), conversation.id,
+                    USER_MESSAGES[rng.integers(len(USER_MESSAGES))].format(feeling=feeling),
+                    'user', timestamp, '', None
+                ))
+                response_time = float(rng.gamma(2.0, 0.4))
+                timestamp += timedelta(seconds=response_time)
+                messages.add((
+                    self._uuid(), conversation.id,
+                    ASSISTANT_MESSAGES[rng.integers(len(ASSISTANT_MESSAGES))].format(feeling=feeling),
+                    'assistant', timestamp, 'llama3-8b-8192', round(response_time, 3)
+                ))
+            conversation.updated_at = timestamp
+            conversations.append(conversation)
+            memories.append(ConversationMemory(
+                conversation=conversation,
+                user_profile={'mentioned_feelings': sorted({FEELINGS[i] for i in rng.integers(len(FEELINGS), size=2)})},
+                key_insights=[f"Often feels {FEELINGS[rng.integers(len(FEELINGS))]}"],
+                therapeutic_goals=['Sleep better'] if rng.random() < 0.4 else [],
+                last_updated=timestamp
+            ))
+
+    def _quizzes(self, user, first_day, quizzes, results, histories):
+        rng = self.rng
+        span = (self.end_date - first_day).days + 1
+        latest = {}
+        for _ in range(rng.poisson(max(span / 90, 0.3))):
+            topic = self.topics[rng.integers(len(self.topics))]
+            length = int(rng.choice([3, 5, 8]))
+            taken = self._moment(first_day + timedelta(days=int(rng.integers(0, span))))
+            questions = [
+                {'question': f"How often do you notice {topic.name.lower()} affecting you ({n + 1})?",
+                 'options': QUIZ_OPTIONS}
+                for n in range(length)
+            ]
+            answers = [
+                {'question': question['question'], 'answer': QUIZ_OPTIONS[rng.integers(len(QUIZ_OPTIONS))]}
+                for question in questions
+            ]
+            quiz = Quiz(user=user, topic=topic, length=length, questions_data=questions, created_at=taken)
+            quizzes.append(quiz)
+            results.append(QuizResult(
+                user=user, quiz=quiz, answers_data=answers, completed_at=taken + timedelta(minutes=3),
+                insights=f"**Your {topic.name} check-in**\n* Notice small wins\n* Keep a steady routine",
+                liked=[None, True, False][int(rng.choice(3, p=[0.6, 0.3, 0.1]))]
+            ))
+            if topic.pk not in latest or latest[topic.pk][0] < taken:
+                latest[topic.pk] = (taken, topic, answers)
+
+        for taken, topic, answers in latest.values():
+            histories.append(QuizHistory(user=user, topic=topic, results_data=answers, date=taken))
@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from conversation.services import RetrievalService
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Index user messages that have no retrieval embedding yet (history from before indexing, imports, synthetic data)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='users', help='Only index for this user name (repeatable)')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Embeddings written per INSERT')
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['users']:
+            user_ids = list(User.objects.filter(name__in=options['users']).values_list('pk', flat=True))
+            if len(user_ids) != len(set(options['users'])):
+                raise CommandError("One or more users were not found")
+
+        indexed = RetrievalService().index_user_messages(user_ids, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} messages"))
@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from conversation.services import MemoryService
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Rebuild user-level memory profiles from existing per-conversation memories"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='users', help='Only rebuild for this user name (repeatable)')
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['users']:
+            user_ids = list(User.objects.filter(name__in=options['users']).values_list('pk', flat=True))
+            if len(user_ids) != len(set(options['users'])):
+                raise CommandError("One or more users were not found")
+
+        rebuilt = MemoryService().rebuild_profiles(user_ids)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rebuilt} memory profiles"))
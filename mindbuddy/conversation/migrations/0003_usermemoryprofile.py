@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:19
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('conversation', '0002_messageembedding'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserMemoryProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_profile', models.JSONField(default=dict)),
+                ('key_insights', models.JSONField(default=dict)),
+                ('therapeutic_goals', models.JSONField(default=dict)),
+                ('conversation_count', models.IntegerField(default=0)),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='memory_profile', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
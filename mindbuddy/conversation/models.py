@@ -9,7 +9,7 @@ class Conversation(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='conversations')
     title = models.CharField(max_length=200, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     is_active = models.BooleanField(default=True)
     
     class Meta:
@@ -30,7 +30,7 @@ class Message(models.Model):
     conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='messages')
     content = models.TextField()
     sender_type = models.CharField(max_length=10, choices=SENDER_TYPES)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
     
     # For Groq response metadata
     model_used = models.CharField(max_length=50, blank=True)
@@ -55,3 +55,33 @@ class ConversationMemory(models.Model):
     
     def __str__(self):
         return f"Memory for {self.conversation.id}"
+
+class UserMemoryProfile(models.Model):
+    """User-level memory merged incrementally from all conversation memories"""
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='memory_profile')
+    user_profile = models.JSONField(default=dict)  # Latest known preferences, concerns, etc.
+    key_insights = models.JSONField(default=dict)  # {insight: {"count": n, "last_seen": iso}}
+    therapeutic_goals = models.JSONField(default=dict)  # {goal: {"count": n, "last_seen": iso}}
+    conversation_count = models.IntegerField(default=0)
+    last_updated = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Memory profile for {self.user.name}"
+
+
+class MessageEmbedding(models.Model):
+    """Hashed TF vector of a message, used for retrieval across conversations"""
+    message = models.OneToOneField(Message, on_delete=models.CASCADE, related_name='embedding')
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='message_embeddings')
+    conversation = models.ForeignKey(Conversation, on_delete=models.CASCADE, related_name='embeddings')
+    vector = models.BinaryField()  # float32 term-frequency vector, see RetrievalService
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+        ]
+    
+    def __str__(self):
+        return f"Embedding for {self.message_id}"
@@ -19,6 +19,33 @@ class ConversationSerializer(serializers.ModelSerializer):
     def get_message_count(self, obj):
         return obj.messages.count()
 
+MESSAGE_FIELDS = ('id', 'content', 'sender_type', 'timestamp', 'model_used', 'response_time')
+CONVERSATION_FIELDS = ('id', 'title', 'created_at', 'updated_at', 'is_active')
+
+
+def fast_message_data(queryset):
+    """MessageSerializer(many=True).data equivalent built straight from .values_list()"""
+    return [dict(zip(MESSAGE_FIELDS, row)) for row in queryset.values_list(*MESSAGE_FIELDS)]
+
+
+def fast_conversation_data(queryset):
+    """ConversationSerializer(many=True).data equivalent in two queries"""
+    conversations = [dict(zip(CONVERSATION_FIELDS, row)) for row in queryset.values_list(*CONVERSATION_FIELDS)]
+    
+    messages_by_conversation = {conversation['id']: [] for conversation in conversations}
+    rows = Message.objects.filter(
+        conversation_id__in=list(messages_by_conversation)
+    ).order_by('timestamp').values_list('conversation_id', *MESSAGE_FIELDS)
+    for conversation_id, *values in rows:
+        messages_by_conversation[conversation_id].append(dict(zip(MESSAGE_FIELDS, values)))
+    
+    for conversation in conversations:
+        messages = messages_by_conversation[conversation['id']]
+        conversation['messages'] = messages
+        conversation['message_count'] = len(messages)
+    
+    return conversations
+
 class ChatInputSerializer(serializers.Serializer):
     message = serializers.CharField(required=True)
     conversation_id = serializers.UUIDField(required=False)
\ No newline at end of file
@@ -1,9 +1,18 @@
 from groq import Groq
 from django.conf import settings
 from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.core.cache import cache
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.utils import timezone
 import time
 import json
-from .models import Conversation, Message, ConversationMemory
+import math
+import re
+import zlib
+from collections import Counter
+import numpy as np
+from .models import Conversation, Message, ConversationMemory, MessageEmbedding, UserMemoryProfile
 
 class GroqService:
     """Service for handling Groq API calls"""
@@ -20,11 +29,12 @@ class GroqService:
         self.client = Groq(api_key=api_key)
         self.model = getattr(settings, 'GROQ_MODEL', "llama3-8b-8192")
     
-    def get_therapeutic_response(self, user_message, conversation_context=None, user_memory=None):
+    def get_therapeutic_response(self, user_message, conversation_context=None, user_memory=None,
+                                 relevant_snippets=None):
         """Generate therapeutic response using Groq"""
         
         # Build system prompt for therapeutic context
-        system_prompt = self._build_therapeutic_prompt(user_memory)
+        system_prompt = self._build_therapeutic_prompt(user_memory, relevant_snippets)
         
         # Prepare messages for API call
         messages = [{"role": "system", "content": system_prompt}]
@@ -71,7 +81,7 @@ class GroqService:
                 'response_time': time.time() - start_time
             }
     
-    def _build_therapeutic_prompt(self, user_memory=None):
+    def _build_therapeutic_prompt(self, user_memory=None, relevant_snippets=None):
         """Build therapeutic system prompt"""
         base_prompt = """You are MindBuddy, a compassionate AI therapeutic assistant. Your role is to:
 
@@ -90,15 +100,25 @@ Guidelines:
 - Never diagnose or provide medical advice
 - Focus on the user's strengths and resilience"""
 
+        prompt = base_prompt
+        
         if user_memory:
-            memory_context = f"\n\nUser Context:\n{json.dumps(user_memory, indent=2)}"
-            return base_prompt + memory_context
+            prompt += f"\n\nUser Context:\n{json.dumps(user_memory, indent=2)}"
+        
+        if relevant_snippets:
+            snippets = "\n".join(f"- {snippet}" for snippet in relevant_snippets)
+            prompt += (
+                "\n\nThings the user shared in earlier conversations that may be relevant "
+                f"(refer to them gently, only if helpful):\n{snippets}"
+            )
         
-        return base_prompt
+        return prompt
 
 class MemoryService:
     """Service for managing conversation memory"""
     
+    PROFILE_TOP_ITEMS = 5
+    
     def get_or_create_memory(self, conversation):
         """Get or create memory for conversation"""
         memory, created = ConversationMemory.objects.get_or_create(
@@ -110,23 +130,286 @@ class MemoryService:
                 'therapeutic_goals': []
             }
         )
+        if created:
+            self._get_or_create_profile(conversation.user_id)
+            UserMemoryProfile.objects.filter(user_id=conversation.user_id).update(
+                conversation_count=F('conversation_count') + 1
+            )
         return memory
     
     def update_memory(self, conversation, user_message, gpt_response):
         """Update conversation memory with new insights"""
         memory = self.get_or_create_memory(conversation)
+        new_insights = []
         
         # Extract key information (simplified - could use NLP here)
         if any(word in user_message.lower() for word in ['anxious', 'anxiety', 'worried']):
             if 'anxiety' not in memory.key_insights:
                 memory.key_insights.append('anxiety')
+                new_insights.append('anxiety')
         
         if any(word in user_message.lower() for word in ['sad', 'depressed', 'down']):
             if 'depression' not in memory.key_insights:
                 memory.key_insights.append('depression')
+                new_insights.append('depression')
         
         # Update session notes
         memory.session_notes += f"\nUser: {user_message[:100]}...\nAssistant: {gpt_response[:100]}...\n"
         memory.save()
         
-        return memory
\ No newline at end of file
+        if new_insights:
+            self.merge_into_profile(conversation.user_id, insights=new_insights)
+        
+        return memory
+    
+    def merge_into_profile(self, user_id, insights=()):
+        """Fold insights that are new to a conversation into the user-level profile"""
+        # Counts are "conversations this came up in", so only pass items new to the conversation
+        with transaction.atomic():
+            self._get_or_create_profile(user_id)
+            profile = UserMemoryProfile.objects.select_for_update().get(user_id=user_id)
+            self._count_items(profile.key_insights, insights, timezone.now().isoformat())
+            profile.save()
+        
+        return profile
+    
+    def rebuild_profiles(self, user_ids=None):
+        """Recompute user-level profiles from every ConversationMemory row (all users, or only user_ids)"""
+        memories = ConversationMemory.objects.all()
+        profiles = UserMemoryProfile.objects.all()
+        if user_ids is not None:
+            memories = memories.filter(conversation__user_id__in=user_ids)
+            profiles = profiles.filter(user_id__in=user_ids)
+        
+        rebuilt = {}
+        rows = memories.order_by('last_updated', 'id').values_list(
+            'conversation__user_id', 'user_profile', 'key_insights', 'therapeutic_goals', 'last_updated'
+        )
+        for user_id, user_profile, insights, goals, last_updated in rows.iterator():
+            profile = rebuilt.setdefault(user_id, UserMemoryProfile(user_id=user_id))
+            seen = last_updated.isoformat()
+            # Oldest first, so later conversations win for profile keys and last_seen
+            profile.user_profile.update(user_profile or {})
+            self._count_items(profile.key_insights, set(insights or ()), seen)
+            self._count_items(profile.therapeutic_goals, set(goals or ()), seen)
+            profile.conversation_count += 1
+        
+        with transaction.atomic():
+            profiles.delete()
+            UserMemoryProfile.objects.bulk_create(rebuilt.values(), batch_size=1000)
+        
+        return len(rebuilt)
+    
+    def get_prompt_context(self, conversation, memory=None):
+        """Memory for the prompt: this conversation's profile over the user-level one"""
+        memory = memory or self.get_or_create_memory(conversation)
+        profile = UserMemoryProfile.objects.filter(user_id=conversation.user_id).first()
+        
+        if profile is None:
+            return memory.user_profile
+        
+        context = {**profile.user_profile, **memory.user_profile}
+        recurring_themes = self._top_items(profile.key_insights)
+        ongoing_goals = self._top_items(profile.therapeutic_goals)
+        
+        if recurring_themes:
+            context['recurring_themes'] = recurring_themes
+        if ongoing_goals:
+            context['ongoing_goals'] = ongoing_goals
+        if profile.conversation_count > 1:
+            context['previous_conversations'] = profile.conversation_count - 1
+        
+        return context
+    
+    def _top_items(self, items):
+        ranked = sorted(
+            items.items(),
+            key=lambda item: (item[1]['count'], item[1]['last_seen']),
+            reverse=True
+        )
+        return [name for name, _ in ranked[:self.PROFILE_TOP_ITEMS]]
+    
+    def _count_items(self, bucket, items, seen):
+        for item in items:
+            entry = bucket.setdefault(item, {'count': 0, 'last_seen': seen})
+            entry['count'] += 1
+            entry['last_seen'] = seen
+    
+    def _get_or_create_profile(self, user_id):
+        return UserMemoryProfile.objects.get_or_create(user_id=user_id)[0]
+
+class RetrievalService:
+    """Local retrieval index over a user's past messages (hashed TF-IDF, no network)"""
+    
+    DIMENSIONS = 1024
+    TOKEN_PATTERN = re.compile(r"[a-z0-9']+")
+    STOP_WORDS = frozenset([
+        'a', 'an', 'and', 'are', 'as', 'at', 'be', 'but', 'by', 'for', 'from', 'have', 'i',
+        "i'm", 'im', 'in', 'is', 'it', "it's", 'me', 'my', 'of', 'on', 'or', 'so', 'that',
+        'the', 'this', 'to', 'was', 'we', 'with', 'you', 'just', 'really', 'very',
+    ])
+    
+    def __init__(self):
+        self.top_k = getattr(settings, 'RETRIEVAL_TOP_K', 3)
+        self.token_budget = getattr(settings, 'RETRIEVAL_TOKEN_BUDGET', 300)
+        self.max_documents = getattr(settings, 'RETRIEVAL_MAX_DOCUMENTS', 2000)
+        self.min_score = getattr(settings, 'RETRIEVAL_MIN_SCORE', 0.1)
+        self.snippet_chars = getattr(settings, 'RETRIEVAL_SNIPPET_CHARS', 300)
+    
+    def _tokenize(self, text):
+        tokens = [
+            token for token in self.TOKEN_PATTERN.findall(text.lower())
+            if len(token) > 1 and token not in self.STOP_WORDS
+        ]
+        # Unigrams plus bigrams so short phrases ("panic attack") keep some order
+        return tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+    
+    def vectorize(self, text):
+        """Signed feature-hashed, sublinear term-frequency vector (float32)"""
+        vector = np.zeros(self.DIMENSIONS, dtype=np.float32)
+        for term, count in Counter(self._tokenize(text)).items():
+            digest = zlib.crc32(term.encode('utf-8'))
+            sign = 1.0 if digest & 0x80000000 else -1.0
+            vector[digest % self.DIMENSIONS] += sign * (1.0 + math.log(count))
+        return vector
+    
+    def index_message(self, message, user):
+        """Add a single message to the user's index (incremental, one INSERT)"""
+        vector = self.vectorize(message.content)
+        if not vector.any():
+            return None
+        return MessageEmbedding.objects.create(
+            message=message,
+            user=user,
+            conversation_id=message.conversation_id,
+            vector=vector.tobytes()
+        )
+    
+    def index_user_messages(self, user_ids=None, batch_size=1000):
+        """Backfill embeddings for user messages that were never indexed; returns how many were added"""
+        messages = Message.objects.filter(sender_type='user', embedding__isnull=True)
+        if user_ids is not None:
+            messages = messages.filter(conversation__user_id__in=user_ids)
+        messages = messages.order_by().values_list('id', 'conversation_id', 'conversation__user_id', 'content')
+        
+        indexed = 0
+        batch = []
+        for message_id, conversation_id, user_id, content in messages.iterator(chunk_size=batch_size):
+            vector = self.vectorize(content)
+            if vector.any():
+                batch.append(MessageEmbedding(
+                    message_id=message_id, user_id=user_id,
+                    conversation_id=conversation_id, vector=vector.tobytes()
+                ))
+            if len(batch) >= batch_size:
+                indexed += self._write_embeddings(batch)
+                batch = []
+        if batch:
+            indexed += self._write_embeddings(batch)
+        return indexed
+    
+    def _write_embeddings(self, embeddings):
+        message_ids = [embedding.message_id for embedding in embeddings]
+        already_indexed = MessageEmbedding.objects.filter(message_id__in=message_ids).count()
+        # ignore_conflicts: a live chat turn may index the same message while the backfill runs
+        MessageEmbedding.objects.bulk_create(embeddings, ignore_conflicts=True)
+        # created_at drives the recency cut in search(), so date backfilled rows by their message
+        indexed = MessageEmbedding.objects.filter(message_id__in=message_ids).update(
+            created_at=Subquery(Message.objects.filter(pk=OuterRef('message_id')).values('timestamp')[:1])
+        )
+        return indexed - already_indexed
+    
+    def load_index(self, user):
+        """
+        The user's searchable index, cached until an embedding is added or removed.
+        
+        Only the newest max_documents (RETRIEVAL_MAX_DOCUMENTS) messages are searchable; older
+        ones drop out of retrieval. Rows are stored IDF-weighted, L2-normalized and sparse
+        (hashed message vectors are ~98% zeros), so a cached index is a few hundred KB rather
+        than max_documents x DIMENSIONS floats, and a search is one sparse dot product.
+        """
+        state = MessageEmbedding.objects.filter(user=user).aggregate(count=Count('id'), last=Max('id'))
+        if not state['count']:
+            return None
+        key = f"retrieval:index:{user.pk}:{state['count']}:{state['last']}:{self.max_documents}"
+        index = cache.get(key)
+        if index is not None:
+            return index
+        
+        rows = list(
+            MessageEmbedding.objects.filter(user=user).order_by('-created_at')
+            .values_list('message_id', 'conversation_id', 'vector')[:self.max_documents]
+        )
+        matrix = np.frombuffer(
+            b''.join(bytes(vector) for _, _, vector in rows), dtype=np.float32
+        ).reshape(len(rows), self.DIMENSIONS)
+        
+        # IDF is derived from the user's own index, so inserts never re-weight stored rows
+        document_frequency = np.count_nonzero(matrix, axis=0)
+        idf = (np.log((1.0 + len(rows)) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+        weighted = matrix * idf
+        norms = np.linalg.norm(weighted, axis=1)
+        norms[norms == 0] = 1.0
+        weighted /= norms[:, None]
+        
+        row_index, column_index = np.nonzero(weighted)
+        index = {
+            'message_ids': [message_id for message_id, _, _ in rows],
+            'conversation_ids': np.array([str(conversation_id) for _, conversation_id, _ in rows]),
+            'idf': idf,
+            'rows': row_index.astype(np.int32),
+            'columns': column_index.astype(np.int16),
+            'values': weighted[row_index, column_index],
+        }
+        cache.set(key, index, getattr(settings, 'RETRIEVAL_INDEX_CACHE_TIMEOUT', 3600))
+        return index
+    
+    def search(self, user, query, exclude_conversation=None, top_k=None):
+        """Return [(score, content)] of the most similar past messages"""
+        query_vector = self.vectorize(query)
+        if not query_vector.any():
+            return []
+        
+        index = self.load_index(user)
+        if index is None:
+            return []
+        
+        query_weighted = query_vector * index['idf']
+        query_weighted /= np.linalg.norm(query_weighted) or 1.0
+        # Sparse rows . dense query: sum each stored value times the query weight of its column
+        scores = np.bincount(
+            index['rows'],
+            weights=index['values'] * query_weighted[index['columns']],
+            minlength=len(index['message_ids'])
+        )
+        if exclude_conversation is not None:
+            scores[index['conversation_ids'] == str(exclude_conversation.pk)] = -np.inf
+        
+        top_k = min(top_k or self.top_k, len(scores))
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+        candidates = candidates[np.argsort(-scores[candidates])]
+        
+        # Content is fetched for the top-k alone
+        message_ids = [index['message_ids'][i] for i in candidates if scores[i] >= self.min_score]
+        contents = Message.objects.only('content').in_bulk(message_ids)
+        return [
+            (float(scores[i]), contents[index['message_ids'][i]].content)
+            for i in candidates
+            if scores[i] >= self.min_score and index['message_ids'][i] in contents
+        ]
+    
+    def get_relevant_snippets(self, user, query, exclude_conversation=None):
+        """Top-k snippets for the prompt, trimmed to a fixed token budget (~4 chars per token)"""
+        snippets = []
+        remaining_chars = self.token_budget * 4
+        
+        for _, content in self.search(user, query, exclude_conversation):
+            snippet = content.strip().replace("\n", " ")
+            if len(snippet) > self.snippet_chars:
+                snippet = snippet[:self.snippet_chars].rsplit(' ', 1)[0] + "..."
+            if len(snippet) > remaining_chars:
+                break
+            snippets.append(snippet)
+            remaining_chars -= len(snippet)
+        
+        return snippets
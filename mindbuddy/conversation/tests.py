@@ -1,3 +1,203 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.cache import cache
+from django.db.models import Avg
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from Mood_Tracking.models import MoodEntry, MoodInsight
+from mindbuddy.renderers import ORJSONRenderer
+from quiz.models import QuizResult, QuizTopic
+from quiz.services import QuizTopicService
+
+from .models import Conversation, ConversationMemory, Message, MessageEmbedding, UserMemoryProfile
+from .serializers import ConversationSerializer, fast_conversation_data
+from .services import MemoryService, RetrievalService
+
+User = get_user_model()
+
+
+class RetrievalServiceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(name='retrieval_user', password='pw')
+        self.other = User.objects.create_user(name='other_user', password='pw')
+        self.service = RetrievalService()
+
+    def message(self, user, content, sender_type='user', conversation=None):
+        conversation = conversation or Conversation.objects.create(user=user)
+        return Message.objects.create(conversation=conversation, content=content, sender_type=sender_type)
+
+    def test_search_ranks_the_related_message_first(self):
+        for content in ["I had a panic attack on the train", "Work deadlines keep piling up", "My sister visited"]:
+            self.service.index_message(self.message(self.user, content), self.user)
+
+        results = self.service.search(self.user, "another panic attack today")
+        self.assertEqual(results[0][1], "I had a panic attack on the train")
+
+    def test_search_is_scoped_to_the_user_and_excludes_the_current_conversation(self):
+        current = Conversation.objects.create(user=self.user)
+        self.service.index_message(self.message(self.user, "panic attack at work", conversation=current), self.user)
+        self.service.index_message(self.message(self.other, "panic attack at home"), self.other)
+
+        self.assertEqual(self.service.search(self.user, "panic attack", exclude_conversation=current), [])
+
+    def test_backfill_indexes_only_unindexed_user_messages(self):
+        old = self.message(self.user, "Trouble sleeping before exams")
+        Message.objects.filter(pk=old.pk).update(timestamp=timezone.now() - timedelta(days=90))
+        self.message(self.user, "How about a breathing exercise?", sender_type='assistant')
+        self.service.index_message(self.message(self.user, "Sleeping better now"), self.user)
+
+        self.assertEqual(self.service.index_user_messages(), 1)
+        self.assertEqual(self.service.index_user_messages(), 0)
+
+        embedding = MessageEmbedding.objects.get(message=old)
+        self.assertEqual((embedding.user, embedding.created_at), (self.user, Message.objects.get(pk=old.pk).timestamp))
+        self.assertEqual(self.service.search(self.user, "exams")[0][1], "Trouble sleeping before exams")
+
+    def test_index_messages_command(self):
+        self.message(self.user, "Feeling lonely in the new city")
+        out = StringIO()
+        call_command('index_messages', '--user', 'retrieval_user', stdout=out)
+        self.assertIn("Indexed 1 messages", out.getvalue())
+
+    def test_index_is_cached_until_an_embedding_is_added(self):
+        self.service.index_message(self.message(self.user, "panic attack on the train"), self.user)
+        self.service.search(self.user, "panic attack")
+
+        # Cached: the version check and the top-k content fetch, no vector load
+        with self.assertNumQueries(2):
+            self.assertEqual(len(self.service.search(self.user, "panic attack")), 1)
+
+        self.service.index_message(self.message(self.user, "another panic attack at work"), self.user)
+        self.assertEqual(len(self.service.search(self.user, "panic attack")), 2)
+
+    @override_settings(RETRIEVAL_MAX_DOCUMENTS=2)
+    def test_only_the_newest_documents_are_searchable(self):
+        for content in ["panic attack in the morning", "panic attack at lunch", "panic attack at night"]:
+            self.service.index_message(self.message(self.user, content), self.user)
+        MessageEmbedding.objects.filter(message__content="panic attack in the morning").update(
+            created_at=timezone.now() - timedelta(days=1)
+        )
+        cache.clear()
+
+        found = [content for _, content in RetrievalService().search(self.user, "panic attack", top_k=3)]
+        self.assertEqual(sorted(found), ["panic attack at lunch", "panic attack at night"])
+
+    def test_backfill_reports_only_rows_it_inserted(self):
+        first = self.message(self.user, "Trouble sleeping before exams")
+        second = self.message(self.user, "Exams went fine")
+        batch = [
+            MessageEmbedding(message=message, user=self.user, conversation_id=message.conversation_id,
+                             vector=self.service.vectorize(message.content).tobytes())
+            for message in (first, second)
+        ]
+        self.service.index_message(first, self.user)  # Indexed by a chat turn meanwhile
+
+        self.assertEqual(self.service._write_embeddings(batch), 1)
+        self.assertEqual(MessageEmbedding.objects.filter(user=self.user).count(), 2)
+
+
+class MemoryProfileTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(name='memory_user', password='pw')
+        self.service = MemoryService()
+
+    def memory(self, **fields):
+        conversation = Conversation.objects.create(user=self.user)
+        return ConversationMemory.objects.create(conversation=conversation, **fields)
+
+    def test_rebuild_folds_existing_conversation_memories(self):
+        self.memory(key_insights=['anxiety'], therapeutic_goals=['Sleep better'], user_profile={'job': 'nurse'})
+        self.memory(key_insights=['anxiety', 'depression', 'anxiety'], user_profile={'job': 'teacher'})
+
+        self.assertEqual(self.service.rebuild_profiles(), 1)
+        self.assertEqual(self.service.rebuild_profiles([self.user.pk]), 1)  # Idempotent
+
+        profile = UserMemoryProfile.objects.get(user=self.user)
+        self.assertEqual(profile.conversation_count, 2)
+        self.assertEqual({name: item['count'] for name, item in profile.key_insights.items()}, {'anxiety': 2, 'depression': 1})
+        self.assertEqual(profile.therapeutic_goals['Sleep better']['count'], 1)
+        self.assertEqual(profile.user_profile, {'job': 'teacher'})
+
+    def test_update_memory_counts_an_insight_once_per_conversation(self):
+        conversation = Conversation.objects.create(user=self.user)
+        self.service.update_memory(conversation, "I'm so anxious", "That sounds hard.")
+        self.service.update_memory(conversation, "Still anxious and worried", "Let's breathe together.")
+        self.service.update_memory(Conversation.objects.create(user=self.user), "anxiety again", "I'm here.")
+
+        profile = UserMemoryProfile.objects.get(user=self.user)
+        self.assertEqual(profile.key_insights['anxiety']['count'], 2)
+        self.assertEqual(profile.conversation_count, 2)
+        self.assertEqual(self.service.get_prompt_context(conversation)['recurring_themes'], ['anxiety'])
+
+    def test_rebuild_profiles_command(self):
+        self.memory(key_insights=['anxiety'])
+        out = StringIO()
+        call_command('rebuild_memory_profiles', '--user', 'memory_user', stdout=out)
+        self.assertIn("Rebuilt 1 memory profiles", out.getvalue())
+        self.assertEqual(UserMemoryProfile.objects.get(user=self.user).conversation_count, 1)
+
+
+class FastSerializationTests(TestCase):
+    def test_fast_conversations_render_byte_identical_to_drf(self):
+        user = User.objects.create_user(name='serializer_user', password='pw')
+        for title in ("Évening chat ✨", ""):
+            conversation = Conversation.objects.create(user=user, title=title)
+            Message.objects.create(conversation=conversation, content="Hi\u2028there", sender_type='user')
+            Message.objects.create(
+                conversation=conversation, content="Hello!", sender_type='assistant', model_used='llama3-8b-8192',
+                response_time=0.42, token_usage={'prompt_tokens': 12, 'completion_tokens': 3}
+            )
+        Conversation.objects.create(user=user, title="No messages yet")
+        conversations = Conversation.objects.filter(user=user)
+
+        self.assertEqual(
+            ORJSONRenderer().render(fast_conversation_data(conversations)),
+            JSONRenderer().render(ConversationSerializer(conversations, many=True).data)
+        )
+
+
+class SyntheticDataTests(TestCase):
+    def generate(self, seed, *extra):
+        call_command('generate_synthetic_data', '--users', '10', '--years', '0.3', '--seed', str(seed),
+                     '--end-date', '2025-06-30', *extra, stdout=StringIO())
+        return (
+            list(MoodEntry.objects.order_by('user__name', 'date').values_list(
+                'id', 'user__name', 'date', 'mood_rating', 'energy_level', 'anxiety_level', 'notes', 'created_at'
+            )),
+            list(MoodInsight.objects.order_by('id').values_list('id', 'user__name', 'period_key', 'data', 'is_read')),
+            list(Message.objects.order_by('id').values_list('id', 'content', 'timestamp')),
+            list(QuizResult.objects.order_by('completed_at', 'user__name').values_list(
+                'user__name', 'quiz__topic__name', 'answers_data', 'liked'
+            )),
+        )
+
+    def test_same_seed_gives_identical_data(self):
+        first = self.generate(7)
+        self.assertTrue(all(first))
+        self.assertEqual(self.generate(7, '--clear'), first)
+        self.assertNotEqual(self.generate(8, '--clear')[0], first[0])
+
+    def test_weekly_averages_match_the_entries_written(self):
+        self.generate(7)
+        for insight in MoodInsight.objects.filter(insight_type='weekly_average'):
+            week_start = date.fromisoformat(insight.data['week_start'])
+            averages = MoodEntry.objects.filter(
+                user=insight.user, date__range=[week_start, week_start + timedelta(days=6)]
+            ).aggregate(energy=Avg('energy_level'), anxiety=Avg('anxiety_level'))
+            self.assertEqual(insight.data['avg_energy'], round(averages['energy'] or 0, 2))
+            self.assertEqual(insight.data['avg_anxiety'], round(averages['anxiety'] or 0, 2))
+
+    def test_new_topics_invalidate_cached_listings(self):
+        cache.clear()
+        QuizTopicService.listing(include_all=True)
+        self.generate(7)
+        _, topics = QuizTopicService.listing(include_all=True)
+        self.assertTrue({'Stress', 'Work-life balance'} <= {topic['name'] for topic in topics})
+        self.assertTrue(QuizTopic.objects.filter(name='Work-life balance').exists())
 
-# Create your tests here.
@@ -2,12 +2,12 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from django.shortcuts import get_object_or_404
+from django.http import Http404
 from django.core.exceptions import ImproperlyConfigured
 from django.contrib.auth import get_user_model
 from .models import Conversation, Message
-from .serializers import ChatInputSerializer, ConversationSerializer, MessageSerializer
-from .services import GroqService, MemoryService
+from .serializers import ChatInputSerializer, MessageSerializer, fast_conversation_data
+from .services import GroqService, MemoryService, RetrievalService
 
 User = get_user_model()  # ✅ Handles swapped custom user model
 
@@ -22,6 +22,7 @@ class ChatAPIView(APIView):
         try:
             self.groq_service = GroqService()
             self.memory_service = MemoryService()
+            self.retrieval_service = RetrievalService()
         except ImproperlyConfigured as e:
             self.groq_service = None
             self.config_error = str(e)
@@ -70,15 +71,20 @@ class ChatAPIView(APIView):
             content=user_message,
             sender_type='user'
         )
+        self.retrieval_service.index_message(user_msg, user)
 
         conversation_context = list(conversation.messages.all().order_by('-timestamp')[:20])
         conversation_context.reverse()
         memory = self.memory_service.get_or_create_memory(conversation)
+        relevant_snippets = self.retrieval_service.get_relevant_snippets(
+            user, user_message, exclude_conversation=conversation
+        )
 
         groq_response = self.groq_service.get_therapeutic_response(
             user_message=user_message,
             conversation_context=conversation_context,
-            user_memory=memory.user_profile
+            user_memory=self.memory_service.get_prompt_context(conversation, memory),
+            relevant_snippets=relevant_snippets
         )
 
         assistant_msg = Message.objects.create(
@@ -126,8 +132,7 @@ class ConversationListView(APIView):
                 return Response({'conversations': []})
 
         conversations = Conversation.objects.filter(user=user, is_active=True)
-        serializer = ConversationSerializer(conversations, many=True)
-        return Response(serializer.data)
+        return Response(fast_conversation_data(conversations))
 
 
 class ConversationDetailView(APIView):
@@ -143,9 +148,10 @@ class ConversationDetailView(APIView):
             except User.DoesNotExist:
                 return Response({'error': 'No conversations found'}, status=404)
 
-        conversation = get_object_or_404(Conversation, id=conversation_id, user=user)
-        serializer = ConversationSerializer(conversation)
-        return Response(serializer.data)
+        data = fast_conversation_data(Conversation.objects.filter(id=conversation_id, user=user))
+        if not data:
+            raise Http404("No Conversation matches the given query.")
+        return Response(data[0])
 
 
 # These views below are redundant with above (duplicated)
@@ -157,8 +163,7 @@ class AuthConversationListView(APIView):
 
     def get(self, request):
         conversations = Conversation.objects.filter(user=request.user, is_active=True)
-        serializer = ConversationSerializer(conversations, many=True)
-        return Response(serializer.data)
+        return Response(fast_conversation_data(conversations))
 
 
 class AuthConversationDetailView(APIView):
@@ -166,6 +171,7 @@ class AuthConversationDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request, conversation_id):
-        conversation = get_object_or_404(Conversation, id=conversation_id, user=request.user)
-        serializer = ConversationSerializer(conversation)
-        return Response(serializer.data)
+        data = fast_conversation_data(Conversation.objects.filter(id=conversation_id, user=request.user))
+        if not data:
+            raise Http404("No Conversation matches the given query.")
+        return Response(data[0])
@@ -18,26 +18,33 @@ def analytics_interface(user_token):
     # Time period selector
     period = _display_time_selector()
     
-    # Get mood history
+    # Get mood history as a DataFrame (columnar payload, no per-row dicts)
     with st.spinner("Loading your wellness data... 📊"):
         if st.session_state.is_demo:
-            mood_history = _get_demo_analytics_data(period)
+            demo_history = _get_demo_analytics_data(period)
+            history_df = pd.DataFrame(demo_history['chart_data'])
+            history_df['date'] = pd.to_datetime(history_df['date'])
+            statistics = demo_history['statistics']
             time.sleep(1)  # Simulate loading
         else:
-            mood_history = MindBuddyAPI.get_mood_history(period, token=user_token)
+            # Long ranges come back as weekly/monthly buckets to keep charts light
+            granularity = "auto" if period > 90 else None
+            history_df, statistics = MindBuddyAPI.get_mood_history_frame(
+                period, token=user_token, granularity=granularity
+            )
     
-    if mood_history and mood_history.get('chart_data'):
+    if history_df is not None and history_df['has_entry'].any():
         # Statistics overview
-        _display_statistics_overview(mood_history, period)
+        _display_statistics_overview(statistics, period)
         
         # Main mood chart
-        _display_mood_trend_chart(mood_history)
+        _display_mood_trend_chart(history_df)
         
         # Multi-metric chart
-        _display_multi_metric_chart(mood_history)
+        _display_multi_metric_chart(history_df)
         
         # Enhanced insights section
-        _display_insights_section(mood_history, period)
+        _display_insights_section(history_df, statistics)
     else:
         _display_no_data_message()
 
@@ -47,7 +54,7 @@ def _display_time_selector():
     with col1:
         period = st.selectbox(
             "📅 Select Time Period",
-            options=[7, 14, 30, 60, 90],
+            options=[7, 14, 30, 60, 90, 180, 365, 730],
             format_func=lambda x: f"Last {x} days",
             index=2  # Default to 30 days
         )
@@ -72,9 +79,8 @@ def _get_demo_analytics_data(period):
         }
     }
 
-def _display_statistics_overview(mood_history, period):
+def _display_statistics_overview(stats, period):
     """Display statistics overview cards"""
-    stats = mood_history.get('statistics', {})
     if stats:
         st.markdown("#### 📈 Period Summary")
         col1, col2, col3, col4 = st.columns(4)
@@ -100,33 +106,32 @@ def _display_statistics_overview(mood_history, period):
             total_entries = stats.get('total_entries', 0)
             st.metric("Total Entries", total_entries, delta=f"out of {period} days")
 
-def _display_mood_trend_chart(mood_history):
+def _display_mood_trend_chart(history_df):
     """Display the main mood trend chart"""
     st.markdown("#### 🌈 Mood Trend Analysis")
-    fig = create_mood_chart(mood_history)
+    fig = create_mood_chart(history_df)
     if fig:
         st.plotly_chart(fig, use_container_width=True, key="mood_trend_chart")
 
-def _display_multi_metric_chart(mood_history):
+def _display_multi_metric_chart(history_df):
     """Display the multi-metric comprehensive chart"""
     st.markdown("#### 📊 Comprehensive Wellness Tracking")
-    multi_fig = create_multi_metric_chart(mood_history)
+    multi_fig = create_multi_metric_chart(history_df)
     if multi_fig:
         st.plotly_chart(multi_fig, use_container_width=True, key="multi_metric_chart")
 
-def _display_insights_section(mood_history, period):
+def _display_insights_section(history_df, stats):
     """Display wellness insights"""
     st.markdown("#### 💡 Wellness Insights")
     
-    chart_data = mood_history['chart_data']
-    entries_with_data = [entry for entry in chart_data if entry['has_entry']]
+    entries_with_data = history_df[history_df['has_entry']]
     
-    if entries_with_data:
+    if not entries_with_data.empty:
         insight_col1, insight_col2 = st.columns(2)
         
         with insight_col1:
             _display_trend_analysis(entries_with_data)
-            _display_consistency_insight(mood_history.get('statistics', {}))
+            _display_consistency_insight(stats)
         
         with insight_col2:
             _display_mood_distribution_insight(entries_with_data)
@@ -134,7 +139,7 @@ def _display_insights_section(mood_history, period):
 
 def _display_trend_analysis(entries_with_data):
     """Display trend analysis insight"""
-    recent_moods = [entry['mood_rating'] for entry in entries_with_data[-7:]]
+    recent_moods = entries_with_data['mood_rating'].tail(7).tolist()
     if len(recent_moods) >= 3:
         if recent_moods[-1] > recent_moods[0]:
             trend, trend_emoji = "improving", "📈"
@@ -157,22 +162,21 @@ def _display_consistency_insight(stats):
 
 def _display_mood_distribution_insight(entries_with_data):
     """Display mood distribution insight"""
-    mood_counts = {}
-    for entry in entries_with_data:
-        mood = entry['mood_rating']
-        mood_counts[mood] = mood_counts.get(mood, 0) + 1
+    # Weekly/monthly buckets (they carry entry_count) hold averaged moods, not ratings to count
+    if 'entry_count' in entries_with_data:
+        return
+    
+    mood_counts = entries_with_data['mood_rating'].value_counts(sort=False)
     
-    if mood_counts:
-        most_common_mood = max(mood_counts, key=mood_counts.get)
+    if not mood_counts.empty:
+        most_common_mood = mood_counts.idxmax()
         st.info(f"{get_mood_emoji(most_common_mood)} Your most common mood rating is **{most_common_mood}/5**.")
 
 def _display_energy_mood_correlation(entries_with_data):
     """Display energy vs mood correlation insight"""
-    moods = [entry['mood_rating'] for entry in entries_with_data]
-    energies = [entry['energy_level'] for entry in entries_with_data]
-    if len(moods) > 3:
-        avg_mood = sum(moods) / len(moods)
-        avg_energy = sum(energies) / len(energies)
+    if len(entries_with_data) > 3:
+        avg_mood = entries_with_data['mood_rating'].mean()
+        avg_energy = entries_with_data['energy_level'].mean()
         
         if abs(avg_mood - avg_energy) < 0.5:
             st.success("⚡ Your mood and energy levels are well-balanced!")
@@ -196,14 +200,11 @@ def _display_no_data_message():
     </div>
     """, unsafe_allow_html=True)
 
-def create_mood_chart(data):
+def create_mood_chart(df):
     """Create beautiful mood trend chart with dark theme"""
-    if not data or not data.get('chart_data'):
+    if df is None or df.empty:
         return None
     
-    df = pd.DataFrame(data['chart_data'])
-    df['date'] = pd.to_datetime(df['date'])
-    
     # Filter entries with data
     df_with_data = df[df['has_entry'] == True].copy()
     
@@ -250,13 +251,11 @@ def create_mood_chart(data):
     
     return fig
 
-def create_multi_metric_chart(data):
+def create_multi_metric_chart(df):
     """Create multi-metric comparison chart with dark theme"""
-    if not data or not data.get('chart_data'):
+    if df is None or df.empty:
         return None
     
-    df = pd.DataFrame(data['chart_data'])
-    df['date'] = pd.to_datetime(df['date'])
     df_with_data = df[df['has_entry'] == True].copy()
     
     if df_with_data.empty:
@@ -3,11 +3,47 @@ MindBuddy API Client
 Handles all communication with the backend API
 """
 
+from collections import OrderedDict
+
 import requests
+import pandas as pd
 
 # Configuration
 API_BASE_URL = "http://localhost:8000/api"
 
+# Columns of the columnar /mood/history/ payload and the spacing of its rows
+HISTORY_COLUMNS = ["mood_rating", "energy_level", "anxiety_level", "mood_min", "mood_max", "entry_count"]
+HISTORY_FREQUENCIES = {"day": "D", "week": "W-MON", "month": "MS"}
+
+# Last response per (url, params, auth) with its ETag, so reruns can revalidate instead of refetching.
+# Shared by every session in the Streamlit process, so it is LRU-bounded
+_CONDITIONAL_CACHE = OrderedDict()
+CONDITIONAL_CACHE_SIZE = 128
+
+
+def conditional_get(url, params=None, headers=None):
+    """GET that sends If-None-Match and reuses the cached body on 304; returns (status_code, json)"""
+    headers = dict(headers or {})
+    key = (url, tuple(sorted((params or {}).items())), headers.get("Authorization"))
+    cached = _CONDITIONAL_CACHE.get(key)
+    if cached:
+        _CONDITIONAL_CACHE.move_to_end(key)
+        headers["If-None-Match"] = cached[0]
+    
+    response = requests.get(url, params=params, headers=headers)
+    if response.status_code == 304 and cached:
+        return 200, cached[1]
+    if response.status_code != 200:
+        return response.status_code, None
+    
+    payload = response.json()
+    if response.headers.get("ETag"):
+        _CONDITIONAL_CACHE[key] = (response.headers["ETag"], payload)
+        _CONDITIONAL_CACHE.move_to_end(key)
+        while len(_CONDITIONAL_CACHE) > CONDITIONAL_CACHE_SIZE:
+            _CONDITIONAL_CACHE.popitem(last=False)
+    return 200, payload
+
 class MindBuddyAPI:
     """Enhanced API client for MindBuddy backend"""
     
@@ -46,22 +82,41 @@ class MindBuddyAPI:
             return None
     
     @staticmethod
-    def get_mood_history(days=30, token=None):
-        """Get mood history with authentication"""
+    def get_mood_history(days=30, token=None, granularity=None):
+        """Get mood history with authentication (granularity: day, week, month or auto)"""
         try:
             headers = {"Authorization": f"Bearer {token}"} if token else {}
-            response = requests.get(f"{API_BASE_URL}/mood/history/?days={days}", headers=headers)
-            return response.json() if response.status_code == 200 else None
+            params = {"days": days}
+            if granularity:
+                params["granularity"] = granularity
+            _, payload = conditional_get(f"{API_BASE_URL}/mood/history/", params=params, headers=headers)
+            return payload
         except requests.exceptions.RequestException:
             return None
     
+    @staticmethod
+    def get_mood_history_frame(days=30, token=None, granularity=None):
+        """Get mood history as (DataFrame, statistics) via the compact columnar format"""
+        try:
+            headers = {"Authorization": f"Bearer {token}"} if token else {}
+            params = {"days": days, "format": "columnar"}
+            if granularity:
+                params["granularity"] = granularity
+            _, payload = conditional_get(f"{API_BASE_URL}/mood/history/", params=params, headers=headers)
+            if payload is None:
+                return None, {}
+        except requests.exceptions.RequestException:
+            return None, {}
+        
+        return columnar_to_frame(payload), payload.get("statistics", {})
+    
     @staticmethod
     def get_streak_info(token=None):
         """Get streak information with authentication"""
         try:
             headers = {"Authorization": f"Bearer {token}"} if token else {}
-            response = requests.get(f"{API_BASE_URL}/mood/streak/", headers=headers)
-            return response.json() if response.status_code == 200 else None
+            _, payload = conditional_get(f"{API_BASE_URL}/mood/streak/", headers=headers)
+            return payload
         except requests.exceptions.RequestException:
             return None
     
@@ -70,7 +125,39 @@ class MindBuddyAPI:
         """Get today's mood with authentication"""
         try:
             headers = {"Authorization": f"Bearer {token}"} if token else {}
-            response = requests.get(f"{API_BASE_URL}/mood/today/", headers=headers)
+            _, payload = conditional_get(f"{API_BASE_URL}/mood/today/", headers=headers)
+            return payload
+        except requests.exceptions.RequestException:
+            return None
+    
+    @staticmethod
+    def get_dashboard(token=None):
+        """Get streak, today's mood, 7-day history and unread insight count in one request"""
+        try:
+            headers = {"Authorization": f"Bearer {token}"} if token else {}
+            _, payload = conditional_get(f"{API_BASE_URL}/mood/dashboard/", headers=headers)
+            return payload
+        except requests.exceptions.RequestException:
+            return None
+    
+    @staticmethod
+    def get_mood_insights(token=None, unread_only=False):
+        """Get the latest mood insights and the unread count"""
+        try:
+            headers = {"Authorization": f"Bearer {token}"} if token else {}
+            params = {"unread": "true"} if unread_only else {}
+            _, payload = conditional_get(f"{API_BASE_URL}/mood/insights/", params=params, headers=headers)
+            return payload
+        except requests.exceptions.RequestException:
+            return None
+    
+    @staticmethod
+    def mark_insights_read(insight_ids=None, token=None):
+        """Mark the given insights read, or all of them when no ids are given"""
+        try:
+            headers = {"Authorization": f"Bearer {token}"} if token else {}
+            payload = {"ids": list(insight_ids)} if insight_ids else {"all": True}
+            response = requests.post(f"{API_BASE_URL}/mood/insights/read/", json=payload, headers=headers)
             return response.json() if response.status_code == 200 else None
         except requests.exceptions.RequestException:
             return None
@@ -115,4 +202,29 @@ def get_mood_color(rating):
     mood_colors = {
         1: "#FF6B6B", 2: "#FFA726", 3: "#FFD54F", 4: "#66BB6A", 5: "#42A5F5"
     }
-    return mood_colors.get(rating, "#FFD54F")
\ No newline at end of file
+    return mood_colors.get(rating, "#FFD54F")
+
+def columnar_to_frame(payload):
+    """Build a DataFrame straight from a columnar mood history payload (0 marks a missing value)"""
+    length = payload.get("length") or 0
+    if not length:
+        return pd.DataFrame(columns=["date", "has_entry", "notes"])
+    
+    if "dates" in payload:
+        dates = pd.to_datetime(payload["dates"])
+    else:
+        dates = pd.date_range(payload["start_date"], periods=length, freq=HISTORY_FREQUENCIES[payload["step"]])
+    
+    frame = pd.DataFrame({"date": dates})
+    for column in HISTORY_COLUMNS:
+        if column in payload:
+            frame[column] = payload[column]
+    frame["has_entry"] = frame["mood_rating"] > 0
+    
+    frame["notes"] = ""
+    notes = payload.get("notes") or {}
+    if notes:
+        frame.loc[[int(offset) for offset in notes], "notes"] = list(notes.values())
+    
+    return frame
+
@@ -14,16 +14,23 @@ def dashboard_interface(user_token):
     st.markdown("### 🏠 Welcome to Your Wellness Dashboard")
     
     # Get data
+    unread_insights = 0
     if st.session_state.is_demo:
         streak_data, today_mood, mood_history = _get_demo_data()
     else:
-        streak_data = MindBuddyAPI.get_streak_info(token=user_token)
-        today_mood = MindBuddyAPI.get_today_mood(token=user_token)
-        mood_history = MindBuddyAPI.get_mood_history(7, token=user_token)
+        dashboard = MindBuddyAPI.get_dashboard(token=user_token) or {}
+        streak_data = dashboard.get('streak')
+        today_mood = dashboard.get('today')
+        mood_history = dashboard.get('mood_history')
+        unread_insights = dashboard.get('unread_insights', 0)
     
     # Enhanced metrics row
     _display_metrics_row(streak_data, today_mood)
     
+    # New insights, only fetched when the dashboard reports some unread
+    if unread_insights:
+        _display_unread_insights(user_token, unread_insights)
+    
     # Today's mood display
     if today_mood and today_mood.get('has_logged_today') and today_mood.get('today_mood'):
         _display_todays_mood(today_mood['today_mood'])
@@ -96,6 +103,26 @@ def _display_metrics_row(streak_data, today_mood):
         </div>
         """, unsafe_allow_html=True)
 
+def _display_unread_insights(user_token, unread_count):
+    """Display unread mood insights with a control to mark them read"""
+    payload = MindBuddyAPI.get_mood_insights(token=user_token, unread_only=True) or {}
+    insights = payload.get('insights', [])
+    if not insights:
+        return
+    
+    st.markdown(f"### 💡 New Insights ({unread_count})")
+    for insight in insights:
+        st.markdown(f"""
+        <div class="insight-card">
+            <h4>{insight.get('title', '')}</h4>
+            <p>{insight.get('description', '')}</p>
+        </div>
+        """, unsafe_allow_html=True)
+    
+    if st.button("✅ Mark as read", key="mark_insights_read"):
+        MindBuddyAPI.mark_insights_read([insight['id'] for insight in insights], token=user_token)
+        st.rerun()
+
 def _display_todays_mood(mood_data):
     """Display today's mood information"""
     st.markdown("### 🌅 Today's Wellness Check")
@@ -1,6 +1,7 @@
 import streamlit as st
 import requests
 import json
+import time
 from datetime import datetime
 
 class QuizComponent:
@@ -19,9 +20,9 @@ class QuizComponent:
             st.session_state.show_results = False
     
     def get_topics(self):
-        """Fetch available quiz topics from the API"""
+        """Fetch curated quiz topics from the API, most popular first"""
         try:
-            response = requests.get(f"{self.api_base_url}/topics/")
+            response = requests.get(f"{self.api_base_url}/topics/", params={'order': 'popular'})
             if response.status_code == 200:
                 topics = response.json()
                 return [topic['name'] for topic in topics]
@@ -32,13 +33,15 @@ class QuizComponent:
             st.error(f"Connection error: {e}")
             return []
     
-    def create_quiz(self, topic, length):
-        """Create a new quiz"""
+    def create_quiz(self, topic, length, questions=None):
+        """Create a new quiz, keeping any questions already received and generating only the rest"""
         try:
             payload = {
                 'topic': topic,
                 'length': length
             }
+            if questions:
+                payload['questions'] = questions
             response = requests.post(f"{self.api_base_url}/create/", json=payload)
             
             if response.status_code == 201:
@@ -51,15 +54,61 @@ class QuizComponent:
             st.error(f"Connection error: {e}")
             return None
     
+    def create_quiz_streaming(self, topic, length, container):
+        """Create a quiz, showing each question in container as soon as the server has generated it"""
+        received = []
+        try:
+            with requests.post(
+                f"{self.api_base_url}/create/stream/",
+                json={'topic': topic, 'length': length},
+                headers={'Accept': 'text/event-stream'}, stream=True, timeout=(5, 120)
+            ) as response:
+                if response.status_code != 200:
+                    return self.create_quiz(topic, length)
+                
+                event = None
+                for line in response.iter_lines(decode_unicode=True):
+                    if line.startswith('event:'):
+                        event = line[len('event:'):].strip()
+                        continue
+                    if not line.startswith('data:'):
+                        continue
+                    
+                    data = json.loads(line[len('data:'):])
+                    if event == 'question':
+                        self._render_question_preview(container, data['index'], data['question'], length)
+                        received.append(data['question'])
+                    elif event == 'done':
+                        return data
+                    elif event == 'error':
+                        break
+        except requests.RequestException:
+            pass
+        
+        # Stream unavailable, cut off or failed: the blocking endpoint keeps the questions
+        # already shown and generates only the missing ones
+        return self.create_quiz(topic, length, received)
+    
+    def _render_question_preview(self, container, index, question_data, length):
+        """Read-only question card shown while the rest of the quiz is generating"""
+        with container:
+            options = "".join(f"<li>{option}</li>" for option in question_data['options'])
+            st.markdown(f"""
+            <div class="question-card">
+                <h4>Question {index + 1} of {length}: {question_data['question']}</h4>
+                <ul>{options}</ul>
+            </div>
+            """, unsafe_allow_html=True)
+    
     def submit_quiz(self, quiz_id, answers):
-        """Submit quiz answers"""
+        """Submit quiz answers; the returned result's insights are still being generated"""
         try:
             payload = {
                 'answers': answers
             }
             response = requests.post(f"{self.api_base_url}/{quiz_id}/submit/", json=payload)
             
-            if response.status_code == 201:
+            if response.status_code == 202:
                 return response.json()
             else:
                 error_data = response.json()
@@ -74,7 +123,7 @@ class QuizComponent:
         try:
             response = requests.post(f"{self.api_base_url}/results/{result_id}/regenerate/")
             
-            if response.status_code == 200:
+            if response.status_code == 202:
                 return response.json()
             else:
                 error_data = response.json()
@@ -84,6 +133,45 @@ class QuizComponent:
             st.error(f"Connection error: {e}")
             return None
     
+    def get_result(self, result_id):
+        """Fetch a quiz result (insights may still be in progress)"""
+        try:
+            response = requests.get(f"{self.api_base_url}/results/{result_id}/")
+            return response.json() if response.status_code == 200 else None
+        except requests.RequestException:
+            return None
+    
+    def wait_for_insights(self, result_id, placeholder, timeout=120):
+        """Show insight text as it streams in, then return the finished result"""
+        text = ''
+        try:
+            with requests.get(
+                f"{self.api_base_url}/results/{result_id}/stream/",
+                headers={'Accept': 'text/event-stream'}, stream=True, timeout=(5, timeout)
+            ) as response:
+                if response.status_code == 200:
+                    event = None
+                    for line in response.iter_lines(decode_unicode=True):
+                        if line.startswith('event:'):
+                            event = line[len('event:'):].strip()
+                        elif line.startswith('data:') and event == 'token':
+                            text += json.loads(line[len('data:'):])['text']
+                            placeholder.markdown(text + " ▌")
+                        elif line.startswith('data:') and event in ('done', 'timeout'):
+                            break
+        except requests.RequestException:
+            pass  # Fall back to polling below
+        
+        # The stream only carries text; fetch the saved result (and poll if the stream broke off)
+        deadline = time.monotonic() + timeout
+        while True:
+            result = self.get_result(result_id)
+            if result is None or result['insight_status'] in ('ready', 'failed') or time.monotonic() > deadline:
+                return result
+            if result['insights']:
+                placeholder.markdown(result['insights'] + " ▌")
+            time.sleep(1)
+    
     def like_insight(self, result_id):
         """Mark insight as liked"""
         try:
@@ -228,7 +316,7 @@ class QuizComponent:
             if st.button("Start Quiz", type="primary", use_container_width=True):
                 if selected_topic and quiz_length:
                     length = int(quiz_length.split(" ")[0])
-                    quiz_data = self.create_quiz(selected_topic, length)
+                    quiz_data = self.create_quiz_streaming(selected_topic, length, st.container())
                     
                     if quiz_data:
                         st.session_state.quiz_data = quiz_data
@@ -299,6 +387,14 @@ class QuizComponent:
         
         result = st.session_state.quiz_result
         
+        # Insights are generated after submission; stream them in before showing the card
+        if result.get('insight_status') in ('pending', 'generating'):
+            placeholder = st.empty()
+            finished = self.wait_for_insights(result['id'], placeholder)
+            placeholder.empty()
+            if finished:
+                result = st.session_state.quiz_result = finished
+        
         # Display insights
         st.markdown(f"""
         <div class="insight-card">
@@ -320,13 +416,12 @@ class QuizComponent:
         
         with col3:
             if st.button("👎 This wasn't for me", type="secondary", use_container_width=True):
-                with st.spinner("Generating a new insight for you..."):
-                    new_result = self.regenerate_insights(result['id'])
-                    
-                    if new_result:
-                        st.session_state.quiz_result = new_result
-                        st.info("I'm sorry that wasn't helpful. Here's a new insight for you:")
-                        st.rerun()
+                new_result = self.regenerate_insights(result['id'])
+                
+                if new_result:
+                    st.session_state.quiz_result = new_result
+                    st.info("I'm sorry that wasn't helpful. Here's a new insight for you:")
+                    st.rerun()
         
         # Reset button
         st.markdown("---")
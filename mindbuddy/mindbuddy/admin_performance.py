@@ -0,0 +1,105 @@
+"""
+Admin performance mode for very large tables.
+
+Changelists backed by tens of millions of rows can't afford an exact COUNT(*),
+deep OFFSET pages, per-row __str__ lookups or unindexed ILIKE search. The mixin
+below swaps each of those for a cheap equivalent.
+"""
+
+import uuid
+
+from django.contrib.admin.views.main import PAGE_VAR
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+
+def estimated_row_count(model, using='default'):
+    """Planner estimate from pg_class.reltuples (None if unavailable or never analyzed)"""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)",
+            [connection.ops.quote_name(model._meta.db_table)]
+        )
+        row = cursor.fetchone()
+    
+    return row[0] if row and row[0] > 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that never runs an unbounded COUNT(*) and refuses deep OFFSET pages"""
+    
+    estimate_threshold = 10000  # Below this an exact count is cheap enough
+    max_pages = 200  # Deeper pages are reached by keyset links instead of OFFSET
+    
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate >= self.estimate_threshold:
+                return estimate
+        
+        # Filtered changelists: count at most the rows offset pagination can reach
+        return queryset.order_by()[:self.max_pages * self.per_page].count()
+    
+    @cached_property
+    def num_pages(self):
+        return min(super().num_pages, self.max_pages)
+
+
+class PerformanceAdminMixin:
+    """
+    ModelAdmin mixin for huge tables.
+    
+    Subclasses set `keyset_field` to an indexed, mostly-unique column; the
+    changelist is ordered by it descending and offers an "older rows" link
+    that filters on `<keyset_field>__lt` rather than paging with OFFSET. The
+    link is only offered while that ordering is active: after sorting on
+    another column a cursor on keyset_field would skip or repeat rows.
+    """
+    
+    keyset_field = None
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    change_list_template = 'admin/performance_change_list.html'
+    
+    def get_ordering(self, request):
+        if self.keyset_field:
+            return [f'-{self.keyset_field}']
+        return super().get_ordering(request)
+    
+    def get_search_results(self, request, queryset, search_term):
+        # A UUID is matched against the primary key index only
+        if search_term and queryset.model._meta.pk.get_internal_type() == 'UUIDField':
+            try:
+                return queryset.filter(pk=uuid.UUID(search_term.strip())), False
+            except ValueError:
+                pass
+        return super().get_search_results(request, queryset, search_term)
+    
+    def changelist_view(self, request, extra_context=None):
+        response = super().changelist_view(request, extra_context)
+        context = getattr(response, 'context_data', None)
+        
+        if self.keyset_field and context and 'cl' in context:
+            cl = context['cl']
+            results = list(cl.result_list)
+            if len(results) >= cl.list_per_page and self._keyset_ordered(request, cl):
+                lookup = f'{self.keyset_field}__lt'
+                last_value = getattr(results[-1], self.keyset_field)
+                context['keyset_next_url'] = cl.get_query_string(
+                    {lookup: last_value.isoformat()}, remove=[PAGE_VAR, lookup]
+                )
+        
+        return response
+    
+    def _keyset_ordered(self, request, cl):
+        """True if the changelist is sorted newest-first on keyset_field (not re-sorted via ?o=)"""
+        ordering = cl.get_ordering(request, cl.root_queryset)
+        return bool(ordering) and str(ordering[0]) == f'-{self.keyset_field}'
@@ -0,0 +1,75 @@
+"""
+Fast JSON rendering for the API, plus the renderer used by Server-Sent Events endpoints.
+
+orjson is an optional dependency: without it ORJSONRenderer behaves exactly
+like DRF's JSONRenderer.
+"""
+
+import json
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson.
+    
+    Output matches DRF's default (compact separators, UTF-8, datetimes in UTC
+    rendered with a 'Z' suffix, U+2028/U+2029 escaped). Indented output for
+    the browsable API and anything orjson can't encode fall back to DRF.
+    """
+    
+    options = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        
+        # Same JavaScript-safety escaping as JSONRenderer
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+class ColumnarJSONRenderer(ORJSONRenderer):
+    """
+    Selected with ?format=columnar.
+    
+    It renders JSON like ORJSONRenderer; views that support the format check
+    request.accepted_renderer.format and return parallel arrays instead of a
+    list of row dicts.
+    """
+    
+    format = 'columnar'
+
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets views answer Accept: text/event-stream.
+    
+    Streaming views return a StreamingHttpResponse and bypass rendering; this
+    only renders the early error responses (404, 403, ...) as a single
+    'error' event so SSE clients can read them.
+    """
+    
+    media_type = 'text/event-stream'
+    format = 'event-stream'
+    charset = 'utf-8'
+    
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return ('event: error\ndata: %s\n\n' % json.dumps(data, cls=encoders.JSONEncoder)).encode(self.charset)
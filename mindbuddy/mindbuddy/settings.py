@@ -80,7 +80,7 @@ ROOT_URLCONF = 'mindbuddy.urls'
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [],
+        'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -154,6 +154,69 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
 GROQ_MODEL = os.getenv('GROQ_MODEL', 'llama3-8b-8192')
 
+# Chat retrieval: only the newest RETRIEVAL_MAX_DOCUMENTS messages per user are searchable (older ones
+# drop out); the sparse per-user index is cached until the user's embeddings change
+RETRIEVAL_MAX_DOCUMENTS = int(os.getenv('RETRIEVAL_MAX_DOCUMENTS', 2000))
+RETRIEVAL_INDEX_CACHE_TIMEOUT = int(os.getenv('RETRIEVAL_INDEX_CACHE_TIMEOUT', 3600))
+
+# Caches: per-process memory in development, a shared Redis when REDIS_URL is set.
+# 'quiz_insights' holds generated quiz insights keyed by their inputs; locmem evicts the least
+# recently used entry past MAX_ENTRIES, Redis relies on the server's maxmemory-policy (allkeys-lru).
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        },
+        'quiz_insights': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+            'KEY_PREFIX': 'quiz_insights',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'mindbuddy',
+        },
+        'quiz_insights': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'mindbuddy-quiz-insights',
+            'OPTIONS': {'MAX_ENTRIES': int(os.getenv('QUIZ_INSIGHT_CACHE_MAX_ENTRIES', 5000))},
+        }
+    }
+
+MOOD_CACHE_TIMEOUT = int(os.getenv('MOOD_CACHE_TIMEOUT', 3600))
+
+# Daily mood reminders (send_mood_reminders): notifier class and FileNotifier output path
+MOOD_REMINDER_NOTIFIER = os.getenv('MOOD_REMINDER_NOTIFIER', 'Mood_Tracking.notifiers.ConsoleNotifier')
+MOOD_REMINDER_FILE = os.getenv('MOOD_REMINDER_FILE', os.path.join(BASE_DIR, 'mood_reminders.jsonl'))
+
+# Quiz question bank: pre-generated sets kept per (topic, length), refilled on a background thread pool
+QUIZ_BANK_POOL_DEPTH = int(os.getenv('QUIZ_BANK_POOL_DEPTH', 3))
+# Only curated topics, or free-text topics used at least this many times, get a pool
+QUIZ_BANK_MIN_USAGE = int(os.getenv('QUIZ_BANK_MIN_USAGE', 20))
+QUIZ_BACKGROUND_WORKERS = int(os.getenv('QUIZ_BACKGROUND_WORKERS', 4))
+
+# Quiz topic listings: cached until a topic is written; popularity order is refreshed on a timer
+QUIZ_TOPICS_CACHE_TIMEOUT = int(os.getenv('QUIZ_TOPICS_CACHE_TIMEOUT', 3600))
+QUIZ_TOPICS_POPULAR_CACHE_TIMEOUT = int(os.getenv('QUIZ_TOPICS_POPULAR_CACHE_TIMEOUT', 300))
+
+# Follow-up requests allowed when a generated quiz comes back short of valid questions
+QUIZ_GENERATION_MAX_TOPUPS = int(os.getenv('QUIZ_GENERATION_MAX_TOPUPS', 2))
+
+# Background quiz insights: how long live progress is kept, how long an SSE stream may hold a
+# worker before telling the client to poll instead, and when a queued job counts as lost
+# (requeue_stuck_insights regenerates those; users may also retry them)
+QUIZ_INSIGHT_PROGRESS_TIMEOUT = 600
+QUIZ_INSIGHT_STREAM_TIMEOUT = int(os.getenv('QUIZ_INSIGHT_STREAM_TIMEOUT', 30))
+QUIZ_INSIGHT_STALE_AFTER = int(os.getenv('QUIZ_INSIGHT_STALE_AFTER', 300))
+
+# Insight cache: identical quiz inputs reuse a generated insight for this many seconds
+QUIZ_INSIGHT_CACHE_ALIAS = 'quiz_insights'
+QUIZ_INSIGHT_CACHE_TIMEOUT = int(os.getenv('QUIZ_INSIGHT_CACHE_TIMEOUT', 7 * 24 * 3600))
+
 # Media files for voice messages
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
@@ -167,6 +230,10 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'mindbuddy.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
 SESSION_ENGINE = 'django.contrib.sessions.backends.db'
@@ -1,32 +1,63 @@
 from django.contrib import admin
-from .models import QuizTopic, Quiz, QuizResult, QuizHistory
+from mindbuddy.admin_performance import PerformanceAdminMixin
+from .models import QuizTopic, Quiz, QuizResult, QuizHistory, QuestionSet
+from .services import QuizTopicService
 
 @admin.register(QuizTopic)
 class QuizTopicAdmin(admin.ModelAdmin):
-    list_display = ['name', 'created_at']
+    list_display = ['name', 'is_curated', 'usage_count', 'created_at']
+    list_editable = ['is_curated']
+    list_filter = ['is_curated']
     search_fields = ['name']
     ordering = ['name']
+    readonly_fields = ['usage_count']
+    
+    # Topic listings are cached; any write here invalidates them
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        QuizTopicService.invalidate()
+    
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        QuizTopicService.invalidate()
+    
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        QuizTopicService.invalidate()
 
 @admin.register(Quiz)
 class QuizAdmin(admin.ModelAdmin):
     list_display = ['id', 'topic', 'length', 'user', 'created_at']
     list_filter = ['length', 'topic', 'created_at']
-    search_fields = ['topic__name', 'user__username']
+    list_select_related = ['topic', 'user']
+    search_fields = ['topic__name', 'user__name']
     ordering = ['-created_at']
     readonly_fields = ['created_at']
 
+@admin.register(QuestionSet)
+class QuestionSetAdmin(admin.ModelAdmin):
+    list_display = ['id', 'topic', 'length', 'generation_seconds', 'created_at']
+    list_filter = ['length', 'topic']
+    list_select_related = ['topic']
+    ordering = ['created_at']
+    readonly_fields = ['created_at']
+
 @admin.register(QuizResult)
-class QuizResultAdmin(admin.ModelAdmin):
+class QuizResultAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ['id', 'quiz', 'user', 'completed_at', 'liked']
     list_filter = ['liked', 'completed_at', 'quiz__topic']
-    search_fields = ['quiz__topic__name', 'user__username']
-    ordering = ['-completed_at']
+    list_select_related = ['quiz__topic', 'user']
+    search_fields = ['quiz__topic__name__exact', 'user__name__exact']
     readonly_fields = ['completed_at']
+    raw_id_fields = ['quiz', 'user']
+    keyset_field = 'completed_at'
 
 @admin.register(QuizHistory)
-class QuizHistoryAdmin(admin.ModelAdmin):
+class QuizHistoryAdmin(PerformanceAdminMixin, admin.ModelAdmin):
     list_display = ['id', 'topic', 'user', 'date']
     list_filter = ['topic', 'date']
-    search_fields = ['topic__name', 'user__username']
-    ordering = ['-date']
-    readonly_fields = ['date']
\ No newline at end of file
+    list_select_related = ['topic', 'user']
+    search_fields = ['topic__name__exact', 'user__name__exact']
+    readonly_fields = ['date']
+    raw_id_fields = ['user']
+    keyset_field = 'date'
\ No newline at end of file
@@ -0,0 +1,61 @@
+"""
+In-process background work for the quiz app.
+
+LLM calls that the user should not wait on (question-bank refills, insight
+generation) run on a small shared thread pool. Jobs close their database
+connection when they finish so worker threads never hold one between jobs.
+Work scheduled here is best effort: it is lost if the process exits, so
+anything that must eventually happen also has a management command.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def get_executor():
+    """Shared pool, created on first use with QUIZ_BACKGROUND_WORKERS threads"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'QUIZ_BACKGROUND_WORKERS', 4),
+                thread_name_prefix='quiz-background'
+            )
+        return _executor
+
+
+def _run(func, args, kwargs, key=None):
+    close_old_connections()
+    try:
+        return func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background quiz job %s failed", getattr(func, '__qualname__', func))
+    finally:
+        if key is not None:
+            with _pending_lock:
+                _pending.discard(key)
+        connection.close()
+
+
+def submit(func, *args, **kwargs):
+    """Run func(*args, **kwargs) on the background pool; returns the Future"""
+    return get_executor().submit(_run, func, args, kwargs)
+
+
+def submit_once(key, func, *args, **kwargs):
+    """Like submit(), but skipped while a job with the same key is queued or running"""
+    with _pending_lock:
+        if key in _pending:
+            return None
+        _pending.add(key)
+    return get_executor().submit(_run, func, args, kwargs, key)
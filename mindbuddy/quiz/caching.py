@@ -0,0 +1,71 @@
+"""
+Content-addressed cache of generated quiz insights.
+
+An insight depends only on the topic, the answers, the previous answers it is
+compared with and the prompt, so the key is a hash of exactly those. Users
+giving the same answers to the same (often pre-generated) quiz share one LLM
+call. Bump INSIGHTS_PROMPT_VERSION in services.py whenever the prompt changes.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+def get_cache():
+    """Cache alias used for insights (QUIZ_INSIGHT_CACHE_ALIAS, 'default' unless configured)"""
+    return caches[getattr(settings, 'QUIZ_INSIGHT_CACHE_ALIAS', 'default')]
+
+
+def normalize_text(value):
+    """Case- and whitespace-insensitive form of a question or answer"""
+    return ' '.join(str(value).split()).casefold()
+
+
+def normalize_answers(results):
+    """[(question, answer), ...] in quiz order, normalized"""
+    return [(normalize_text(item['question']), normalize_text(item['answer'])) for item in results]
+
+
+def previous_digest(previous_results):
+    """Digest of the earlier answers the insight is compared with ('' for a first attempt)"""
+    if not previous_results or 'results_data' not in previous_results:
+        return ''
+    # The date is left out (the prompt doesn't use it), so equal answer histories share an insight
+    payload = json.dumps(normalize_answers(previous_results['results_data']))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def make_key(topic, results, previous_results, prompt_version):
+    """Cache key for the insight generated from these inputs"""
+    payload = json.dumps([
+        prompt_version,
+        normalize_text(topic),
+        normalize_answers(results),
+        previous_digest(previous_results),
+    ])
+    return 'quiz:insight:%s' % hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def get_insight(key):
+    """Cached insight text, or None"""
+    return get_cache().get(key)
+
+
+def set_insight(key, text):
+    """Cache a successfully generated insight"""
+    get_cache().set(key, text, getattr(settings, 'QUIZ_INSIGHT_CACHE_TIMEOUT', 7 * 24 * 3600))
+
+
+def remember_source(result_id, key):
+    """Record which key a result's insight was stored under or served from"""
+    get_cache().set('quiz:insight_source:%s' % result_id, key, getattr(settings, 'QUIZ_INSIGHT_CACHE_TIMEOUT', 7 * 24 * 3600))
+
+
+def discard_for_result(result_id, text):
+    """Drop the cached insight a result received if it is still text (e.g. after the user disliked it)"""
+    cache = get_cache()
+    key = cache.get('quiz:insight_source:%s' % result_id)
+    if key is not None and cache.get(key) == text:
+        cache.delete(key)
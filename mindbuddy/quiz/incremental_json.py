@@ -0,0 +1,90 @@
+"""
+Incremental parsing of a streamed JSON array of objects.
+
+LLM completions arrive a few characters at a time. ObjectArrayParser scans the
+text as it comes and hands back each object of the first JSON array as soon as
+its closing brace arrives, so callers can use question 1 while the model is
+still writing question 8. The array may be top level or wrapped in an object
+(e.g. {"questions": [...]}), and stray brackets in any prose before it are
+ignored: an array that closes without containing an object does not count.
+"""
+import json
+
+
+class ObjectArrayParser:
+    """Feed text chunks; get back the complete objects of the first array seen so far"""
+
+    def __init__(self):
+        self.buffer = []
+        self.position = 0
+        self.stack = []  # Open containers: '[' or '{'
+        self.in_string = False
+        self.escaped = False
+        self.array_depth = None  # len(stack) once inside the target array
+        self.object_start = None
+        self.objects_seen = 0
+        self.finished = False
+
+    def feed(self, chunk):
+        """Consume chunk; returns a list of objects completed by it (unparseable objects are skipped)"""
+        completed = []
+        if self.finished:
+            return completed
+
+        self.buffer.append(chunk)
+        text = ''.join(self.buffer)
+        self.buffer = [text]
+
+        for index in range(self.position, len(text)):
+            char = text[index]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+                continue
+
+            if char == '"':
+                self.in_string = True
+            elif char in '[{':
+                self.stack.append(char)
+                if char == '[' and self.array_depth is None:
+                    self.array_depth = len(self.stack)
+                elif char == '{' and self.array_depth is not None and len(self.stack) == self.array_depth + 1:
+                    self.object_start = index
+            elif char in ']}':
+                if not self.stack:
+                    continue
+                self.stack.pop()
+                if char == '}' and self.object_start is not None and len(self.stack) == self.array_depth:
+                    self.objects_seen += 1
+                    try:
+                        completed.append(json.loads(text[self.object_start:index + 1]))
+                    except ValueError:
+                        pass
+                    self.object_start = None
+                elif char == ']' and self.array_depth is not None and len(self.stack) == self.array_depth - 1:
+                    if not self.objects_seen:
+                        self.array_depth = None  # Not the array we want; keep looking
+                        continue
+                    self.finished = True
+                    break
+
+        # Keep only the unfinished object (if any) to bound memory on long streams
+        keep_from = self.object_start if self.object_start is not None else len(text)
+        if self.object_start is not None:
+            self.object_start = 0
+        self.buffer = [text[keep_from:]]
+        self.position = len(text) - keep_from
+        return completed
+
+
+def iter_array_objects(chunks):
+    """Yield each object of the first JSON array in a stream of text chunks"""
+    parser = ObjectArrayParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+        if parser.finished:
+            return
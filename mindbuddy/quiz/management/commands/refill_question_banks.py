@@ -0,0 +1,42 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quiz.models import Quiz, QuizTopic
+from quiz.services import QuestionBankService
+
+
+class Command(BaseCommand):
+    help = "Pre-generate quiz question sets until every (topic, length) pool is full"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--topic', action='append',
+                            help='Topic name to refill (repeatable; default: curated and popular topics)')
+        parser.add_argument('--length', type=int, action='append', choices=[length for length, _ in Quiz.LENGTH_CHOICES],
+                            help='Quiz length to refill (repeatable; default: all lengths)')
+        parser.add_argument('--depth', type=int, default=None, help='Sets per pool (default: QUIZ_BANK_POOL_DEPTH)')
+
+    def handle(self, *args, **options):
+        try:
+            bank = QuestionBankService()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        if options['topic']:
+            topics = QuizTopic.objects.filter(name__in=options['topic']).order_by('name')
+        else:
+            topics = QuestionBankService.eligible_topics().order_by('name')
+        lengths = options['length'] or [length for length, _ in Quiz.LENGTH_CHOICES]
+
+        started = time.monotonic()
+        total = 0
+        for topic in topics:
+            for length in lengths:
+                created = bank.refill(topic, length, options['depth'])
+                total += created
+                if options['verbosity'] > 1:
+                    self.stdout.write(f"{topic.name} ({length}): +{created}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Added {total} question sets in {time.monotonic() - started:.1f}s"
+        ))
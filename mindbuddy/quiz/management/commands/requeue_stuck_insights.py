@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from quiz.models import QuizResult
+from quiz.services import QuizService
+
+
+class Command(BaseCommand):
+    help = "Regenerate quiz insights whose background job was lost (stuck pending/generating)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than', type=int, default=None,
+                            help='Seconds since the job was queued (default: QUIZ_INSIGHT_STALE_AFTER)')
+        parser.add_argument('--limit', type=int, default=100, help='Maximum results to regenerate in one run')
+        parser.add_argument('--dry-run', action='store_true', help='Only list stuck results')
+
+    def handle(self, *args, **options):
+        try:
+            quiz_service = QuizService()
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        cutoff = None
+        if options['older_than'] is not None:
+            cutoff = timezone.now() - timedelta(seconds=options['older_than'])
+        stuck = quiz_service.stuck_results(cutoff)
+        result_ids = list(stuck.order_by('id').values_list('id', flat=True)[:options['limit']])
+
+        if options['dry_run']:
+            self.stdout.write(f"{len(result_ids)} stuck results: {result_ids}")
+            return
+
+        outcomes = {'ready': 0, 'failed': 0}
+        for result_id in result_ids:
+            # Claim the row so an overlapping run (or a user's retry) doesn't generate it twice
+            claimed = stuck.filter(id=result_id).update(insight_status='pending', insight_requested_at=timezone.now())
+            if not claimed:
+                continue
+
+            result = QuizResult.objects.get(id=result_id)
+            # The original comparison context (and any disliked text) is gone; use the previous attempt
+            insight_status = quiz_service.generate_result_insights(
+                result_id, quiz_service.previous_result_context(result)
+            )
+            outcomes[insight_status] += 1
+            if options['verbosity'] > 1:
+                self.stdout.write(f"Result {result_id}: {insight_status}")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Regenerated {outcomes['ready']} insights ({outcomes['failed']} failed)"
+        ))
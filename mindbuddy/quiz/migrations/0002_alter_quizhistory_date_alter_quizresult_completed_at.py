@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='quizhistory',
+            name='date',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='quizresult',
+            name='completed_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0002_alter_quizhistory_date_alter_quizresult_completed_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionSet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('length', models.IntegerField(choices=[(3, '3 Questions'), (5, '5 Questions'), (8, '8 Questions')])),
+                ('questions_data', models.JSONField()),
+                ('generation_seconds', models.FloatField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('topic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='question_sets', to='quiz.quiztopic')),
+            ],
+            options={
+                'ordering': ['created_at'],
+                'indexes': [models.Index(fields=['topic', 'length', 'created_at'], name='quiz_question_set_pool_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0003_questionset'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizresult',
+            name='insight_status',
+            field=models.CharField(choices=[('pending', 'Pending'), ('generating', 'Generating'), ('ready', 'Ready'), ('failed', 'Failed')], default='ready', max_length=10),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0004_quizresult_insight_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiztopic',
+            name='is_curated',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='quiztopic',
+            name='usage_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-19 04:52
+
+from django.db import migrations
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+DEFAULT_TOPICS = [
+    "Managing Daily Stress", "Improving Sleep Quality", "Building Mindfulness Habits",
+    "Work-Life Balance", "Practicing Self-Compassion", "Overcoming Procrastination",
+    "Fostering Positive Thinking", "Understanding My Emotions", "Building Healthy Relationships",
+]
+
+
+def seed_topics(apps, schema_editor):
+    QuizTopic = apps.get_model('quiz', 'QuizTopic')
+    Quiz = apps.get_model('quiz', 'Quiz')
+
+    existing = set(QuizTopic.objects.filter(name__in=DEFAULT_TOPICS).values_list('name', flat=True))
+    QuizTopic.objects.bulk_create([
+        QuizTopic(name=name, is_curated=True) for name in DEFAULT_TOPICS if name not in existing
+    ])
+    QuizTopic.objects.filter(name__in=DEFAULT_TOPICS).update(is_curated=True)
+
+    # Start popularity from the quizzes already taken
+    quiz_counts = Quiz.objects.filter(topic=OuterRef('pk')).order_by().values('topic').annotate(count=Count('id')).values('count')
+    QuizTopic.objects.update(usage_count=Coalesce(Subquery(quiz_counts), 0))
+
+
+def unseed_topics(apps, schema_editor):
+    QuizTopic = apps.get_model('quiz', 'QuizTopic')
+    QuizTopic.objects.filter(name__in=DEFAULT_TOPICS).update(is_curated=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0005_quiztopic_curation'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_topics, unseed_topics),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 05:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0006_seed_curated_topics'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizresult',
+            name='insight_requested_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -4,6 +4,8 @@ import json
 
 class QuizTopic(models.Model):
     name = models.CharField(max_length=200, unique=True)
+    is_curated = models.BooleanField(default=False)  # Curated topics are listed by default; free-text topics are not
+    usage_count = models.PositiveIntegerField(default=0)  # Quizzes created on this topic, for popularity ordering
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
@@ -28,12 +30,38 @@ class Quiz(models.Model):
     def __str__(self):
         return f"Quiz: {self.topic.name} ({self.length} questions)"
 
+class QuestionSet(models.Model):
+    """A pre-generated, validated set of questions waiting in the bank for a (topic, length)"""
+    topic = models.ForeignKey(QuizTopic, on_delete=models.CASCADE, related_name='question_sets')
+    length = models.IntegerField(choices=Quiz.LENGTH_CHOICES)
+    questions_data = models.JSONField()
+    generation_seconds = models.FloatField(null=True, blank=True)  # LLM latency when the set was generated
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        ordering = ['created_at']
+        indexes = [
+            models.Index(fields=['topic', 'length', 'created_at'], name='quiz_question_set_pool_idx'),
+        ]
+    
+    def __str__(self):
+        return f"Question set: {self.topic.name} ({self.length} questions)"
+
 class QuizResult(models.Model):
+    INSIGHT_STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('generating', 'Generating'),
+        ('ready', 'Ready'),
+        ('failed', 'Failed'),
+    ]
+    
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True)
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE)
     answers_data = models.JSONField()  # Store user answers
     insights = models.TextField(blank=True)
-    completed_at = models.DateTimeField(auto_now_add=True)
+    insight_status = models.CharField(max_length=10, choices=INSIGHT_STATUS_CHOICES, default='ready')  # Insights are generated in the background
+    insight_requested_at = models.DateTimeField(null=True, blank=True)  # When generation was last queued; finds stuck jobs
+    completed_at = models.DateTimeField(auto_now_add=True, db_index=True)
     liked = models.BooleanField(null=True, blank=True)  # True for like, False for dislike, None for no feedback
     
     class Meta:
@@ -54,7 +82,7 @@ class QuizHistory(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, null=True, blank=True)
     topic = models.ForeignKey(QuizTopic, on_delete=models.CASCADE)
     results_data = models.JSONField()
-    date = models.DateTimeField(auto_now_add=True)
+    date = models.DateTimeField(auto_now_add=True, db_index=True)
     
     class Meta:
         ordering = ['-date']
@@ -4,7 +4,7 @@ from .models import QuizTopic, Quiz, QuizResult, QuizHistory
 class QuizTopicSerializer(serializers.ModelSerializer):
     class Meta:
         model = QuizTopic
-        fields = ['id', 'name', 'created_at']
+        fields = ['id', 'name', 'is_curated', 'created_at']
 
 class QuizSerializer(serializers.ModelSerializer):
     topic_name = serializers.CharField(source='topic.name', read_only=True)
@@ -19,7 +19,15 @@ class QuizResultSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = QuizResult
-        fields = ['id', 'quiz_id', 'topic_name', 'answers_data', 'insights', 'completed_at', 'liked']
+        fields = ['id', 'quiz_id', 'topic_name', 'answers_data', 'insights', 'insight_status', 'completed_at', 'liked']
+
+QUIZ_RESULT_FIELDS = ('id', 'quiz_id', 'topic_name', 'answers_data', 'insights', 'insight_status', 'completed_at', 'liked')
+QUIZ_RESULT_COLUMNS = ('id', 'quiz_id', 'quiz__topic__name', 'answers_data', 'insights', 'insight_status', 'completed_at', 'liked')
+
+
+def fast_quiz_result_data(queryset):
+    """QuizResultSerializer(many=True).data equivalent built straight from .values_list()"""
+    return [dict(zip(QUIZ_RESULT_FIELDS, row)) for row in queryset.values_list(*QUIZ_RESULT_COLUMNS)]
 
 class QuizHistorySerializer(serializers.ModelSerializer):
     topic_name = serializers.CharField(source='topic.name', read_only=True)
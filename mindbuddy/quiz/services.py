@@ -1,9 +1,29 @@
 import os
 import requests
+import hashlib
 import json
-from datetime import datetime
+import logging
+import time
+from datetime import datetime, timedelta
 from django.conf import settings
-from .models import QuizTopic, Quiz, QuizResult, QuizHistory
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import Count, F, Q
+from . import background, caching, streaming, validation
+from .incremental_json import iter_array_objects
+from .models import QuizTopic, Quiz, QuizResult, QuizHistory, QuestionSet
+from .serializers import QuizTopicSerializer
+
+logger = logging.getLogger(__name__)
+
+INSIGHTS_ERROR_MESSAGE = "Sorry, I had trouble generating insights. Please try again later."
+
+# Part of every insight cache key: bump when the insights prompt changes
+INSIGHTS_PROMPT_VERSION = 2
+
+# Minimum seconds between progress publishes while insights stream in
+INSIGHT_PUBLISH_INTERVAL = 0.1
 
 class AIQuizService:
     def __init__(self):
@@ -19,6 +39,94 @@ class AIQuizService:
     
     def generate_quiz_questions(self, topic, num_questions):
         """Generate quiz questions using AI"""
+        try:
+            return list(self.stream_quiz_questions(topic, num_questions)) or None
+        except Exception:
+            logger.exception("Error generating quiz questions for %r", topic)
+            return None
+    
+    def stream_quiz_questions(self, topic, num_questions):
+        """
+        Yield num_questions valid, distinct questions, each as soon as it is available.
+        
+        Questions are parsed from the stream as they complete. If the stream falls short, the
+        full text is repaired and re-read, then only the shortfall is requested again (up to
+        QUIZ_GENERATION_MAX_TOPUPS times). Fewer questions are yielded if that still fails.
+        """
+        # No JSON mode here: it can't be streamed, and the parser skips any text around the array
+        payload = {
+            "model": "llama3-8b-8192",
+            "messages": [{"role": "system", "content": self._questions_prompt(topic, num_questions)}],
+            "max_tokens": 2048,
+            "stream": True
+        }
+        
+        seen = set()
+        count = 0
+        chunks = []
+        
+        def recorded(stream):
+            for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+        
+        for item in iter_array_objects(recorded(self._stream_completion(payload))):
+            for question in validation.clean_questions([item], seen):
+                yield question
+                count += 1
+                if count == num_questions:
+                    return
+        
+        # Salvage questions the incremental parser had to skip (malformed JSON, wrong wrapper)
+        salvaged = validation.extract_questions(validation.repair_json(''.join(chunks)))
+        for question in validation.clean_questions(salvaged, seen):
+            yield question
+            count += 1
+            if count == num_questions:
+                return
+        
+        for _ in range(getattr(settings, 'QUIZ_GENERATION_MAX_TOPUPS', 2)):
+            for question in self._request_questions(topic, num_questions - count, seen):
+                yield question
+                count += 1
+                if count == num_questions:
+                    return
+    
+    def complete_questions(self, topic, questions, num_questions):
+        """
+        Fill a partial question list (e.g. what a broken stream delivered) up to num_questions,
+        keeping the valid ones and requesting only the shortfall
+        """
+        seen = set()
+        questions = validation.clean_questions(questions, seen)[:num_questions]
+        for _ in range(getattr(settings, 'QUIZ_GENERATION_MAX_TOPUPS', 2)):
+            if len(questions) == num_questions:
+                break
+            questions += self._request_questions(topic, num_questions - len(questions), seen)
+        return questions
+    
+    def _request_questions(self, topic, num_questions, seen):
+        """Ask for num_questions more questions that differ from those in seen; returns the valid new ones"""
+        payload = {
+            "model": "llama3-8b-8192",
+            "messages": [{"role": "system", "content": self._questions_prompt(topic, num_questions, exclude=seen)}],
+            "max_tokens": 2048,
+            "response_format": {"type": "json_object"}
+        }
+        
+        try:
+            response = requests.post(self.api_url, headers=self.headers, json=payload)
+            response.raise_for_status()
+            content = response.json()['choices'][0]['message']['content']
+        except Exception:
+            logger.exception("Error requesting %d more quiz questions for %r", num_questions, topic)
+            return []
+        
+        questions = validation.extract_questions(validation.repair_json(content))
+        return validation.clean_questions(questions, seen)[:num_questions]
+    
+    def _questions_prompt(self, topic, num_questions, exclude=None):
+        """Prompt for num_questions questions, avoiding the (normalized) question texts in exclude"""
         prompt = f'''You are a wellness assistant. Create a {num_questions}-question multiple-choice quiz about "{topic}". 
         You MUST return the output as a single, valid JSON array of objects with this exact format:
         [
@@ -27,37 +135,77 @@ class AIQuizService:
                 "options": ["Option A", "Option B", "Option C", "Option D"]
             }}
         ]
+        Each question needs {validation.MIN_OPTIONS} to {validation.MAX_OPTIONS} distinct options.
         Make sure each question is thoughtful and relevant to wellness and mental health.'''
         
+        if exclude:
+            already_asked = "\n".join(f"- {question}" for question in sorted(exclude))
+            prompt += f'''
+        The quiz already has these questions, so do not repeat or rephrase them:
+        {already_asked}
+        If you wrap the array in an object, use the key "questions".'''
+        return prompt
+    
+    def generate_insights(self, topic, current_results, previous_results=None, disliked_text=None):
+        """Generate personalized insights based on quiz results"""
+        # Identical inputs share one generation; a regeneration after a dislike must be fresh
+        cache_key = None
+        if not disliked_text:
+            cache_key = caching.make_key(topic, current_results, previous_results, INSIGHTS_PROMPT_VERSION)
+            cached = caching.get_insight(cache_key)
+            if cached is not None:
+                return cached
+        
+        system_prompt = self._insights_prompt(topic, current_results, previous_results, disliked_text)
+        
         try:
             payload = {
                 "model": "llama3-8b-8192",
-                "messages": [{"role": "system", "content": prompt}],
-                "max_tokens": 2048,
-                "response_format": {"type": "json_object"}
+                "messages": [{"role": "system", "content": system_prompt}],
+                "max_tokens": 1024
             }
             
             response = requests.post(self.api_url, headers=self.headers, json=payload)
             response.raise_for_status()
             
-            response_data = json.loads(response.json()['choices'][0]['message']['content'])
+            insights = response.json()['choices'][0]['message']['content']
+            if cache_key and insights.strip():
+                caching.set_insight(cache_key, insights)
+            return insights
             
-            # Handle different response formats
-            if isinstance(response_data, dict):
-                for value in response_data.values():
-                    if isinstance(value, list):
-                        return value
-            elif isinstance(response_data, list):
-                return response_data
-                
-            return None
+        except Exception:
+            logger.exception("Error generating insights for %r", topic)
+            return INSIGHTS_ERROR_MESSAGE
+    
+    def stream_insights(self, topic, current_results, previous_results=None, disliked_text=None):
+        """Yield insight text chunks as the model produces them; raises on API errors"""
+        system_prompt = self._insights_prompt(topic, current_results, previous_results, disliked_text)
+        payload = {
+            "model": "llama3-8b-8192",
+            "messages": [{"role": "system", "content": system_prompt}],
+            "max_tokens": 1024,
+            "stream": True
+        }
+        yield from self._stream_completion(payload)
+    
+    def _stream_completion(self, payload):
+        """Yield content deltas of a streamed chat completion"""
+        with requests.post(self.api_url, headers=self.headers, json=payload, stream=True) as response:
+            response.raise_for_status()
             
-        except Exception as e:
-            print(f"Error generating quiz: {e}")
-            return None
+            # OpenAI-compatible SSE: "data: {chunk}" lines, terminated by "data: [DONE]"
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith('data:'):
+                    continue
+                data = line[len('data:'):].strip()
+                if data == '[DONE]':
+                    break
+                delta = json.loads(data)['choices'][0].get('delta', {}).get('content')
+                if delta:
+                    yield delta
     
-    def generate_insights(self, topic, current_results, previous_results=None, disliked_text=None):
-        """Generate personalized insights based on quiz results"""
+    def _insights_prompt(self, topic, current_results, previous_results=None, disliked_text=None):
+        """System prompt for insights on a set of quiz answers"""
         current_results_str = "\n".join([
             f"- {item['question']}: {item['answer']}" 
             for item in current_results
@@ -73,7 +221,7 @@ class AIQuizService:
                     f"- {item['question']}: {item['answer']}" 
                     for item in previous_results['results_data']
                 ])
-                feedback_context = f"""The user took this quiz before on {previous_results['date']}. 
+                feedback_context = f"""The user took this quiz before. 
                 Please compare their new results to the old ones.
                 Previous answers:\n{previous_results_str}\n\nCurrent answers:\n{current_results_str}"""
             else:
@@ -88,40 +236,211 @@ class AIQuizService:
         Follow it with the bolded heading **Here are a few gentle suggestions:** and list each 
         suggestion as a separate bullet point (`*`).
         """
+        return system_prompt
+
+class QuestionBankService:
+    """Pool of pre-generated question sets per (topic, length) so quizzes start without an LLM call"""
+    
+    METRICS_PREFIX = 'quiz_bank:'
+    METRIC_NAMES = ['hits', 'misses', 'refills', 'refill_failures', 'refill_ms_total', 'refill_ms_last']
+    
+    def __init__(self, ai_service=None):
+        self.ai_service = ai_service or AIQuizService()
+    
+    @staticmethod
+    def pool_depth():
+        """Sets to keep ready per (topic, length)"""
+        return getattr(settings, 'QUIZ_BANK_POOL_DEPTH', 3)
+    
+    @staticmethod
+    def is_valid(questions, length):
+        """A set is usable if it has exactly length distinct questions that pass validation"""
+        if not isinstance(questions, list) or len(questions) != length:
+            return False
+        return len(validation.clean_questions(questions)) == length
+    
+    def take(self, topic, length):
+        """Remove and return the oldest banked questions for (topic, length), or None if the pool is empty"""
+        with transaction.atomic():
+            # skip_locked lets concurrent requests each grab a different set instead of queueing
+            question_set = (
+                QuestionSet.objects.select_for_update(skip_locked=True)
+                .filter(topic=topic, length=length)
+                .order_by('created_at')
+                .first()
+            )
+            if question_set is None:
+                self.record('misses')
+                return None
+            question_set.delete()
         
-        try:
-            payload = {
-                "model": "llama3-8b-8192",
-                "messages": [{"role": "system", "content": system_prompt}],
-                "max_tokens": 1024
-            }
-            
-            response = requests.post(self.api_url, headers=self.headers, json=payload)
-            response.raise_for_status()
+        self.record('hits')
+        return question_set.questions_data
+    
+    def refill(self, topic, length, depth=None):
+        """Generate sets until (topic, length) holds depth of them; returns the number added"""
+        depth = self.pool_depth() if depth is None else depth
+        missing = depth - QuestionSet.objects.filter(topic=topic, length=length).count()
+        
+        created = 0
+        for _ in range(max(missing, 0)):
+            started = time.monotonic()
+            questions = self.ai_service.generate_quiz_questions(topic.name, length)
+            elapsed = time.monotonic() - started
             
-            return response.json()['choices'][0]['message']['content']
+            if not self.is_valid(questions, length):
+                self.record('refill_failures')
+                continue
             
-        except Exception as e:
-            print(f"Error generating insights: {e}")
-            return "Sorry, I had trouble generating insights. Please try again later."
+            QuestionSet.objects.create(
+                topic=topic, length=length, questions_data=questions, generation_seconds=elapsed
+            )
+            self.record('refills')
+            self.record('refill_ms_total', int(elapsed * 1000))
+            cache.set(self.METRICS_PREFIX + 'refill_ms_last', int(elapsed * 1000), None)
+            created += 1
+        return created
+    
+    @staticmethod
+    def is_eligible(topic):
+        """Only curated or popular topics are pre-generated, so free-text topics cost no background LLM calls"""
+        return topic.is_curated or topic.usage_count >= getattr(settings, 'QUIZ_BANK_MIN_USAGE', 20)
+    
+    @staticmethod
+    def eligible_topics():
+        """Topics whose pools are kept full"""
+        return QuizTopic.objects.filter(
+            Q(is_curated=True) | Q(usage_count__gte=getattr(settings, 'QUIZ_BANK_MIN_USAGE', 20))
+        )
+    
+    def schedule_refill(self, topic, length):
+        """Top up (topic, length) in the background; a refill already in flight is not repeated"""
+        if not self.is_eligible(topic):
+            return None
+        return background.submit_once(('quiz_bank', topic.pk, length), self.refill, topic, length)
+    
+    @classmethod
+    def record(cls, name, amount=1):
+        """Add amount to a shared counter (kept in the default cache so every worker sees it)"""
+        key = cls.METRICS_PREFIX + name
+        cache.add(key, 0, None)
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            cache.set(key, amount, None)
+    
+    @classmethod
+    def metrics(cls):
+        """Hit rate, refill latency and current pool levels"""
+        values = cache.get_many([cls.METRICS_PREFIX + name for name in cls.METRIC_NAMES])
+        counters = {name: values.get(cls.METRICS_PREFIX + name, 0) for name in cls.METRIC_NAMES}
+        
+        requests_served = counters['hits'] + counters['misses']
+        pools = (
+            QuestionSet.objects.order_by()
+            .values('topic__name', 'length')
+            .annotate(available=Count('id'))
+            .order_by('topic__name', 'length')
+        )
+        return {
+            'hits': counters['hits'],
+            'misses': counters['misses'],
+            'hit_rate': round(counters['hits'] / requests_served, 3) if requests_served else None,
+            'refills': counters['refills'],
+            'refill_failures': counters['refill_failures'],
+            'refill_avg_seconds': (
+                round(counters['refill_ms_total'] / counters['refills'] / 1000, 3) if counters['refills'] else None
+            ),
+            'refill_last_seconds': counters['refill_ms_last'] / 1000 if counters['refills'] else None,
+            'pool_depth': cls.pool_depth(),
+            'pools': [
+                {'topic': pool['topic__name'], 'length': pool['length'], 'available': pool['available']}
+                for pool in pools
+            ],
+        }
+
+
+class QuizTopicService:
+    """Cached topic listings, invalidated by bumping a version whenever topics are written"""
+    
+    VERSION_KEY = 'quiz:topics:version'
+    
+    @staticmethod
+    def version():
+        """Current listing version"""
+        cache.add(QuizTopicService.VERSION_KEY, 1, None)
+        return cache.get(QuizTopicService.VERSION_KEY) or 1
+    
+    @staticmethod
+    def invalidate():
+        """Make every cached listing stale; call after creating, renaming, curating or deleting topics"""
+        cache.add(QuizTopicService.VERSION_KEY, 1, None)
+        try:
+            cache.incr(QuizTopicService.VERSION_KEY)
+        except ValueError:
+            cache.set(QuizTopicService.VERSION_KEY, 2, None)
+    
+    @staticmethod
+    def listing(include_all=False, order='name'):
+        """(etag, data) for the topic list: curated topics unless include_all, by name or 'popular'"""
+        scope = 'all' if include_all else 'curated'
+        key = 'quiz:topics:v%s:%s:%s' % (QuizTopicService.version(), scope, order)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+        
+        topics = QuizTopic.objects.all() if include_all else QuizTopic.objects.filter(is_curated=True)
+        topics = topics.order_by('-usage_count', 'name') if order == 'popular' else topics.order_by('name')
+        data = [dict(item) for item in QuizTopicSerializer(topics, many=True).data]
+        
+        etag = '"%s"' % hashlib.sha1(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+        entry = (etag, data)
+        
+        # Usage counts change on every quiz, so popularity order is refreshed on a timer instead
+        timeout = (
+            getattr(settings, 'QUIZ_TOPICS_POPULAR_CACHE_TIMEOUT', 300) if order == 'popular'
+            else getattr(settings, 'QUIZ_TOPICS_CACHE_TIMEOUT', 3600)
+        )
+        cache.set(key, entry, timeout)
+        return entry
+    
+    @staticmethod
+    def record_use(topic):
+        """Count a quiz created on topic"""
+        QuizTopic.objects.filter(pk=topic.pk).update(usage_count=F('usage_count') + 1)
+
 
 class QuizService:
     def __init__(self):
         self.ai_service = AIQuizService()
+        self.question_bank = QuestionBankService(self.ai_service)
     
     def get_or_create_topic(self, topic_name):
-        """Get or create a quiz topic"""
+        """Get or create a quiz topic (new free-text topics are not curated)"""
         topic, created = QuizTopic.objects.get_or_create(
             name=topic_name.strip()
         )
+        if created:
+            QuizTopicService.invalidate()
         return topic
     
-    def create_quiz(self, topic_name, length, user=None):
-        """Create a new quiz with AI-generated questions"""
+    def create_quiz(self, topic_name, length, user=None, partial_questions=None):
+        """
+        Create a new quiz, served from the question bank when a set is ready; partial_questions
+        (already shown to the user) are kept and only the missing ones are generated
+        """
         topic = self.get_or_create_topic(topic_name)
         
-        # Generate questions using AI
-        questions = self.ai_service.generate_quiz_questions(topic_name, length)
+        if partial_questions:
+            questions = self.ai_service.complete_questions(topic.name, partial_questions, length)
+        else:
+            questions = self.question_bank.take(topic, length)
+        if questions is None:
+            # Empty pool: generate synchronously as before
+            questions = self.ai_service.generate_quiz_questions(topic.name, length)
+        
+        # Top the pool back up for the next user either way
+        self.question_bank.schedule_refill(topic, length)
         
         if not questions or len(questions) != length:
             raise ValueError("Failed to generate quiz questions")
@@ -132,11 +451,46 @@ class QuizService:
             length=length,
             questions_data=questions
         )
+        QuizTopicService.record_use(topic)
         
         return quiz
     
+    def create_quiz_progressive(self, topic_name, length, user=None):
+        """
+        Create a quiz, yielding ('question', {'index', 'question'}) as each question becomes
+        available, then ('quiz', quiz) on success or ('error', {'error'}) on failure
+        """
+        topic = self.get_or_create_topic(topic_name)
+        
+        questions = self.question_bank.take(topic, length)
+        if questions is not None:
+            for index, question in enumerate(questions):
+                yield 'question', {'index': index, 'question': question}
+        else:
+            questions = []
+            try:
+                for question in self.ai_service.stream_quiz_questions(topic.name, length):
+                    yield 'question', {'index': len(questions), 'question': question}
+                    questions.append(question)
+            except Exception:
+                logger.exception("Error streaming quiz questions for %r", topic.name)
+                # Keep the questions already sent and request only the missing ones
+                for question in self.ai_service.complete_questions(topic.name, questions, length)[len(questions):]:
+                    yield 'question', {'index': len(questions), 'question': question}
+                    questions.append(question)
+        
+        self.question_bank.schedule_refill(topic, length)
+        
+        if len(questions) != length:
+            yield 'error', {'error': 'Failed to generate quiz questions'}
+            return
+        
+        quiz = Quiz.objects.create(user=user, topic=topic, length=length, questions_data=questions)
+        QuizTopicService.record_use(topic)
+        yield 'quiz', quiz
+    
     def submit_quiz_answers(self, quiz_id, answers, user=None):
-        """Submit quiz answers and generate insights"""
+        """Save quiz answers; insights are generated in the background"""
         try:
             quiz = Quiz.objects.get(id=quiz_id)
         except Quiz.DoesNotExist:
@@ -154,51 +508,140 @@ class QuizService:
         # Get previous results for comparison
         previous_results = self.get_previous_quiz_history(quiz.topic.name, user)
         
-        # Generate insights
-        insights = self.ai_service.generate_insights(
-            quiz.topic.name, 
-            results_data, 
-            previous_results
-        )
-        
         # Save quiz result
         quiz_result = QuizResult.objects.create(
             user=user,
             quiz=quiz,
             answers_data=results_data,
-            insights=insights
+            insight_status='pending',
+            insight_requested_at=timezone.now()
         )
         
         # Save to history
         self.save_quiz_history(quiz.topic, results_data, user)
         
+        self.schedule_insights(quiz_result, previous_results)
         return quiz_result
     
     def regenerate_insights(self, result_id, user=None):
-        """Regenerate insights for a quiz result (when user dislikes previous insights)"""
+        """Regenerate insights in the background (when user dislikes previous insights)"""
         try:
-            result = QuizResult.objects.get(id=result_id, user=user)
+            result = QuizResult.objects.select_related('quiz__topic').get(id=result_id, user=user)
         except QuizResult.DoesNotExist:
             raise ValueError("Quiz result not found")
         
+        # A job that outlived the stale cutoff was lost (e.g. the worker restarted): allow a retry
+        if result.insight_status in ('pending', 'generating') and not self.insights_stale(result):
+            raise ValueError("Insights are still being generated")
+        
         # Get previous results for comparison
         previous_results = self.get_previous_quiz_history(result.quiz.topic.name, user)
+        disliked_text = result.insights
         
-        # Generate new insights with disliked context
-        new_insights = self.ai_service.generate_insights(
-            result.quiz.topic.name,
-            result.answers_data,
-            previous_results,
-            disliked_text=result.insights
-        )
+        # Don't serve the disliked text to anyone else with the same answers
+        caching.discard_for_result(result.id, disliked_text)
         
-        # Update insights
-        result.insights = new_insights
+        result.insights = ''
+        result.insight_status = 'pending'
+        result.insight_requested_at = timezone.now()
         result.liked = None  # Reset feedback
-        result.save()
+        result.save(update_fields=['insights', 'insight_status', 'insight_requested_at', 'liked'])
+        
+        # New insights use the disliked text as context
+        self.schedule_insights(result, previous_results, disliked_text)
+        return result
+    
+    def get_result(self, result_id, user=None):
+        """Quiz result with the insight text generated so far while it is still in progress"""
+        try:
+            result = QuizResult.objects.select_related('quiz__topic').get(id=result_id, user=user)
+        except QuizResult.DoesNotExist:
+            raise ValueError("Quiz result not found")
         
+        if result.insight_status not in streaming.FINISHED_STATUSES:
+            progress = streaming.read_progress(result.id)
+            if progress is not None:
+                result.insights = progress['text']
+                result.insight_status = progress['status']
         return result
     
+    @staticmethod
+    def stale_cutoff():
+        """Insight jobs queued before this time are presumed lost"""
+        return timezone.now() - timedelta(seconds=getattr(settings, 'QUIZ_INSIGHT_STALE_AFTER', 300))
+    
+    def insights_stale(self, result):
+        """True if result's insight job was queued too long ago to still be running"""
+        return result.insight_requested_at is None or result.insight_requested_at < self.stale_cutoff()
+    
+    def stuck_results(self, cutoff=None):
+        """Results whose insight job was queued before cutoff and never finished"""
+        cutoff = cutoff or self.stale_cutoff()
+        return QuizResult.objects.filter(insight_status__in=['pending', 'generating']).filter(
+            Q(insight_requested_at__lt=cutoff) | Q(insight_requested_at__isnull=True)
+        )
+    
+    def previous_result_context(self, result):
+        """The attempt before result in the shape generate_insights expects, or None"""
+        previous = result.get_previous_results().first()
+        if previous is None:
+            return None
+        return {
+            'date': previous.completed_at.strftime("%B %d, %Y"),
+            'results_data': previous.answers_data
+        }
+    
+    def schedule_insights(self, result, previous_results=None, disliked_text=None):
+        """Generate insights for result on the background pool once the current transaction commits"""
+        streaming.publish_progress(result.id, '', 'pending')
+        transaction.on_commit(lambda: background.submit(
+            self.generate_result_insights, result.id, previous_results, disliked_text
+        ))
+    
+    def generate_result_insights(self, result_id, previous_results=None, disliked_text=None):
+        """Stream insights for a saved result, publishing progress as text arrives"""
+        result = QuizResult.objects.select_related('quiz__topic').get(id=result_id)
+        
+        cache_key = None
+        if not disliked_text:
+            cache_key = caching.make_key(
+                result.quiz.topic.name, result.answers_data, previous_results, INSIGHTS_PROMPT_VERSION
+            )
+            cached = caching.get_insight(cache_key)
+            if cached is not None:
+                caching.remember_source(result_id, cache_key)
+                QuizResult.objects.filter(id=result_id).update(insights=cached, insight_status='ready')
+                streaming.publish_progress(result_id, cached, 'ready')
+                return 'ready'
+        
+        QuizResult.objects.filter(id=result_id).update(insight_status='generating')
+        streaming.publish_progress(result_id, '', 'generating')
+        
+        chunks = []
+        try:
+            last_publish = time.monotonic()
+            for chunk in self.ai_service.stream_insights(
+                result.quiz.topic.name, result.answers_data, previous_results, disliked_text
+            ):
+                chunks.append(chunk)
+                if time.monotonic() - last_publish >= INSIGHT_PUBLISH_INTERVAL:
+                    streaming.publish_progress(result_id, ''.join(chunks), 'generating')
+                    last_publish = time.monotonic()
+            insights, insight_status = ''.join(chunks), 'ready'
+            if not insights.strip():
+                raise ValueError("Empty insights response")
+        except Exception:
+            logger.exception("Error generating insights for quiz result %s", result_id)
+            insights, insight_status = INSIGHTS_ERROR_MESSAGE, 'failed'
+        
+        if cache_key and insight_status == 'ready':
+            caching.set_insight(cache_key, insights)
+            caching.remember_source(result_id, cache_key)
+        
+        QuizResult.objects.filter(id=result_id).update(insights=insights, insight_status=insight_status)
+        streaming.publish_progress(result_id, insights, insight_status)
+        return insight_status
+    
     def get_previous_quiz_history(self, topic_name, user=None):
         """Get previous quiz history for a topic"""
         try:
@@ -0,0 +1,88 @@
+"""
+Live progress for background insight generation.
+
+The background job publishes the text generated so far to the cache; polling
+reads and Server-Sent Events streams both read it from there, so any web
+worker can serve a result whichever worker is generating it. The database
+remains the source of truth: when the cache has nothing (expired, or a
+per-process cache) readers fall back to the saved QuizResult.
+"""
+import json
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.utils import encoders
+
+from .models import QuizResult
+
+FINISHED_STATUSES = ('ready', 'failed')
+
+# Seconds between database checks while the cache has no progress for a result
+DATABASE_POLL_INTERVAL = 1.0
+
+
+def progress_key(result_id):
+    return 'quiz:insight_progress:%s' % result_id
+
+
+def publish_progress(result_id, text, status):
+    """Store the insight text generated so far and its status"""
+    cache.set(
+        progress_key(result_id),
+        {'text': text, 'status': status},
+        getattr(settings, 'QUIZ_INSIGHT_PROGRESS_TIMEOUT', 600)
+    )
+
+
+def read_progress(result_id):
+    """Latest published {'text', 'status'} for a result, or None"""
+    return cache.get(progress_key(result_id))
+
+
+def sse_event(event, data):
+    """One Server-Sent Events message with a JSON payload"""
+    return 'event: %s\ndata: %s\n\n' % (event, json.dumps(data, cls=encoders.JSONEncoder))
+
+
+def insight_events(result_id):
+    """
+    Yield SSE messages for a result's insights: 'token' events carrying new text
+    as it is generated, then one 'done' event with the final status and text, or a
+    'timeout' event pointing at the polling endpoint after QUIZ_INSIGHT_STREAM_TIMEOUT.
+    """
+    poll_interval = getattr(settings, 'QUIZ_INSIGHT_STREAM_POLL_INTERVAL', 0.1)
+    deadline = time.monotonic() + getattr(settings, 'QUIZ_INSIGHT_STREAM_TIMEOUT', 30)
+    next_database_check = 0.0
+    sent = 0
+
+    yield 'retry: 2000\n\n'
+    while True:
+        progress = read_progress(result_id)
+        if progress is None and time.monotonic() >= next_database_check:
+            next_database_check = time.monotonic() + DATABASE_POLL_INTERVAL
+            row = QuizResult.objects.filter(pk=result_id).values('insights', 'insight_status').first()
+            if row is None:
+                yield sse_event('done', {'status': 'failed', 'insights': ''})
+                return
+            if row['insight_status'] in FINISHED_STATUSES:
+                progress = {'text': row['insights'], 'status': row['insight_status']}
+
+        if progress is not None:
+            text = progress['text']
+            if len(text) > sent:
+                yield sse_event('token', {'text': text[sent:]})
+                sent = len(text)
+            if progress['status'] in FINISHED_STATUSES:
+                yield sse_event('done', {'status': progress['status'], 'insights': text})
+                return
+
+        if time.monotonic() > deadline:
+            # Don't hold a worker any longer: the client continues by polling the result
+            yield sse_event('timeout', {
+                'status': progress['status'] if progress else 'pending',
+                'poll': reverse('quiz:get_result', args=[result_id])
+            })
+            return
+        time.sleep(poll_interval)
@@ -1,3 +1,267 @@
-from django.test import TestCase
+import json
+import random
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from mindbuddy.renderers import ORJSONRenderer
+from . import caching, validation
+from .incremental_json import iter_array_objects
+from .models import Quiz, QuizResult, QuizTopic
+from .serializers import QuizResultSerializer, fast_quiz_result_data
+from .services import INSIGHTS_ERROR_MESSAGE, AIQuizService, QuestionBankService, QuizService, QuizTopicService
+
+
+def question(number, options=3):
+    return {'question': f"How often did thing {number} happen this week?", 'options': [f"Option {i}" for i in range(options)]}
+
+
+def random_chunks(text, seed, largest=6):
+    """text split at random boundaries"""
+    rng = random.Random(seed)
+    chunks, position = [], 0
+    while position < len(text):
+        size = rng.randint(1, largest)
+        chunks.append(text[position:position + size])
+        position += size
+    return chunks
+
+
+class FastSerializationTests(TestCase):
+    def test_fast_quiz_results_render_byte_identical_to_drf(self):
+        topic = QuizTopic.objects.create(name='Sleep ✨')
+        quiz = Quiz.objects.create(topic=topic, length=3, questions_data=[question(1), question(2), question(3)])
+        answers = [{'question': question(1)['question'], 'answer': 'Option 1 '}]
+        QuizResult.objects.create(quiz=quiz, answers_data=answers, insights='Sleep is “important”.', liked=True)
+        QuizResult.objects.create(quiz=quiz, answers_data=answers, insight_status='pending')
+        results = QuizResult.objects.select_related('quiz__topic')
+
+        self.assertEqual(
+            ORJSONRenderer().render(fast_quiz_result_data(results)),
+            JSONRenderer().render(QuizResultSerializer(results, many=True).data)
+        )
+
+
+class QuestionBankEligibilityTests(TestCase):
+    def test_only_curated_or_popular_topics_are_banked(self):
+        curated = QuizTopic.objects.create(name='Sleep', is_curated=True)
+        popular = QuizTopic.objects.create(name='Burnout', usage_count=20)
+        free_text = QuizTopic.objects.create(name='my cat ignores me', usage_count=3)
+
+        self.assertTrue(QuestionBankService.is_eligible(curated))
+        self.assertTrue(QuestionBankService.is_eligible(popular))
+        self.assertFalse(QuestionBankService.is_eligible(free_text))
+        eligible = QuestionBankService.eligible_topics()
+        self.assertTrue({curated, popular} <= set(eligible))
+        self.assertNotIn(free_text, eligible)
+
+
+@override_settings(GROQ_API_KEY='test-key', QUIZ_INSIGHT_STALE_AFTER=300)
+class StuckInsightTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        topic = QuizTopic.objects.create(name='Sleep', is_curated=True)
+        quiz = Quiz.objects.create(topic=topic, length=3, questions_data=[question(1), question(2), question(3)])
+        answers = [{'question': question(1)['question'], 'answer': 'Option 1'}]
+        long_ago = timezone.now() - timedelta(hours=1)
+        self.stuck = QuizResult.objects.create(
+            quiz=quiz, answers_data=answers, insight_status='generating', insight_requested_at=long_ago
+        )
+        self.running = QuizResult.objects.create(
+            quiz=quiz, answers_data=answers, insight_status='pending', insight_requested_at=timezone.now()
+        )
+
+    def test_only_stale_unfinished_results_are_stuck(self):
+        self.assertQuerySetEqual(QuizService().stuck_results(), [self.stuck])
+
+    def test_requeue_command_regenerates_stuck_insights(self):
+        with mock.patch.object(AIQuizService, 'stream_insights', return_value=iter(['You sleep ', 'well.'])):
+            call_command('requeue_stuck_insights', stdout=StringIO())
+
+        self.stuck.refresh_from_db()
+        self.running.refresh_from_db()
+        self.assertEqual((self.stuck.insight_status, self.stuck.insights), ('ready', 'You sleep well.'))
+        self.assertEqual(self.running.insight_status, 'pending')
+
+    def test_failed_generation_is_logged_and_marked_failed(self):
+        with mock.patch.object(AIQuizService, 'stream_insights', side_effect=RuntimeError('API down')):
+            with self.assertLogs('quiz.services', 'ERROR') as logs:
+                self.assertEqual(QuizService().generate_result_insights(self.stuck.id), 'failed')
+
+        self.assertIn('API down', logs.output[0])
+        self.stuck.refresh_from_db()
+        self.assertEqual((self.stuck.insight_status, self.stuck.insights), ('failed', INSIGHTS_ERROR_MESSAGE))
+
+
+class IncrementalJSONTests(TestCase):
+    def test_objects_survive_random_chunk_boundaries(self):
+        items = [question(1), {'question': 'Braces } and "quotes" [inside]?', 'options': ['a\\b', '{', ']']}, question(3)]
+        text = 'Here is your quiz [as requested]:\n' + json.dumps({'questions': items}, indent=2) + '\nEnjoy!'
+        for seed in range(25):
+            self.assertEqual(list(iter_array_objects(random_chunks(text, seed))), items)
+
+    def test_truncated_stream_yields_the_complete_objects(self):
+        text = json.dumps([question(1), question(2), question(3)])
+        text = text[:text.rfind('"Option')]
+        self.assertEqual(list(iter_array_objects(random_chunks(text, 7))), [question(1), question(2)])
+
+    def test_malformed_object_is_skipped(self):
+        text = '[{"question": "Broken?", "options": ["a", "b",]}, ' + json.dumps(question(2)) + ']'
+        self.assertEqual(list(iter_array_objects(random_chunks(text, 3))), [question(2)])
+
+
+class ValidationTests(TestCase):
+    def test_repair_closes_truncated_array(self):
+        text = '```json\n[' + json.dumps(question(1)) + ', ' + json.dumps(question(2)) + ', {"question": "Cut'
+        self.assertEqual(validation.repair_json(text), [question(1), question(2)])
+
+    def test_repair_handles_trailing_commas_and_smart_quotes(self):
+        text = '{“questions”: [{“question”: “Sleep well?”, “options”: [“Yes”, “No”,],},]}'
+        self.assertEqual(validation.repair_json(text), {'questions': [{'question': 'Sleep well?', 'options': ['Yes', 'No']}]})
+
+    def test_unrepairable_text_returns_none(self):
+        self.assertIsNone(validation.repair_json('no json here'))
+        self.assertIsNone(validation.repair_json('[{"question": "Unterminated'))
+
+    def test_clean_questions_normalizes_and_deduplicates(self):
+        items = [
+            {'text': '  How   are you? ', 'choices': ['Fine', 'fine', {'label': 'Bad'}]},
+            {'question': 'HOW are you?', 'options': ['Yes', 'No']},
+            {'question': 'Too few options?', 'options': ['Only one']},
+            {'question': 'Bad option type?', 'options': ['Yes', True]},
+            'not a dict',
+        ]
+        self.assertEqual(validation.clean_questions(items), [{'question': 'How are you?', 'options': ['Fine', 'Bad']}])
+
+
+@override_settings(GROQ_API_KEY='test-key', QUIZ_GENERATION_MAX_TOPUPS=2)
+class QuestionGenerationTests(TestCase):
+    def setUp(self):
+        self.ai_service = AIQuizService()
+
+    def test_truncated_stream_is_salvaged_and_topped_up(self):
+        text = json.dumps([question(1), question(1), question(2), {'question': 'No options?'}, question(3)])
+        text = text[:text.rfind('"Option')]
+        top_up = mock.Mock(return_value=[question(4), question(5)])
+
+        with mock.patch.object(AIQuizService, '_stream_completion', return_value=random_chunks(text, 11)), \
+                mock.patch.object(AIQuizService, '_request_questions', top_up):
+            questions = list(self.ai_service.stream_quiz_questions('Sleep', 4))
+
+        self.assertEqual(questions, [question(1), question(2), question(4), question(5)])
+        self.assertEqual(top_up.call_args.args[1], 2)  # Only the shortfall is requested
+
+    def test_failed_top_up_request_is_logged_and_yields_nothing(self):
+        with mock.patch('quiz.services.requests.post', side_effect=ConnectionError('API down')), \
+                self.assertLogs('quiz.services', 'ERROR') as logs:
+            self.assertEqual(self.ai_service._request_questions('Sleep', 2, set()), [])
+        self.assertIn('API down', logs.output[0])
+
+    def test_complete_questions_requests_only_the_shortfall(self):
+        top_up = mock.Mock(side_effect=[[question(3)], [question(4)]])
+        with mock.patch.object(AIQuizService, '_request_questions', top_up):
+            questions = self.ai_service.complete_questions('Sleep', [question(1), {'bad': True}, question(2)], 4)
+
+        self.assertEqual(questions, [question(1), question(2), question(3), question(4)])
+        self.assertEqual([call.args[1] for call in top_up.call_args_list], [2, 1])
+
+    def test_progressive_quiz_completes_a_failed_stream(self):
+        def broken_stream(ai_service, topic, num_questions):
+            yield question(1)
+            raise ConnectionError('stream reset')
+
+        top_up = mock.Mock(return_value=[question(2), question(3)])
+        with mock.patch.object(QuestionBankService, 'take', return_value=None), \
+                mock.patch.object(QuestionBankService, 'schedule_refill'), \
+                mock.patch.object(AIQuizService, 'stream_quiz_questions', broken_stream), \
+                mock.patch.object(AIQuizService, '_request_questions', top_up), \
+                self.assertLogs('quiz.services', 'ERROR'):
+            events = list(QuizService().create_quiz_progressive('Sleep', 3))
+
+        self.assertEqual(
+            [(event, payload['index']) for event, payload in events[:-1]], [('question', 0), ('question', 1), ('question', 2)]
+        )
+        self.assertEqual(top_up.call_args.args[1], 2)  # Only the missing questions
+        event, quiz = events[-1]
+        self.assertEqual((event, quiz.questions_data), ('quiz', [question(1), question(2), question(3)]))
+
+
+class InsightCacheKeyTests(TestCase):
+    def test_key_ignores_case_and_whitespace(self):
+        results = [{'question': 'How do you sleep?', 'answer': 'Often'}]
+        noisy = [{'question': '  how do  you SLEEP? ', 'answer': 'often '}]
+        self.assertEqual(caching.make_key('Sleep', results, None, 1), caching.make_key(' sleep', noisy, None, 1))
+
+    def test_key_depends_on_answers_history_and_prompt_version(self):
+        results = [{'question': 'How do you sleep?', 'answer': 'Often'}]
+        previous = {'date': 'May 01, 2025', 'results_data': [{'question': 'How do you sleep?', 'answer': 'Never'}]}
+        key = caching.make_key('Sleep', results, None, 1)
+        self.assertNotEqual(key, caching.make_key('Sleep', [{**results[0], 'answer': 'Never'}], None, 1))
+        self.assertNotEqual(key, caching.make_key('Sleep', results, previous, 1))
+        self.assertNotEqual(key, caching.make_key('Sleep', results, None, 2))
+
+    def test_same_previous_answers_on_different_dates_share_a_key(self):
+        results = [{'question': 'How do you sleep?', 'answer': 'Often'}]
+        previous = [{'question': 'How do you sleep?', 'answer': 'Never'}]
+        self.assertEqual(
+            caching.make_key('Sleep', results, {'date': 'May 01, 2025', 'results_data': previous}, 1),
+            caching.make_key('Sleep', results, {'date': 'June 12, 2025', 'results_data': previous}, 1)
+        )
+
+    @override_settings(GROQ_API_KEY='test-key')
+    def test_insights_prompt_does_not_mention_the_previous_date(self):
+        previous = {'date': 'May 01, 2025', 'results_data': [{'question': 'How do you sleep?', 'answer': 'Never'}]}
+        prompt = AIQuizService()._insights_prompt('Sleep', [{'question': 'How do you sleep?', 'answer': 'Often'}], previous)
+        self.assertNotIn('May 01, 2025', prompt)
+        self.assertIn('How do you sleep?: Never', prompt)
+
+
+@override_settings(GROQ_API_KEY='test-key')
+class TopicListingTests(TestCase):
+    url = '/api/quiz/topics/'
+
+    def setUp(self):
+        cache.clear()
+
+    def names(self, **params):
+        return [topic['name'] for topic in self.client.get(self.url, params).json()]
+
+    def test_unchanged_listing_revalidates_without_queries(self):
+        etag = self.client.get(self.url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual((response.status_code, response['ETag']), (304, etag))
+
+    def test_etag_changes_after_topic_writes(self):
+        curated_etag = self.client.get(self.url)['ETag']
+        all_etag = self.client.get(self.url, {'include': 'all'})['ETag']
+
+        QuizService().get_or_create_topic('My cat ignores me')
+        response = self.client.get(self.url, {'include': 'all'}, HTTP_IF_NONE_MATCH=all_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('My cat ignores me', [topic['name'] for topic in response.json()])
+        # Free-text topics aren't curated, so the default listing is unchanged
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=curated_etag).status_code, 304)
+
+        admin_user = get_user_model().objects.create_superuser(name='curator', password='pw')
+        self.client.force_login(admin_user)
+        topic = QuizTopic.objects.get(name='My cat ignores me')
+        self.client.post(f'/admin/quiz/quiztopic/{topic.pk}/change/', {'name': topic.name, 'is_curated': 'on'})
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=curated_etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('My cat ignores me', [topic['name'] for topic in response.json()])
+
+    def test_popular_order_follows_quiz_usage(self):
+        first, second = QuizTopic.objects.filter(is_curated=True).order_by('name')[:2]
+        for _ in range(3):
+            QuizTopicService.record_use(second)
+        self.assertEqual(self.names(order='popular')[0], second.name)
+        self.assertEqual(self.names()[:2], [first.name, second.name])
 
-# Create your tests here.
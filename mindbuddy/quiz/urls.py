@@ -9,10 +9,13 @@ urlpatterns = [
     
     # Quiz management
     path('create/', views.create_quiz, name='create_quiz'),
+    path('create/stream/', views.stream_create_quiz, name='stream_create_quiz'),
     path('<int:quiz_id>/', views.get_quiz, name='get_quiz'),
     path('<int:quiz_id>/submit/', views.submit_quiz, name='submit_quiz'),
     
     # Results and insights
+    path('results/<int:result_id>/', views.get_quiz_result, name='get_result'),
+    path('results/<int:result_id>/stream/', views.stream_quiz_result, name='stream_result'),
     path('results/<int:result_id>/regenerate/', views.regenerate_insights, name='regenerate_insights'),
     path('results/<int:result_id>/like/', views.like_insight, name='like_insight'),
     path('results/<int:result_id>/dislike/', views.dislike_insight, name='dislike_insight'),
@@ -20,4 +23,7 @@ urlpatterns = [
     # History
     path('history/', views.get_quiz_history, name='get_history'),
     path('results/', views.get_quiz_results, name='get_results'),
+    
+    # Question bank
+    path('bank/metrics/', views.get_question_bank_metrics, name='question_bank_metrics'),
 ]
\ No newline at end of file
@@ -0,0 +1,138 @@
+"""
+Validation and repair of LLM-generated quiz questions.
+
+Models sometimes wrap JSON in code fences, leave trailing commas, use curly
+quotes, rename keys or stop mid-array. These helpers recover whatever is
+usable and normalize every question to {'question': str, 'options': [str, ...]}
+so a short or slightly broken response can be topped up instead of thrown away.
+"""
+import ast
+import json
+import re
+
+from .caching import normalize_text
+
+MIN_OPTIONS = 2
+MAX_OPTIONS = 6
+
+QUESTION_KEYS = ('question', 'text', 'prompt', 'q')
+OPTION_KEYS = ('options', 'choices', 'answers')
+
+CODE_FENCE = re.compile(r'^\s*```[a-zA-Z]*\s*|\s*```\s*$')
+TRAILING_COMMA = re.compile(r',\s*([\]}])')
+SMART_QUOTES = str.maketrans({'“': '"', '”': '"', '‘': "'", '’': "'"})
+
+
+def repair_json(text):
+    """Parse model output as JSON, fixing common defects; returns the data or None"""
+    if not isinstance(text, str):
+        return None
+
+    text = CODE_FENCE.sub('', text.strip())
+    starts = [index for index in (text.find('['), text.find('{')) if index != -1]
+    if not starts:
+        return None
+    text = text[min(starts):]
+
+    candidates = [text, text.translate(SMART_QUOTES)]
+    for candidate in candidates:
+        candidate = TRAILING_COMMA.sub(r'\1', candidate)
+        for attempt in (candidate, _close_truncated(candidate)):
+            if attempt is None:
+                continue
+            try:
+                return json.loads(attempt)
+            except ValueError:
+                pass
+            try:
+                # Python-style literals: single quotes, True/False/None
+                return ast.literal_eval(attempt)
+            except (ValueError, SyntaxError, MemoryError, RecursionError):
+                pass
+    return None
+
+
+def _close_truncated(text):
+    """Cut text after its last complete object and close the brackets still open"""
+    end = text.rfind('}')
+    if end == -1:
+        return None
+    text = TRAILING_COMMA.sub(r'\1', text[:end + 1])
+
+    stack, in_string, escaped = [], False, False
+    for char in text:
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '[{':
+            stack.append(']' if char == '[' else '}')
+        elif char in ']}' and stack:
+            stack.pop()
+    if in_string:
+        return None
+    return text + ''.join(reversed(stack))
+
+
+def extract_questions(data):
+    """The list of candidate question objects in parsed model output"""
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        if any(key in data for key in QUESTION_KEYS):
+            return [data]
+        for value in data.values():
+            if isinstance(value, list):
+                return value
+    return []
+
+
+def clean_question(item):
+    """Normalized {'question', 'options'} for a valid item, or None"""
+    if not isinstance(item, dict):
+        return None
+
+    question = next((item[key] for key in QUESTION_KEYS if isinstance(item.get(key), str)), '')
+    question = ' '.join(question.split())
+    options = next((item[key] for key in OPTION_KEYS if isinstance(item.get(key), list)), None)
+    if not question or options is None:
+        return None
+
+    cleaned, seen = [], set()
+    for option in options:
+        if isinstance(option, dict):
+            option = option.get('text') or option.get('option') or option.get('label')
+        if not isinstance(option, (str, int, float)) or isinstance(option, bool):
+            return None
+        option = ' '.join(str(option).split())
+        if not option or normalize_text(option) in seen:
+            continue
+        seen.add(normalize_text(option))
+        cleaned.append(option)
+
+    if not MIN_OPTIONS <= len(cleaned) <= MAX_OPTIONS:
+        return None
+    return {'question': question, 'options': cleaned}
+
+
+def question_key(question):
+    """Identity used to de-duplicate questions"""
+    return normalize_text(question['question'])
+
+
+def clean_questions(items, seen=None):
+    """Valid, de-duplicated questions from items; seen (a set of question keys) is updated in place"""
+    seen = set() if seen is None else seen
+    questions = []
+    for item in items:
+        question = clean_question(item)
+        if question is None or question_key(question) in seen:
+            continue
+        seen.add(question_key(question))
+        questions.append(question)
+    return questions
@@ -1,48 +1,43 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.decorators import api_view, permission_classes, renderer_classes
+from rest_framework.settings import api_settings
+from rest_framework.permissions import AllowAny, IsAdminUser
 from rest_framework.response import Response
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.views.decorators.csrf import csrf_exempt
 import json
 
 from .models import QuizTopic, Quiz, QuizResult, QuizHistory
-from .serializers import QuizTopicSerializer, QuizSerializer, QuizResultSerializer, QuizHistorySerializer
-from .services import QuizService
+from .serializers import QuizTopicSerializer, QuizSerializer, QuizResultSerializer, QuizHistorySerializer, fast_quiz_result_data
+from .services import QuizService, QuestionBankService, QuizTopicService
+from .streaming import insight_events, sse_event
+from mindbuddy.renderers import EventStreamRenderer
 
 quiz_service = QuizService()
 
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_quiz_topics(request):
-    """Get all available quiz topics"""
-    topics = QuizTopic.objects.all()
-    serializer = QuizTopicSerializer(topics, many=True)
+    """Get quiz topics: curated only unless ?include=all, ordered by name or ?order=popular"""
+    include_all = request.query_params.get('include') == 'all'
+    order = 'popular' if request.query_params.get('order') == 'popular' else 'name'
+    etag, data = QuizTopicService.listing(include_all, order)
     
-    # Add default topics if none exist
-    default_topics = [
-        "Managing Daily Stress", "Improving Sleep Quality", "Building Mindfulness Habits", 
-        "Work-Life Balance", "Practicing Self-Compassion", "Overcoming Procrastination",
-        "Fostering Positive Thinking", "Understanding My Emotions", "Building Healthy Relationships"
-    ]
-    
-    if not topics.exists():
-        for topic_name in default_topics:
-            QuizTopic.objects.get_or_create(name=topic_name)
-        
-        topics = QuizTopic.objects.all()
-        serializer = QuizTopicSerializer(topics, many=True)
-    
-    return Response(serializer.data)
+    response = get_conditional_response(request, etag=etag) or Response(data)
+    response['ETag'] = etag
+    patch_cache_control(response, no_cache=True)
+    return response
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def create_quiz(request):
-    """Create a new quiz with AI-generated questions"""
+    """Create a new quiz with AI-generated questions (optionally completing the given partial ones)"""
     try:
         data = request.data
         topic_name = data.get('topic')
         length = int(data.get('length', 5))
+        partial_questions = data.get('questions') or None
         
         if not topic_name:
             return Response(
@@ -56,8 +51,16 @@ def create_quiz(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
+        if partial_questions is not None and (
+            not isinstance(partial_questions, list) or len(partial_questions) > length
+        ):
+            return Response(
+                {'error': 'questions must be a list of at most length questions'}, 
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
         user = request.user if request.user.is_authenticated else None
-        quiz = quiz_service.create_quiz(topic_name, length, user)
+        quiz = quiz_service.create_quiz(topic_name, length, user, partial_questions)
         
         serializer = QuizSerializer(quiz)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -73,6 +76,43 @@ def create_quiz(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@api_view(['POST'])
+@permission_classes([AllowAny])
+@renderer_classes([EventStreamRenderer] + api_settings.DEFAULT_RENDERER_CLASSES)
+def stream_create_quiz(request):
+    """Create a quiz, streaming each question as a Server-Sent Event as soon as it is generated"""
+    topic_name = request.data.get('topic')
+    try:
+        length = int(request.data.get('length', 5))
+    except (TypeError, ValueError):
+        length = None
+    
+    if not topic_name:
+        return Response(
+            {'error': 'Topic is required'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    if length not in [3, 5, 8]:
+        return Response(
+            {'error': 'Length must be 3, 5, or 8'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    user = request.user if request.user.is_authenticated else None
+    
+    def events():
+        for event, payload in quiz_service.create_quiz_progressive(topic_name, length, user):
+            if event == 'quiz':
+                yield sse_event('done', QuizSerializer(payload).data)
+            else:
+                yield sse_event(event, payload)
+    
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+    return response
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def get_quiz(request, quiz_id):
@@ -90,7 +130,7 @@ def get_quiz(request, quiz_id):
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def submit_quiz(request, quiz_id):
-    """Submit quiz answers and get insights"""
+    """Submit quiz answers; insights follow via the result or its stream"""
     try:
         data = request.data
         answers = data.get('answers', [])
@@ -105,7 +145,7 @@ def submit_quiz(request, quiz_id):
         result = quiz_service.submit_quiz_answers(quiz_id, answers, user)
         
         serializer = QuizResultSerializer(result)
-        return Response(serializer.data, status=status.HTTP_201_CREATED)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
         
     except ValueError as e:
         return Response(
@@ -127,7 +167,7 @@ def regenerate_insights(request, result_id):
         result = quiz_service.regenerate_insights(result_id, user)
         
         serializer = QuizResultSerializer(result)
-        return Response(serializer.data)
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
         
     except ValueError as e:
         return Response(
@@ -140,6 +180,37 @@ def regenerate_insights(request, result_id):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def get_quiz_result(request, result_id):
+    """Get a quiz result; poll until insight_status is ready or failed"""
+    try:
+        user = request.user if request.user.is_authenticated else None
+        result = quiz_service.get_result(result_id, user)
+        return Response(QuizResultSerializer(result).data)
+    except ValueError as e:
+        return Response(
+            {'error': str(e)}, 
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@renderer_classes([EventStreamRenderer] + api_settings.DEFAULT_RENDERER_CLASSES)
+def stream_quiz_result(request, result_id):
+    """Server-Sent Events stream of a result's insight tokens"""
+    user = request.user if request.user.is_authenticated else None
+    if not QuizResult.objects.filter(id=result_id, user=user).exists():
+        return Response(
+            {'error': 'Quiz result not found'}, 
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    response = StreamingHttpResponse(insight_events(result_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Stop nginx from buffering the stream
+    return response
+
 @api_view(['POST'])
 @permission_classes([AllowAny])
 def like_insight(request, result_id):
@@ -187,5 +258,10 @@ def get_quiz_results(request):
     """Get user's quiz results"""
     user = request.user if request.user.is_authenticated else None
     results = QuizResult.objects.filter(user=user).order_by('-completed_at')
-    serializer = QuizResultSerializer(results, many=True)
-    return Response(serializer.data)
\ No newline at end of file
+    return Response(fast_quiz_result_data(results))
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def get_question_bank_metrics(request):
+    """Question bank hit rate, refill latency and pool levels"""
+    return Response(QuestionBankService.metrics())
\ No newline at end of file